@@ -0,0 +1,254 @@
+"""
+Allocation Tree
+Varlıkların iç içe alt dağılımlarını (ör. Foreign Stocks -> US -> sektörler,
+Turkish Fund -> alt fonlar) tanımlayan dağılım ağacı.
+
+Ağaç bir kez düzleştirilerek varlık x yaprak ağırlık matrisine çevrilir; tüm
+kişilerin yaprak dağılımı (kişi x varlık ağırlıkları) @ (varlık x yaprak) tek bir
+matris çarpımıyla hesaplanır. Ağaçta tanımlanmayan varlıklar kendi yaprağıdır.
+
+Kullanım:
+    python allocation_tree.py
+    python allocation_tree.py --current
+    python allocation_tree.py --all
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from data_store import load_json, ALLOCATION_TREE_FILE, ASSET_FILE
+from portfolio_engine import compile_people, get_asset_table, normalize_people
+from us_sector_calculator import load_sector_config
+
+PATH_SEPARATOR = " / "
+SECTOR_SOURCE = "us_sector_config"
+
+# us_sector_config.json tek başına kullanıldığında (ağaç dosyası yoksa) oluşan ağaç
+DEFAULT_TREES = {"Foreign Stocks": {"source": SECTOR_SOURCE}}
+
+# Son düzleştirilen ağaç: (ağaç, sektör konfigürasyonu, asset tablosu, sonuç)
+_flat_cache = None
+
+def load_allocation_tree():
+    """
+    Dağılım ağacı dosyasını yükler. Dosya yoksa yalnızca us_sector_config.json
+    sektörlerinden oluşan varsayılan ağaç döndürülür.
+    Returns:
+        dict: {varlık: düğüm} sözlüğü veya None
+    """
+    try:
+        config = load_json(ALLOCATION_TREE_FILE)
+    except FileNotFoundError:
+        return DEFAULT_TREES
+    except json.JSONDecodeError:
+        print(f"Hata: '{ALLOCATION_TREE_FILE}' geçerli bir JSON dosyası değil.")
+        return None
+    return (config or {}).get('trees', DEFAULT_TREES)
+
+def node_children(node, sector_config):
+    """
+    Düğümün alt dallarını {ad: düğüm} olarak döndürür. 'source' alanı
+    us_sector_config olan düğümlerin alt dalları sektör konfigürasyonundan gelir.
+    """
+    if node.get('source') == SECTOR_SOURCE:
+        sectors = (sector_config or {}).get('sectors', {})
+        return {
+            name: {'percentage': info.get('percentage', 0), 'description': info.get('description', '')}
+            for name, info in sectors.items()
+        }
+    return node.get('children') or {}
+
+def validate_allocation_tree(trees, sector_config, asset_info=None):
+    """
+    Her düğümde alt dal yüzdelerinin toplamının %100 olduğunu kontrol eder.
+
+    Args:
+        trees: {varlık: düğüm} sözlüğü
+        sector_config: us_sector_config.json içeriği
+        asset_info: Verilirse kök varlıkların tanımlı olduğu da kontrol edilir
+
+    Returns:
+        list: Hata mesajları (geçerliyse boş liste)
+    """
+    errors = []
+    if asset_info is not None:
+        for asset in trees:
+            if asset not in asset_info:
+                errors.append(f"'{asset}' varlığı asset_info.json içinde tanımlı değil.")
+
+    stack = [(asset, node) for asset, node in trees.items()]
+    while stack:
+        path, node = stack.pop()
+        source = node.get('source')
+        if source is not None and source != SECTOR_SOURCE:
+            errors.append(f"{path}: bilinmeyen kaynak '{source}'.")
+            continue
+        children = node_children(node, sector_config)
+        if not children:
+            if source == SECTOR_SOURCE:
+                errors.append(f"{path}: sektör konfigürasyonu bulunamadı.")
+            continue
+
+        total = 0.0
+        for name, child in children.items():
+            percent = child.get('percentage')
+            if not isinstance(percent, (int, float)) or isinstance(percent, bool) or not 0 <= percent <= 1:
+                errors.append(f"{path}{PATH_SEPARATOR}{name}: yüzde 0 ile 1 arasında olmalı.")
+                continue
+            total += percent
+            stack.append((f"{path}{PATH_SEPARATOR}{name}", child))
+        if not (0.999 < total < 1.001):
+            errors.append(f"{path}: alt dağılım toplamı %100 değil (%{total * 100:.2f}).")
+    return errors
+
+def flatten_allocation_tree(trees, sector_config, table):
+    """
+    Ağacı varlık x yaprak ağırlık matrisine düzleştirir. Yaprak ağırlığı, kökten
+    yaprağa kadar olan yüzdelerin çarpımıdır.
+
+    Args:
+        trees: {varlık: düğüm} sözlüğü
+        sector_config: us_sector_config.json içeriği
+        table: pack_asset_info çıktısı
+
+    Returns:
+        dict: 'leaves' (yaprak yolları), 'assets' (her yaprağın varlık kimliği),
+              'descriptions' ve 'matrix' (varlık x yaprak) alanları
+    """
+    leaves = []
+    leaf_assets = []
+    descriptions = []
+    weights = []
+    for col, asset in enumerate(table['names']):
+        tree = trees.get(asset)
+        if tree is None:
+            leaves.append(asset)
+            leaf_assets.append(col)
+            descriptions.append("")
+            weights.append(1.0)
+            continue
+
+        # Derinlik öncelikli gezinme; yapraklar dosyadaki sırayla eklenir
+        stack = [(asset, tree, 1.0)]
+        while stack:
+            path, node, weight = stack.pop()
+            children = node_children(node, sector_config)
+            if not children:
+                leaves.append(path)
+                leaf_assets.append(col)
+                descriptions.append(node.get('description', ''))
+                weights.append(weight)
+                continue
+            for name, child in reversed(list(children.items())):
+                stack.append((f"{path}{PATH_SEPARATOR}{name}", child, weight * child.get('percentage', 0)))
+
+    matrix = np.zeros((len(table['names']), len(leaves)), dtype=np.float64)
+    matrix[leaf_assets, np.arange(len(leaves))] = weights
+    return {
+        'leaves': leaves,
+        'assets': np.array(leaf_assets, dtype=np.int64),
+        'descriptions': descriptions,
+        'matrix': matrix
+    }
+
+def get_leaf_table(trees, sector_config, table):
+    """
+    Aynı ağaç, sektör konfigürasyonu ve asset tablosu için düzleştirilmiş matrisi
+    tekrar kullanır.
+    """
+    global _flat_cache
+    if _flat_cache is not None:
+        cached_trees, cached_sectors, cached_table, cached_flat = _flat_cache
+        if cached_trees is trees and cached_sectors is sector_config and cached_table is table:
+            return cached_flat
+    flat = flatten_allocation_tree(trees, sector_config, table)
+    _flat_cache = (trees, sector_config, table, flat)
+    return flat
+
+def leaf_allocation(weights, flat):
+    """
+    Kişi x varlık ağırlıklarından kişi x yaprak ağırlıklarını hesaplar.
+    """
+    return weights @ flat['matrix']
+
+def people_leaf_allocation(people, asset_info, trees, sector_config, use_current=False):
+    """
+    Tüm kişilerin yaprak dağılımlarını tek bir matris çarpımıyla hesaplar.
+
+    Returns:
+        dict: 'names', 'principal', 'leaves', 'descriptions', 'weights' (kişi x yaprak)
+              ve 'amounts' (kişi x yaprak, TL) alanları
+    """
+    table = get_asset_table(asset_info)
+    compiled = compile_people(people, table)
+    flat = get_leaf_table(trees, sector_config, table)
+    weights = leaf_allocation(compiled['current' if use_current else 'target'], flat)
+    return {
+        'names': compiled['names'],
+        'principal': compiled['principal'],
+        'leaves': flat['leaves'],
+        'descriptions': flat['descriptions'],
+        'weights': weights,
+        'amounts': weights * compiled['principal'][:, None]
+    }
+
+def show_leaf_allocation(title, leaves, weights, amounts):
+    print("\n" + "=" * 90)
+    print(title.center(90))
+    print("=" * 90)
+    print(f"{'YAPRAK':<55} | {'ORAN':>8} | {'MİKTAR (TL)':>19}")
+    print("-" * 90)
+    for leaf, weight, amount in zip(leaves, weights, amounts):
+        if weight > 0:
+            print(f"{leaf[:55]:<55} | %{weight * 100:>6.2f} | {amount:>19,.2f}")
+    print("=" * 90)
+
+if __name__ == "__main__":
+    from comparison_report import select_person
+    from storage import get_storage
+
+    parser = argparse.ArgumentParser(description="Varlıkların iç içe alt dağılımlarını hesaplar.")
+    parser.add_argument("--current", action="store_true", help="Hedef yerine mevcut portföyü kullan")
+    parser.add_argument("--all", action="store_true", help="Tüm kişilerin toplam yaprak dağılımını göster")
+    args = parser.parse_args()
+
+    people_list = get_storage().load_people()
+    try:
+        asset_info = load_json(ASSET_FILE)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Hata: Veri dosyası okunamadı ({e}).")
+        asset_info = None
+    trees = load_allocation_tree()
+    sector_config = load_sector_config()
+    if people_list is None or asset_info is None or trees is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    normalize_people(people_list, asset_info)
+
+    errors = validate_allocation_tree(trees, sector_config, asset_info)
+    if errors:
+        print("\nUYARI: Dağılım ağacı geçersiz!")
+        for error in errors:
+            print(f"  - {error}")
+        sys.exit("Dağılım ağacı hatası nedeniyle program durduruldu.")
+
+    label = "MEVCUT" if args.current else "HEDEF"
+    if args.all:
+        start = time.perf_counter()
+        result = people_leaf_allocation(people_list, asset_info, trees, sector_config, args.current)
+        elapsed = time.perf_counter() - start
+        totals = result['amounts'].sum(axis=0)
+        grand_total = totals.sum()
+        shares = totals / grand_total if grand_total > 0 else np.zeros(len(totals))
+        show_leaf_allocation(f"TOPLAM {label} YAPRAK DAĞILIMI ({len(people_list)} kişi)",
+                             result['leaves'], shares, totals)
+        print(f"Süre: {elapsed:.3f} sn")
+    else:
+        selected_person = select_person(people_list)
+        if selected_person:
+            result = people_leaf_allocation([selected_person], asset_info, trees, sector_config, args.current)
+            show_leaf_allocation(f"{label} YAPRAK DAĞILIMI - {selected_person.get('name', '')}",
+                                 result['leaves'], result['weights'][0], result['amounts'][0])
@@ -0,0 +1,435 @@
+"""
+Portfolio API Server
+Portföy hesaplamalarını yerel bir HTTP servisi olarak sunan asyncio tabanlı sunucu.
+
+Veri dosyaları bellekte tutulur; dosyaların değişiklik zamanı en fazla saniyede bir
+kontrol edilir ve veri değiştiğinde yeniden yüklenir. Yanıtlar veri sürümüne göre
+önbelleğe alınır, ETag / If-None-Match ile 304 yanıtı desteklenir.
+
+Uç noktalar:
+    GET  /api/health
+    GET  /api/people
+    GET  /api/people/<ad>
+    GET  /api/people/<ad>/comparison[?format=json|text|csv|html][&monte_carlo=1]
+    GET  /api/people/<ad>/scenarios
+    GET  /api/people/<ad>/sectors[?format=...]
+    PUT  /api/people/<ad>/holdings      gövde: {"varlık": tutar (TL), ...}
+    GET  /bundle/index.json             dashboard_bundle.py ile aynı biçimde
+    GET  /bundle/people/<dosya>.json
+
+Kullanım:
+    python api_server.py --port 8080
+    (dashboard: web/portfolio_displayer.html?api=http://localhost:8080)
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from comparison_report import build_comparison_report, build_scenario_section, build_us_sector_analysis
+from dashboard_bundle import BUNDLE_VERSION, PEOPLE_DIR_NAME, build_bundles, bundle_file_name
+from data_store import (
+    load_json, get_usd_rate, ASSET_FILE, CURRENCY_FILE, FX_RATES_FILE, OPTIMIZER_CONFIG_FILE,
+    PROJECTION_CONFIG_FILE, SECTOR_CONFIG_FILE, SIMULATION_CONFIG_FILE
+)
+from monte_carlo import load_simulation_config
+from portfolio_engine import asset_id, current_distribution, get_asset_table, normalize_people
+from report_renderer import FORMATS, render
+from snapshot_store import SnapshotStore
+from storage import get_storage
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+CHECK_INTERVAL = 1.0
+CACHE_SIZE = 4096
+MAX_BODY_SIZE = 1 << 20
+
+CONTENT_TYPES = {
+    "json": "application/json; charset=utf-8",
+    "text": "text/plain; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+    "html": "text/html; charset=utf-8"
+}
+# Sorgu parametresi -> uç nokta argümanı (yerleşik adları gölgelememek için)
+QUERY_ARGS = {"format": "fmt"}
+STATUS_TEXT = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+class PortfolioData:
+    """
+    Kişileri ve ortak varsayımları bellekte tutar; veri dosyaları değiştiğinde
+    yeniden yükleyip sürüm numarasını artırır.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self.version = 0
+        self.people = {}
+        self.asset_info = {}
+        self.sector_config = None
+        self.usd_rate = None
+        self._signature = None
+        self._checked = 0.0
+        self._sim_config = None
+        self.refresh(force=True)
+
+    def _files(self):
+        people_file = getattr(self.storage, 'file_path', None) or getattr(self.storage, 'db_path', None)
+        return (people_file, ASSET_FILE, SECTOR_CONFIG_FILE, CURRENCY_FILE, FX_RATES_FILE,
+                SIMULATION_CONFIG_FILE, OPTIMIZER_CONFIG_FILE, PROJECTION_CONFIG_FILE)
+
+    def _current_signature(self):
+        signature = []
+        for path in self._files():
+            try:
+                stat = os.stat(path)
+                signature.append((stat.st_mtime_ns, stat.st_size))
+            except (OSError, TypeError):
+                signature.append(None)
+        return tuple(signature)
+
+    def refresh(self, force=False):
+        """
+        Dosyalar değiştiyse veriyi yeniden yükler. Kontrol en fazla CHECK_INTERVAL
+        saniyede bir yapılır.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked < CHECK_INTERVAL:
+            return
+        self._checked = now
+        signature = self._current_signature()
+        if not force and signature == self._signature:
+            return
+
+        people = self.storage.load_people()
+        try:
+            asset_info = load_json(ASSET_FILE) or {}
+            sector_config = load_json(SECTOR_CONFIG_FILE)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Hata: Veri dosyası okunamadı ({e}).")
+            return
+        if people is None:
+            return
+        normalize_people(people, asset_info)
+
+        self.people = {person.get('name', ''): person for person in people}
+        self.asset_info = asset_info
+        self.sector_config = sector_config
+        self.usd_rate = get_usd_rate()
+        self._sim_config = None
+        self._signature = signature
+        self.version += 1
+
+    def person(self, name):
+        person = self.people.get(name)
+        if person is None:
+            raise ApiError(404, f"'{name}' adlı kişi bulunamadı.")
+        return person
+
+    def sim_config(self):
+        if self._sim_config is None:
+            self._sim_config = load_simulation_config() or {}
+        return self._sim_config
+
+    def update_holdings(self, name, amounts):
+        """
+        Kişinin mevcut varlık tutarlarını günceller, kaydeder ve snapshot ekler.
+        """
+        person = self.person(name)
+        if not isinstance(amounts, dict) or not amounts:
+            raise ApiError(400, "Gövde {varlık: tutar} biçiminde bir JSON nesnesi olmalı.")
+
+        table = get_asset_table(self.asset_info)
+        canonical = {}
+        for asset, amount in amounts.items():
+            col = asset_id(asset, table)
+            if col is None:
+                raise ApiError(400, f"'{asset}' varlığı asset_info.json içinde tanımlı değil.")
+            if not isinstance(amount, (int, float)) or isinstance(amount, bool) or amount < 0:
+                raise ApiError(400, f"'{asset}' için tutar sıfır veya pozitif bir sayı olmalı.")
+            key = table['names'][col]
+            canonical[key] = canonical.get(key, 0) + float(amount)
+
+        # Bellekteki kayıt ancak kayıt başarılı olursa değiştirilir
+        updated = dict(person, current_portfolio_amount=canonical, principal=sum(canonical.values()))
+        self.storage.save_person(updated)
+        self.people[name] = updated
+        SnapshotStore().append(name, updated['principal'], canonical)
+
+        self._signature = self._current_signature()
+        self.version += 1
+        return updated
+
+class PortfolioApi:
+    """
+    İstekleri uç noktalara yönlendirir ve veri sürümüne bağlı yanıt önbelleğini yönetir.
+    handle() iş parçacıklarından çağrılır; veri yenileme, önbellek ve güncellemeler
+    kilit altında yapılır, rapor üretimi kilit dışında paralel çalışır.
+    """
+
+    ROUTES = [
+        ("GET", re.compile(r"^/api/health$"), "health"),
+        ("GET", re.compile(r"^/api/people$"), "people"),
+        ("GET", re.compile(r"^/api/people/([^/]+)$"), "person"),
+        ("GET", re.compile(r"^/api/people/([^/]+)/comparison$"), "comparison"),
+        ("GET", re.compile(r"^/api/people/([^/]+)/scenarios$"), "scenarios"),
+        ("GET", re.compile(r"^/api/people/([^/]+)/sectors$"), "sectors"),
+        ("PUT", re.compile(r"^/api/people/([^/]+)/holdings$"), "holdings"),
+        ("POST", re.compile(r"^/api/people/([^/]+)/holdings$"), "holdings"),
+        ("GET", re.compile(r"^/bundle/index\.json$"), "bundle_index"),
+        ("GET", re.compile(r"^/bundle/" + PEOPLE_DIR_NAME + r"/([^/]+)$"), "bundle_person"),
+    ]
+
+    def __init__(self, data):
+        self.data = data
+        self._cache = OrderedDict()
+        self._cache_version = data.version
+        self.stats = {'requests': 0, 'cache_hits': 0}
+        self._lock = threading.Lock()
+        self._accepted = {}
+
+    def handle(self, method, target, headers, body):
+        """
+        Returns:
+            tuple: (durum kodu, içerik tipi, gövde (bytes), ETag veya None)
+        """
+        with self._lock:
+            self.stats['requests'] += 1
+            self.data.refresh()
+            if self.data.version != self._cache_version:
+                self._cache.clear()
+                self._cache_version = self.data.version
+
+        parts = urlsplit(target)
+        path = parts.path
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+
+        if method == "OPTIONS":
+            return 200, CONTENT_TYPES["text"], b"", None
+
+        path_matched = False
+        for route_method, pattern, handler_name in self.ROUTES:
+            match = pattern.match(path)
+            if not match:
+                continue
+            path_matched = True
+            if route_method != method:
+                continue
+            args = [unquote(group) for group in match.groups()]
+            try:
+                if method != "GET":
+                    with self._lock:
+                        return getattr(self, handler_name)(*args, body=body)
+                return self._cached_get(target, handler_name, args, query, headers)
+            except ApiError as e:
+                return self._error(e.status, e.message)
+
+        if path_matched:
+            return self._error(405, "Bu yöntem desteklenmiyor.")
+        return self._error(404, "Bulunamadı.")
+
+    def _cached_get(self, target, handler_name, args, query, headers):
+        with self._lock:
+            version = self._cache_version
+            cached = self._cache.get(target)
+            if cached is not None:
+                self._cache.move_to_end(target)
+                self.stats['cache_hits'] += 1
+
+        if cached is None:
+            handler = getattr(self, handler_name)
+            # Uç noktanın tanımadığı sorgu parametreleri yok sayılır
+            accepted = self._accepted.get(handler_name)
+            if accepted is None:
+                accepted = self._accepted[handler_name] = set(inspect.signature(handler).parameters)
+            kwargs = {QUERY_ARGS.get(k, k): v for k, v in query.items()}
+            content_type, payload = handler(*args, **{k: v for k, v in kwargs.items() if k in accepted})
+            etag = f'"{version}-{hash(payload) & 0xffffffff:08x}"'
+            cached = (content_type, payload, etag)
+            with self._lock:
+                # Hesaplama sırasında veri değiştiyse eski sonuç önbelleğe yazılmaz
+                if version == self._cache_version:
+                    self._cache[target] = cached
+                    if len(self._cache) > CACHE_SIZE:
+                        self._cache.popitem(last=False)
+
+        content_type, payload, etag = cached
+        if headers.get('if-none-match') == etag:
+            return 304, content_type, b"", etag
+        return 200, content_type, payload, etag
+
+    @staticmethod
+    def _json(value):
+        return CONTENT_TYPES["json"], json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def _error(self, status, message):
+        return (status, *self._json({'error': message}), None)
+
+    def _report(self, report, fmt):
+        if fmt not in FORMATS:
+            raise ApiError(400, f"Geçersiz biçim: {fmt}. Seçenekler: {', '.join(FORMATS)}")
+        if fmt == "json":
+            return self._json(report)
+        return CONTENT_TYPES[fmt], render([report], fmt).encode('utf-8')
+
+    # --- Uç noktalar ---
+
+    def health(self):
+        return self._json({'status': 'ok', 'version': self.data.version, 'people': len(self.data.people),
+                           **self.stats})
+
+    def people(self):
+        return self._json({
+            'version': self.data.version,
+            'people': [
+                {'name': name, 'principal': person.get('principal', 0), 'risk_score': person.get('risk_score')}
+                for name, person in self.data.people.items()
+            ]
+        })
+
+    def person(self, name):
+        return self._json(self.data.person(name))
+
+    def _distributions(self, name):
+        person = self.data.person(name)
+        current_dist = current_distribution(person)
+        target_dist = person.get('target_portfolio') or {}
+        if not current_dist or not target_dist:
+            raise ApiError(404, "Mevcut ve/veya hedef portföy bilgileri eksik.")
+        return person, current_dist, target_dist
+
+    def comparison(self, name, fmt="json", monte_carlo="0"):
+        person, current_dist, target_dist = self._distributions(name)
+        sim_config = self.data.sim_config() if monte_carlo in ("1", "true") else None
+        report = build_comparison_report(name, person.get('principal', 0), current_dist, target_dist,
+                                         self.data.asset_info, sim_config)
+        return self._report(report, fmt)
+
+    def scenarios(self, name):
+        person, current_dist, target_dist = self._distributions(name)
+        return self._json(build_scenario_section(person.get('principal', 0), current_dist, target_dist,
+                                                 self.data.asset_info))
+
+    def sectors(self, name, fmt="json"):
+        person = self.data.person(name)
+        report = build_us_sector_analysis(name, person.get('principal', 0), person.get('target_portfolio'))
+        if report is None:
+            raise ApiError(404, "Hedef portföyde Amerika (Foreign Stocks) payı yok veya sektör konfigürasyonu geçersiz.")
+        return self._report(report, fmt)
+
+    def holdings(self, name, body=b""):
+        try:
+            amounts = json.loads(body or b"null")
+        except json.JSONDecodeError:
+            raise ApiError(400, "Gövde geçerli bir JSON değil.")
+        return (200, *self._json(self.data.update_holdings(name, amounts)), None)
+
+    def bundle_index(self):
+        return self._json({
+            'version': BUNDLE_VERSION,
+            'people_dir': PEOPLE_DIR_NAME,
+            'people': [
+                {'name': name, 'file': bundle_file_name(name), 'hash': str(self.data.version)}
+                for name in self.data.people
+            ]
+        })
+
+    def bundle_person(self, file_name):
+        for name, person in self.data.people.items():
+            if bundle_file_name(name) == file_name:
+                bundle = build_bundles([person], self.data.asset_info, self.data.sector_config, self.data.usd_rate)[0]
+                return self._json(bundle)
+        raise ApiError(404, f"'{file_name}' bulunamadı.")
+
+async def handle_connection(api, reader, writer):
+    """
+    Tek bir bağlantıdaki HTTP/1.1 isteklerini (keep-alive) sırayla yanıtlar.
+    İstekler iş parçacığı havuzunda işlenir; uzun raporlar olay döngüsünü bloklamaz.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+
+            lines = head.decode('latin-1').split("\r\n")
+            try:
+                method, target, version = lines[0].split(" ", 2)
+            except ValueError:
+                break
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+
+            try:
+                length = int(headers.get('content-length', 0) or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                status, content_type, payload, etag = api._error(400, "Geçersiz Content-Length başlığı.")
+            elif length > MAX_BODY_SIZE:
+                status, content_type, payload, etag = api._error(413, "İstek gövdesi çok büyük.")
+            else:
+                body = await reader.readexactly(length) if length else b""
+                try:
+                    status, content_type, payload, etag = await loop.run_in_executor(
+                        None, api.handle, method, target, headers, body
+                    )
+                except Exception as e:
+                    status, content_type, payload, etag = api._error(500, str(e))
+
+            keep_alive = version == "HTTP/1.1" and headers.get('connection', '').lower() != "close"
+            response = [
+                f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(payload)}",
+                "Access-Control-Allow-Origin: *",
+                "Access-Control-Allow-Methods: GET, PUT, POST, OPTIONS",
+                "Access-Control-Allow-Headers: Content-Type, If-None-Match",
+                f"Connection: {'keep-alive' if keep_alive else 'close'}"
+            ]
+            if etag:
+                response.append(f"ETag: {etag}")
+            writer.write(("\r\n".join(response) + "\r\n\r\n").encode('latin-1') + payload)
+            await writer.drain()
+            # Gövdesi okunmamış isteklerden sonra bağlantı sürdürülemez
+            if not keep_alive or (length < 0 or length > MAX_BODY_SIZE):
+                break
+    finally:
+        writer.close()
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, storage=None):
+    data = PortfolioData(storage or get_storage())
+    api = PortfolioApi(data)
+    server = await asyncio.start_server(lambda r, w: handle_connection(api, r, w), host, port)
+    print(f"Portföy API'si çalışıyor: http://{host}:{port}/api/people ({len(data.people)} kişi)")
+    async with server:
+        await server.serve_forever()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Portföy hesaplamalarını yerel HTTP servisi olarak sunar.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Dinlenecek adres")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Dinlenecek port")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        sys.exit(0)
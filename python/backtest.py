@@ -0,0 +1,434 @@
+"""
+Historical Backtest
+Kişilerin hedef portföylerini geçmiş fiyat serileri üzerinde dönemsel yeniden
+dengeleme ile test eden modül.
+
+Fiyatlar yerel bir CSV dosyasından okunur (varsayılan: data/price_history.csv):
+
+    date,USD_TRY,Gold,Foreign Stocks,...
+    2005-01-03,1.34,595.2,120.4,...
+
+Sütun adları asset_info.json'daki varlık adları (veya takma adları) ile eşleşir.
+is_usd_based varlıkların fiyatları USD cinsindendir ve USD_TRY sütunuyla TL'ye
+çevrilir; "USD TRY Based" varlığının sütunu yoksa doğrudan USD_TRY kullanılır.
+Eksik günler bir önceki fiyatla doldurulur.
+
+Simülasyon tüm portföyler için birlikte yürütülür. En fazla bir aylık gün blokları
+boyunca portföy değerleri (gün x varlık) @ (varlık x portföy) çarpımıyla hesaplanır
+ve yeniden dengeleme kuralı uygulanır:
+
+    none       başlangıç ağırlıkları korunmaz (al ve tut)
+    calendar   her ay / çeyrek / yıl başında hedef ağırlıklara dönülür
+    threshold  herhangi bir varlığın ağırlığı hedeften bant kadar saptığında
+
+CAGR, yıllık oynaklık, maksimum düşüş ve yıllık devir (turnover) raporlanır.
+Değer serisinin tamamı bellekte tutulmaz; istatistikler blok blok güncellenir.
+
+Kullanım:
+    python backtest.py --all
+    python backtest.py --rebalance threshold --band 0.05 --prices fiyatlar.csv
+    python backtest.py --synthetic 20 --all --rebalance calendar --frequency Q
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from data_store import load_json, ASSET_FILE, DATA_DIR
+from portfolio_engine import USD_TRY_ASSET, get_asset_table, normalize_people, pack_weights
+from storage import get_storage
+
+PRICE_HISTORY_FILE = os.path.join(DATA_DIR, "price_history.csv")
+FX_COLUMN = "USD_TRY"
+REBALANCE_MODES = ("none", "calendar", "threshold")
+# W ve Q anahtarları period_ends içinde hesaplanır (numpy haftaları Perşembe başlar)
+FREQUENCIES = {"D": "datetime64[D]", "W": None, "M": "datetime64[M]", "Y": "datetime64[Y]", "Q": None}
+DEFAULT_BAND = 0.05
+DEFAULT_OUTPUT_DIR = "../reports/backtest"
+DAYS_PER_YEAR = 365.25
+
+def load_price_history(file_path):
+    """
+    Geniş biçimli fiyat CSV dosyasını okur; eksik değerler bir önceki fiyatla doldurulur.
+
+    Returns:
+        dict: 'dates' (datetime64[D]), 'columns' (sütun adları) ve 'prices' (gün x sütun)
+
+    Raises:
+        FileNotFoundError: Dosya bulunamazsa
+        ValueError: Dosya geçersizse
+    """
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header or header[0].strip().lower() != "date":
+            raise ValueError(f"'{file_path}' ilk sütunu 'date' olmalı.")
+        rows = [row for row in reader if row]
+    if not rows:
+        raise ValueError(f"'{file_path}' içinde fiyat bulunamadı.")
+
+    table = np.array([row + [""] * (len(header) - len(row)) for row in rows], dtype=object)
+    dates = np.array(table[:, 0].astype(str), dtype='datetime64[D]')
+    values = table[:, 1:]
+    prices = np.full(values.shape, np.nan)
+    filled = values != ""
+    prices[filled] = values[filled].astype(np.float64)
+
+    order = np.argsort(dates, kind='stable')
+    return {
+        'dates': dates[order],
+        'columns': [column.strip() for column in header[1:]],
+        'prices': forward_fill(prices[order])
+    }
+
+def forward_fill(prices):
+    """
+    Her sütundaki boş (NaN) değerleri o sütunun bir önceki geçerli değeriyle doldurur.
+    """
+    rows = np.arange(len(prices))[:, None]
+    last_valid = np.where(np.isnan(prices), 0, rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    return prices[last_valid, np.arange(prices.shape[1])]
+
+def tl_price_matrix(history, table):
+    """
+    Fiyat geçmişini varlık sırasına göre TL fiyat matrisine (gün x varlık) çevirir.
+
+    Returns:
+        tuple: (fiyat matrisi, fiyatı bulunan varlıkların maskesi)
+    """
+    columns = {}
+    for i, column in enumerate(history['columns']):
+        col = table['index'].get(column)
+        if col is not None:
+            columns[col] = i
+    fx = history['prices'][:, history['columns'].index(FX_COLUMN)] if FX_COLUMN in history['columns'] else None
+
+    prices = np.full((len(history['dates']), len(table['names'])), np.nan)
+    for col, name in enumerate(table['names']):
+        if col in columns:
+            series = history['prices'][:, columns[col]]
+            if table['is_usd_based'][col] and table['combine_mask'][col]:
+                series = series * fx if fx is not None else np.full(len(series), np.nan)
+            prices[:, col] = series
+        elif name == USD_TRY_ASSET and fx is not None:
+            prices[:, col] = fx
+    available = ~np.isnan(prices).all(axis=0)
+    return prices, available
+
+def period_ends(dates, frequency):
+    """
+    Her dönemin (D, W, M, Q, Y) son gününün indeksini döndürür.
+    """
+    if frequency == "Q":
+        keys = dates.astype('datetime64[M]').astype(np.int64) // 3
+    elif frequency == "W":
+        # 1970-01-01 Perşembe olduğundan 3 gün kaydırılır; haftalar Pazartesi-Pazar
+        keys = (dates.astype('datetime64[D]').astype(np.int64) + 3) // 7
+    else:
+        keys = dates.astype(FREQUENCIES[frequency]).astype(np.int64)
+    return np.append(np.flatnonzero(np.diff(keys) != 0), len(dates) - 1)
+
+class PathStats:
+    """
+    Portföy değer serilerinin istatistiklerini (getiri toplamları, zirve, maksimum
+    düşüş, devir) seriyi saklamadan blok blok günceller.
+    """
+
+    def __init__(self, portfolios):
+        self.value = np.ones(portfolios)
+        self.peak = np.ones(portfolios)
+        self.max_drawdown = np.zeros(portfolios)
+        self.return_sum = np.zeros(portfolios)
+        self.return_square_sum = np.zeros(portfolios)
+        self.traded = np.zeros(portfolios)
+        self.rebalances = np.zeros(portfolios, dtype=np.int64)
+
+    def update(self, values, rows):
+        """
+        Args:
+            values: (gün, portföy) değerleri
+            rows: Değerlerin ait olduğu portföy indeksleri
+        """
+        previous = np.vstack([self.value[rows], values[:-1]])
+        daily = values / previous - 1
+        self.return_sum[rows] += daily.sum(axis=0)
+        self.return_square_sum[rows] += (daily * daily).sum(axis=0)
+        running_peak = np.maximum.accumulate(np.vstack([self.peak[rows], values]), axis=0)[1:]
+        self.max_drawdown[rows] = np.minimum(self.max_drawdown[rows], (values / running_peak - 1).min(axis=0))
+        self.peak[rows] = running_peak[-1]
+        self.value[rows] = values[-1]
+
+    def rebalance(self, holdings, weights, rows):
+        """
+        Verilen portföyleri hedef ağırlıklara döndürür ve işlem hacmini kaydeder.
+        """
+        value = self.value[rows]
+        target = value[:, None] * weights[rows]
+        self.traded[rows] += 0.5 * np.abs(holdings[rows] - target).sum(axis=1) / value
+        self.rebalances[rows] += 1
+        holdings[rows] = target
+
+def _advance_threshold(stats, holdings, weights, rows, prices, start, end, is_check, band):
+    """
+    Eşik dengelemede portföyleri start gününden end gününe ilerletir. Bloktaki tüm
+    günlerin portföy değerleri tek bir matris çarpımıyla, bant kontrolü her varlık
+    için (gün x portföy) dizileriyle yapılır; bant dışına çıkan portföyler ilk kontrol
+    gününde dengelenir ve bloğun kalanı yalnızca bu portföyler için yeniden hesaplanır.
+    """
+    relative = prices[start + 1:end + 1] / prices[start]
+    block_holdings = holdings[rows]
+    block_weights = weights[rows]
+    values = relative @ block_holdings.T
+
+    checks = np.flatnonzero(is_check[start + 1:end + 1])
+    check_values = values[checks]
+    limit = band * check_values
+    exceeded = np.zeros(check_values.shape, dtype=bool)
+    for col in np.flatnonzero(block_holdings.any(axis=0) | block_weights.any(axis=0)):
+        amounts = np.outer(relative[checks, col], block_holdings[:, col])
+        exceeded |= np.abs(amounts - check_values * block_weights[:, col]) > limit
+    triggered = exceeded.any(axis=0)
+
+    quiet = ~triggered
+    if quiet.any():
+        stats.update(values[:, quiet], rows[quiet])
+        holdings[rows[quiet]] = block_holdings[quiet] * relative[-1]
+    if not triggered.any():
+        return
+    first = checks[exceeded.argmax(axis=0)]
+    for offset in np.unique(first[triggered]):
+        selected = triggered & (first == offset)
+        subset = rows[selected]
+        stats.update(values[:offset + 1, selected], subset)
+        holdings[subset] = block_holdings[selected] * relative[offset]
+        stats.rebalance(holdings, weights, subset)
+        if start + offset + 1 < end:
+            _advance_threshold(stats, holdings, weights, subset, prices, start + offset + 1, end, is_check, band)
+
+def run_backtest(weights, prices, dates, mode="calendar", frequency="M", band=DEFAULT_BAND):
+    """
+    Portföyleri geçmiş fiyatlar üzerinde simüle eder.
+
+    Args:
+        weights: (portföy, varlık) hedef ağırlıkları (satır toplamları 1)
+        prices: (gün, varlık) TL fiyatları; ağırlığı olan varlıklarda boş değer olmamalı
+        dates: (gün,) datetime64[D] tarihleri
+        mode: 'none', 'calendar' veya 'threshold'
+        frequency: Takvim dengeleme dönemi veya eşik kontrol sıklığı (D, W, M, Q, Y)
+        band: Eşik dengelemede izin verilen mutlak ağırlık sapması
+
+    Returns:
+        dict: 'cagr', 'volatility', 'max_drawdown', 'turnover' (yıllık), 'rebalances',
+              'final_value' (başlangıç = 1) dizileri ile 'years' ve 'days'
+    """
+    portfolios = len(weights)
+    rows = np.arange(portfolios)
+    # Ağırlığı olmayan varlıkların fiyatı boş olabilir
+    prices = np.where(np.isnan(prices), 1.0, prices)
+    holdings = weights.copy()
+    stats = PathStats(portfolios)
+
+    # Hesaplama blokları en fazla bir ay sürer; eşik dengelemede kontrol günleri
+    # blok içinde ayrıca işaretlenir
+    if mode == "calendar":
+        ends = period_ends(dates, frequency)
+    elif frequency == "D":
+        ends = period_ends(dates, "M")
+    else:
+        ends = np.union1d(period_ends(dates, "M"), period_ends(dates, frequency))
+    is_check = np.zeros(len(dates), dtype=bool)
+    is_check[period_ends(dates, frequency)] = True
+
+    start = 0
+    for end in ends:
+        if end == start:
+            continue
+        if mode == "threshold":
+            _advance_threshold(stats, holdings, weights, rows, prices, start, end, is_check, band)
+        else:
+            relative = prices[start + 1:end + 1] / prices[start]
+            stats.update(relative @ holdings.T, rows)
+            holdings *= relative[-1]
+            if mode == "calendar":
+                stats.rebalance(holdings, weights, rows)
+        start = end
+
+    days = len(dates) - 1
+    years = (dates[-1] - dates[0]).astype(np.int64) / DAYS_PER_YEAR if days > 0 else 0
+    periods_per_year = days / years if years > 0 else 0
+    mean = stats.return_sum / days if days else stats.return_sum
+    variance = np.maximum(stats.return_square_sum / days - mean * mean, 0) if days else stats.return_square_sum
+    return {
+        'cagr': stats.value ** (1 / years) - 1 if years > 0 else np.zeros(portfolios),
+        'volatility': np.sqrt(variance * periods_per_year),
+        'max_drawdown': stats.max_drawdown,
+        'turnover': stats.traded / years if years > 0 else stats.traded,
+        'rebalances': stats.rebalances,
+        'final_value': stats.value,
+        'years': years,
+        'days': days
+    }
+
+def compile_targets(people, table, available):
+    """
+    Kişilerin hedef ağırlıklarını normalize eder. Fiyatı olmayan bir varlığa ağırlık
+    veren veya hedefi boş olan kişiler ayrılır.
+
+    Returns:
+        tuple: (ağırlık matrisi, dahil edilen kişi indeksleri, {kişi adı: eksik varlıklar})
+    """
+    weights = pack_weights([person.get('target_portfolio') or {} for person in people], table)
+    missing_prices = (weights > 0) & ~available
+    totals = weights.sum(axis=1)
+    included = ~missing_prices.any(axis=1) & (totals > 0)
+
+    skipped = {}
+    for row in np.flatnonzero(~included):
+        assets = [table['names'][col] for col in np.flatnonzero(missing_prices[row])]
+        skipped[people[row].get('name', '')] = assets
+    rows = np.flatnonzero(included)
+    return weights[rows] / totals[rows, None], rows, skipped
+
+def synthetic_price_history(asset_info, years, seed=0):
+    """
+    asset_info beklenen getiri ve oynaklıklarından rastgele günlük fiyat serisi
+    üretir. Yalnızca denemeler ve performans ölçümü içindir; gerçek geçmiş değildir.
+    """
+    rng = np.random.default_rng(seed)
+    dates = np.arange(np.datetime64('2000-01-03'), np.datetime64('2000-01-03') + int(years * DAYS_PER_YEAR))
+    dates = dates[np.is_busday(dates)]
+    steps = 1 / 252
+    columns = [FX_COLUMN]
+    drifts = [asset_info.get(USD_TRY_ASSET, {}).get('expected_percentage_return', 0.2)]
+    vols = [asset_info.get(USD_TRY_ASSET, {}).get('volatility', 0.15)]
+    for name, info in asset_info.items():
+        if name == USD_TRY_ASSET:
+            continue
+        columns.append(name)
+        drifts.append(info.get('expected_percentage_return', 0))
+        vols.append(info.get('volatility', 0.2))
+    drifts = np.log1p(np.array(drifts))
+    vols = np.array(vols)
+    shocks = rng.standard_normal((len(dates) - 1, len(columns))) * vols * np.sqrt(steps)
+    log_prices = np.vstack([np.zeros(len(columns)), np.cumsum((drifts - vols ** 2 / 2) * steps + shocks, axis=0)])
+    return {'dates': dates, 'columns': columns, 'prices': 100 * np.exp(log_prices)}
+
+def show_backtest(names, result, limit=20):
+    print("\n" + "=" * 100)
+    print(f"GERİYE DÖNÜK TEST ({result['years']:.1f} yıl, {result['days']} gün)".center(100))
+    print("=" * 100)
+    print(f"{'KİŞİ':<35} | {'CAGR':>8} | {'OYNAKLIK':>9} | {'MAKS. DÜŞÜŞ':>11} | {'DEVİR/YIL':>9} | {'DENGELEME':>9}")
+    print("-" * 100)
+    for row, name in enumerate(names[:limit]):
+        print(f"{name[:35]:<35} | %{result['cagr'][row] * 100:>7.2f} | %{result['volatility'][row] * 100:>8.2f} | "
+              f"%{result['max_drawdown'][row] * 100:>10.2f} | %{result['turnover'][row] * 100:>8.2f} | "
+              f"{result['rebalances'][row]:>9}")
+    if len(names) > limit:
+        print(f"... ve {len(names) - limit} kişi daha")
+        print("-" * 100)
+        for label, func in (("Medyan", np.median), ("Ortalama", np.mean)):
+            print(f"{label:<35} | %{func(result['cagr']) * 100:>7.2f} | %{func(result['volatility']) * 100:>8.2f} | "
+                  f"%{func(result['max_drawdown']) * 100:>10.2f} | %{func(result['turnover']) * 100:>8.2f} | "
+                  f"{func(result['rebalances']):>9.1f}")
+    print("=" * 100)
+
+def save_backtest(file_path, names, result):
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "cagr", "volatility", "max_drawdown", "turnover", "rebalances", "final_value"])
+        writer.writerows(
+            (name, result['cagr'][row], result['volatility'][row], result['max_drawdown'][row],
+             result['turnover'][row], int(result['rebalances'][row]), result['final_value'][row])
+            for row, name in enumerate(names)
+        )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hedef portföyleri geçmiş fiyatlar üzerinde test eder.")
+    parser.add_argument("--prices", default=PRICE_HISTORY_FILE, help="Fiyat geçmişi CSV dosyası")
+    parser.add_argument("--synthetic", type=float, metavar="YIL",
+                        help="Fiyat dosyası yerine asset_info'dan üretilen N yıllık sentetik seri kullan")
+    parser.add_argument("--rebalance", choices=REBALANCE_MODES, default="calendar", help="Yeniden dengeleme kuralı")
+    parser.add_argument("--frequency", choices=tuple(FREQUENCIES), default="M",
+                        help="Takvim dengeleme dönemi veya eşik kontrol sıklığı")
+    parser.add_argument("--band", type=float, default=DEFAULT_BAND, help="Eşik dengeleme bandı (ör. 0.05)")
+    parser.add_argument("--since", help="Başlangıç tarihi (YYYY-MM-DD)")
+    parser.add_argument("--until", help="Bitiş tarihi (YYYY-MM-DD)")
+    parser.add_argument("--all", action="store_true", help="Tüm kişileri test et")
+    parser.add_argument("--output", help="Sonuçları bu CSV dosyasına yaz (varsayılan: ../reports/backtest/)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    from comparison_report import select_person
+
+    args = parse_args()
+    people_list = get_storage().load_people()
+    try:
+        asset_info = load_json(ASSET_FILE)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Hata: Veri dosyası okunamadı ({e}).")
+        asset_info = None
+    if people_list is None or asset_info is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    normalize_people(people_list, asset_info)
+
+    if args.synthetic:
+        history = synthetic_price_history(asset_info, args.synthetic)
+    else:
+        try:
+            history = load_price_history(args.prices)
+        except FileNotFoundError:
+            sys.exit(f"Hata: '{args.prices}' bulunamadı. Fiyat geçmişi için --prices veya --synthetic kullanın.")
+        except ValueError as e:
+            sys.exit(f"Hata: {e}")
+
+    mask = np.ones(len(history['dates']), dtype=bool)
+    if args.since:
+        mask &= history['dates'] >= np.datetime64(args.since, 'D')
+    if args.until:
+        mask &= history['dates'] <= np.datetime64(args.until, 'D')
+    if mask.sum() < 2:
+        sys.exit("Hata: Seçilen aralıkta en az iki günlük fiyat olmalı.")
+
+    if not args.all:
+        selected_person = select_person(people_list)
+        if not selected_person:
+            sys.exit()
+        people_list = [selected_person]
+
+    table = get_asset_table(asset_info)
+    prices, available = tl_price_matrix(history, table)
+    prices = prices[mask]
+    dates = history['dates'][mask]
+    # Aralık başında fiyatı olmayan varlıklar test edilemez
+    available &= ~np.isnan(prices[0])
+
+    weights, rows, skipped = compile_targets(people_list, table, available)
+    for name, assets in list(skipped.items())[:10]:
+        reason = f"fiyat geçmişi olmayan varlıklar: {', '.join(assets)}" if assets else "hedef portföy boş"
+        print(f"UYARI: '{name}' test edilemedi ({reason}).")
+    if len(skipped) > 10:
+        print(f"UYARI: {len(skipped) - 10} kişi daha test edilemedi.")
+    if len(rows) == 0:
+        sys.exit("Hata: Test edilebilecek kişi bulunamadı.")
+
+    start = time.perf_counter()
+    result = run_backtest(weights, prices, dates, args.rebalance, args.frequency, args.band)
+    elapsed = time.perf_counter() - start
+
+    names = [people_list[row].get('name', '') for row in rows]
+    show_backtest(names, result)
+    print(f"Kişi: {len(names)} | Kural: {args.rebalance} ({args.frequency}) | Süre: {elapsed:.2f} sn")
+
+    if args.all or args.output:
+        output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"backtest_{time.strftime('%Y%m%d_%H%M%S')}.csv")
+        save_backtest(output, names, result)
+        print(f"Sonuçlar kaydedildi: {os.path.abspath(output)}")
@@ -0,0 +1,352 @@
+"""
+Batch Report Runner
+people.json içindeki tüm kişiler (veya filtrelenmiş bir alt küme) için raporları
+etkileşimsiz olarak, bir süreç havuzu üzerinde üreten modül.
+
+Raporlar metin, CSV, JSON veya HTML olarak üretilebilir (--format). --combined ile
+kişi başına dosya yerine tüm raporlar tamponlu olarak tek bir dosyaya yazılır.
+
+Kullanım:
+    python batch_report.py --workers 4 --chunk-size 50
+    python batch_report.py --report target --match "Akyol" --output ../reports
+    python batch_report.py --format csv --combined
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+
+from comparison_report import (
+    load_file,
+    build_comparison_report,
+    build_us_sector_analysis,
+    ASSET_FILE
+)
+from current_portfolio import build_portfolio_report
+from target_portfolio import validate_portfolio_percentages, build_target_reports
+from report_renderer import (
+    FORMATS,
+    COMBINED_EXTENSIONS,
+    FILE_EXTENSIONS,
+    ReportWriter,
+    make_report,
+    register_text_template,
+    render,
+    render_part
+)
+from monte_carlo import load_simulation_config
+from portfolio_engine import SCENARIOS, current_distribution, evaluate_people, normalize_people
+from storage import get_storage
+
+REPORT_TYPES = ("comparison", "target", "current")
+DEFAULT_OUTPUT_DIR = "../reports"
+DEFAULT_CHUNK_SIZE = 100
+
+# İşçi süreçlerde bir kez yüklenen ortak veriler
+_worker_state = {}
+
+def _init_worker(asset_info, sim_config, report_type, output_dir, fmt="text", combined=False):
+    _worker_state.update(
+        asset_info=asset_info,
+        sim_config=sim_config,
+        report_type=report_type,
+        output_dir=output_dir,
+        fmt=fmt,
+        combined=combined
+    )
+
+def report_file_name(index, name, fmt="text"):
+    """
+    Kişi adından dosya sistemi için güvenli, sıra numaralı bir dosya adı üretir.
+    """
+    safe_name = re.sub(r'[^\w\-]+', '_', name, flags=re.UNICODE).strip('_') or 'person'
+    return f"{index:06d}_{safe_name}.{FILE_EXTENSIONS[fmt]}"
+
+def message_report(name, message):
+    """
+    Rapor yerine gösterilecek uyarı/hata metnini rapor belgesi olarak hazırlar.
+    """
+    return make_report("message", name, {'name': name, 'message': message}, [])
+
+register_text_template("message", lambda report: [report['fields']['message']])
+
+def build_person_reports(person, asset_info, report_type, sim_config=None):
+    """
+    Bir kişinin seçilen rapor tipindeki rapor belgelerini hazırlar.
+
+    Returns:
+        tuple: (rapor belgeleri listesi, rapor üretilebildiyse True)
+    """
+    name = person.get('name', '')
+    principal = person.get('principal', 0)
+    target_dist = person.get('target_portfolio')
+    current_dist = current_distribution(person)
+
+    if report_type == "comparison":
+        if not (current_dist and target_dist):
+            return [message_report(name, "\nMevcut ve/veya hedef portföy bilgileri eksik.")], False
+        reports = [build_comparison_report(name, principal, current_dist, target_dist, asset_info, sim_config)]
+        sector_report = build_us_sector_analysis(name, principal, target_dist)
+        if sector_report is not None:
+            reports.append(sector_report)
+        return reports, True
+
+    if report_type == "target":
+        if not (target_dist and validate_portfolio_percentages(target_dist)):
+            return [message_report(name, f"\nPortfolio configuration for {name} is invalid. No operation performed.")], False
+        return build_target_reports(name, principal, target_dist, asset_info), True
+
+    if principal <= 0:
+        return [message_report(name, "Toplam portföy tutarı sıfır. Hesaplama yapılamıyor.")], False
+    amounts = person.get('current_portfolio_amount', {})
+    return [build_portfolio_report(name, (principal, amounts, current_dist), asset_info)], True
+
+def person_reports(person, asset_info, report_type, sim_config=None):
+    """
+    build_person_reports sırasında ekrana yazılan uyarıları da yakalayıp raporların
+    başına ekler; böylece uyarılar ilgili kişinin çıktısında kalır.
+    """
+    notes = io.StringIO()
+    with contextlib.redirect_stdout(notes):
+        reports, ok = build_person_reports(person, asset_info, report_type, sim_config)
+    if notes.getvalue():
+        message = notes.getvalue()[:-1] if notes.getvalue().endswith("\n") else notes.getvalue()
+        reports.insert(0, message_report(person.get('name', ''), message))
+    return reports, ok
+
+def render_person_report(person, asset_info, report_type, sim_config=None, fmt="text"):
+    """
+    Bir kişinin raporunu ekrana yazdırmak yerine verilen biçimde metin olarak döndürür.
+
+    Returns:
+        tuple: (rapor metni, rapor üretilebildiyse True)
+    """
+    reports, ok = person_reports(person, asset_info, report_type, sim_config)
+    return render(reports, fmt), ok
+
+def summarize_chunk(chunk, asset_info, results):
+    """
+    Bir kişi grubunun risk ve senaryo getirilerini tek matris işlemiyle hesaplayarak
+    özet satırlarını oluşturur.
+    """
+    evaluation = evaluate_people([person for _, person in chunk], asset_info)
+    report_files = {index: (file_name, ok) for index, file_name, ok in results}
+
+    rows = []
+    for row, (index, person) in enumerate(chunk):
+        file_name, ok = report_files.get(index, (None, False))
+        rows.append({
+            'index': index,
+            'name': person.get('name', ''),
+            'principal': float(evaluation['principal'][row]),
+            'report_file': file_name,
+            'ok': ok,
+            'current_risk': float(evaluation['current']['risk'][row]),
+            'target_risk': float(evaluation['target']['risk'][row]),
+            'current_returns': dict(zip(SCENARIOS, evaluation['current']['returns'][row].tolist())),
+            'target_returns': dict(zip(SCENARIOS, evaluation['target']['returns'][row].tolist()))
+        })
+    return rows
+
+def _process_chunk(chunk):
+    """
+    Bir kişi grubunun raporlarını üretir ve özet satırlarını döndürür. Raporlar
+    kişi başına dosyalara yazılır; birleşik çıktıda ise grubun tüm raporları tek
+    bir metin olarak ana sürece döndürülür.
+    Süreç havuzunda çalışabilmesi için modül seviyesinde tanımlanmıştır.
+
+    Returns:
+        tuple: (özet satırları, birleşik çıktı metni veya None)
+    """
+    # Takma adlar çevrilir; bilinmeyen anahtarlar her işçide tekrar yazdırılmaz
+    people = [person for _, person in chunk]
+    normalize_people(people, _worker_state['asset_info'], report=False)
+    chunk = [(index, person) for (index, _), person in zip(chunk, people)]
+    fmt = _worker_state['fmt']
+    results = []
+    parts = []
+    for index, person in chunk:
+        reports, ok = person_reports(
+            person,
+            _worker_state['asset_info'],
+            _worker_state['report_type'],
+            _worker_state['sim_config']
+        )
+        if _worker_state['combined']:
+            parts.append(render_part(reports, fmt))
+            file_name = None
+        else:
+            file_name = report_file_name(index, person.get('name', ''), fmt)
+            with open(os.path.join(_worker_state['output_dir'], file_name), 'w', encoding='utf-8') as f:
+                f.write(render(reports, fmt))
+        results.append((index, file_name, ok))
+    combined_text = "".join(parts) if _worker_state['combined'] else None
+    return summarize_chunk(chunk, _worker_state['asset_info'], results), combined_text
+
+def filter_people(people, names=None, match=None):
+    """
+    Kişileri tam ad listesine ve/veya ad içinde geçen metne göre filtreler.
+    Girdi bir üreteç olabilir; kişiler okundukça tek tek döndürülür.
+
+    Yields:
+        tuple: (kaynak dosyadaki sıra, kişi) ikilisi
+    """
+    name_set = set(names) if names else None
+    match_lower = match.lower() if match else None
+    for index, person in enumerate(people):
+        name = person.get('name', '')
+        if name_set is not None and name not in name_set:
+            continue
+        if match_lower is not None and match_lower not in name.lower():
+            continue
+        yield index, person
+
+def chunked(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def run_batch(people, asset_info, report_type="comparison", output_dir=DEFAULT_OUTPUT_DIR,
+              workers=None, chunk_size=DEFAULT_CHUNK_SIZE, names=None, match=None, sim_config=None,
+              fmt="text", combined=False):
+    """
+    Seçilen kişilerin raporlarını üretir. Kişi başına özet satırları summary.jsonl
+    dosyasına geldikçe yazılır, toplu özet summary.json olarak kaydedilir.
+
+    people bir liste ya da storage.iter_people gibi bir üreteç olabilir. Aynı anda
+    en fazla işçi sayısının iki katı kadar parça bellekte tutulur, böylece büyük
+    kişi dosyaları sabit bellekle ve ilk parçadan itibaren hemen işlenir. Parçalar
+    hangi sırada biterse bitsin summary.jsonl ve birleşik dosya kişi sırasıyla yazılır.
+
+    Args:
+        people: Kişi listesi veya kişi üreteci
+        asset_info: asset_info.json içeriği
+        report_type: "comparison", "target" veya "current"
+        output_dir: Rapor dosyalarının yazılacağı klasör
+        workers: Süreç havuzu boyutu (None veya 1 ise tek süreç)
+        chunk_size: Her işçi görevine verilecek kişi sayısı
+        names: Sadece bu adlara sahip kişiler işlenir
+        match: Sadece adında bu metin geçen kişiler işlenir
+        sim_config: Verilirse karşılaştırma raporlarına Monte Carlo tablosu eklenir
+        fmt: Rapor biçimi ("text", "csv", "json" veya "html")
+        combined: True ise tüm raporlar tek bir book.<uzantı> dosyasına yazılır
+
+    Returns:
+        dict: Toplu özet ve 'elapsed_seconds', 'people_per_second' alanları
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    chunks = chunked(filter_people(people, names, match), max(1, chunk_size))
+    init_args = (asset_info, sim_config, report_type, output_dir, fmt, combined)
+
+    summary = {
+        'people': 0,
+        'failed': 0,
+        'total_principal': 0.0,
+        'book_expected_value': {'current': 0.0, 'target': 0.0}
+    }
+
+    start = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        rows_file = stack.enter_context(open(os.path.join(output_dir, "summary.jsonl"), 'w', encoding='utf-8'))
+        writer = None
+        if combined:
+            book_file = stack.enter_context(
+                open(os.path.join(output_dir, f"book.{COMBINED_EXTENSIONS[fmt]}"), 'w', encoding='utf-8', newline='')
+            )
+            writer = stack.enter_context(ReportWriter(book_file, fmt))
+
+        def collect(result):
+            rows, combined_text = result
+            if writer is not None:
+                writer.write_rendered(combined_text)
+            for row in rows:
+                summary['people'] += 1
+                summary['failed'] += 0 if row['ok'] else 1
+                summary['total_principal'] += row['principal']
+                for key in ('current', 'target'):
+                    summary['book_expected_value'][key] += row['principal'] * (1 + row[f'{key}_returns']['base'])
+                rows_file.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+        if workers and workers > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args) as executor:
+                # Biten parçalar sıra numarasıyla bekletilir, sıradaki parça geldikçe yazılır
+                pending, finished = {}, {}
+                next_position = 0
+
+                def drain(return_when):
+                    nonlocal next_position
+                    done, _ = wait(pending, return_when=return_when)
+                    for future in done:
+                        finished[pending.pop(future)] = future.result()
+                    while next_position in finished:
+                        collect(finished.pop(next_position))
+                        next_position += 1
+
+                for position, chunk in enumerate(chunks):
+                    pending[executor.submit(_process_chunk, chunk)] = position
+                    while len(pending) + len(finished) >= workers * 2:
+                        drain(FIRST_COMPLETED)
+                while pending:
+                    drain(FIRST_COMPLETED)
+        else:
+            _init_worker(*init_args)
+            for chunk in chunks:
+                collect(_process_chunk(chunk))
+
+    elapsed = time.perf_counter() - start
+    summary['elapsed_seconds'] = elapsed
+    summary['people_per_second'] = summary['people'] / elapsed if elapsed > 0 else 0.0
+
+    with open(os.path.join(output_dir, "summary.json"), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=4)
+    return summary
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="people.json içindeki kişiler için toplu rapor üretir.")
+    parser.add_argument("--report", choices=REPORT_TYPES, default="comparison", help="Rapor tipi")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="Rapor klasörü")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="İşçi süreç sayısı")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Görev başına kişi sayısı")
+    parser.add_argument("--name", action="append", dest="names", help="Sadece bu kişiyi işle (tekrarlanabilir)")
+    parser.add_argument("--match", help="Sadece adında bu metin geçen kişileri işle")
+    parser.add_argument("--monte-carlo", action="store_true", help="Karşılaştırma raporlarına Monte Carlo tablosu ekle")
+    parser.add_argument("--format", choices=FORMATS, default="text", help="Rapor biçimi")
+    parser.add_argument("--combined", action="store_true", help="Tüm raporları tek bir dosyaya yaz")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    people_iter = get_storage().iter_people()
+    asset_info = load_file(ASSET_FILE)
+    if people_iter is None or asset_info is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    sim_config = load_simulation_config() if args.monte_carlo else None
+
+    summary = run_batch(
+        people_iter,
+        asset_info,
+        report_type=args.report,
+        output_dir=args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        names=args.names,
+        match=args.match,
+        sim_config=sim_config,
+        fmt=args.format,
+        combined=args.combined
+    )
+
+    print(f"İşlenen kişi: {summary['people']} (hatalı: {summary['failed']})")
+    print(f"Toplam ana para: {summary['total_principal']:,.2f} TL")
+    print(f"Raporlar: {os.path.abspath(args.output)}")
+    print(f"Süre: {summary['elapsed_seconds']:.2f} sn | Hız: {summary['people_per_second']:,.1f} kişi/sn")
@@ -0,0 +1,298 @@
+"""
+Benchmark Suite
+Sentetik people.json / asset_info.json verisi üreterek araçların farklı boyutlarda
+(1 bin - 1 milyon kişi, 10 - 500 varlık) nasıl ölçeklendiğini ölçen modül.
+
+Ölçülen aşamalar: veri yükleme, anahtar doğrulama, PeopleBook'a dönüştürme, kişi başına
+calculate_portfolio_risk / calculate_portfolio_return, tüm kitap için senaryo
+analizi, sektör dağılımı ve rapor üretimi. Her aşamanın süresi ve (tracemalloc
+ile) en yüksek bellek kullanımı JSON olarak kaydedilir; --baseline ile önceki bir
+sonuç dosyası verilirse aşama süreleri karşılaştırılır.
+
+Kullanım:
+    python benchmark.py --people 1000 10000 --assets 10 100
+    python benchmark.py --people 1000000 --assets 10 --sample 2000 --no-memory
+    python benchmark.py --people 10000 --baseline ../reports/benchmarks/onceki.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from batch_report import render_person_report
+from comparison_report import calculate_portfolio_risk, calculate_portfolio_return
+from data_store import ASSET_FILE, invalidate, load_json, load_sector_config
+from models import AssetUniverse, PeopleBook
+from portfolio_engine import current_distribution, evaluate_people, normalize_people
+from storage import JsonStorage
+from us_sector_calculator import calculate_us_sector_allocation
+
+DEFAULT_OUTPUT_DIR = "../reports/benchmarks"
+DEFAULT_SAMPLE = 10_000
+DEFAULT_HOLDINGS = 10
+REGRESSION_RATIO = 1.2
+
+def generate_asset_info(n_assets, seed=0):
+    """
+    Sentetik asset_info sözlüğü üretir. İlk varlıklar gerçek asset_info.json'dan
+    alınır (kur birleştirme gibi özel durumlar korunur), kalanlar rastgele üretilir.
+    """
+    rng = np.random.default_rng(seed)
+    base = load_json(ASSET_FILE) or {}
+    asset_info = {name: info for name, info in list(base.items())[:n_assets]}
+
+    for i in range(len(asset_info), n_assets):
+        expected = float(rng.uniform(-0.05, 0.6))
+        asset_info[f"Synthetic Asset {i:03d}"] = {
+            "risk_score": int(rng.integers(1, 11)),
+            "expected_percentage_return": round(expected, 4),
+            "bad_scenario_return": round(expected - float(rng.uniform(0.1, 0.6)), 4),
+            "good_scenario_return": round(expected + float(rng.uniform(0.05, 0.8)), 4),
+            "is_usd_based": bool(rng.random() < 0.4),
+            "volatility": round(float(rng.uniform(0.01, 0.9)), 4),
+            "distribution": "lognormal" if rng.random() < 0.5 else "normal"
+        }
+    return asset_info
+
+def generate_people(n_people, asset_info, holdings=DEFAULT_HOLDINGS, seed=0):
+    """
+    Her kişinin rastgele seçilmiş en fazla `holdings` varlıkta tutarı ve hedef
+    ağırlığı bulunan sentetik kişi listesi üretir.
+    """
+    rng = np.random.default_rng(seed + 1)
+    names = list(asset_info.keys())
+    per_person = min(holdings, len(names))
+
+    people = []
+    for i in range(n_people):
+        assets = rng.choice(len(names), size=per_person, replace=False)
+        amounts = np.round(rng.lognormal(9, 1.2, per_person), 2)
+        targets = rng.dirichlet(np.ones(per_person)).round(6)
+        targets[-1] = round(1 - targets[:-1].sum(), 6)
+        people.append({
+            "name": f"Synthetic Person {i:07d}",
+            "risk_score": round(float(rng.uniform(1, 10)), 1),
+            "principal": float(amounts.sum()),
+            "target_portfolio": {names[a]: float(t) for a, t in zip(assets, targets)},
+            "current_portfolio_amount": {names[a]: float(v) for a, v in zip(assets, amounts)}
+        })
+    return people
+
+def write_synthetic_data(directory, n_people, n_assets, holdings=DEFAULT_HOLDINGS, seed=0):
+    """
+    Sentetik veriyi klasöre people.json ve asset_info.json olarak yazar.
+
+    Returns:
+        tuple: (people.json yolu, asset_info.json yolu)
+    """
+    os.makedirs(directory, exist_ok=True)
+    asset_info = generate_asset_info(n_assets, seed)
+    people = generate_people(n_people, asset_info, holdings, seed)
+    people_path = os.path.join(directory, "people.json")
+    asset_path = os.path.join(directory, "asset_info.json")
+    with open(asset_path, 'w', encoding='utf-8') as f:
+        json.dump(asset_info, f, ensure_ascii=False, indent=2)
+    with open(people_path, 'w', encoding='utf-8') as f:
+        json.dump(people, f, ensure_ascii=False)
+    return people_path, asset_path
+
+def measure(function, items, memory=True):
+    """
+    Fonksiyonu çalıştırıp süresini ölçer; memory True ise ikinci bir çalıştırmada
+    tracemalloc ile en yüksek bellek kullanımını ölçer (izleme süreyi etkilemesin diye).
+
+    Returns:
+        tuple: (aşama sonucu, ölçüm sözlüğü)
+    """
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+
+    stage = {
+        'seconds': seconds,
+        'items': items,
+        'items_per_second': items / seconds if items and seconds > 0 else None,
+        'peak_memory_mb': None
+    }
+    if memory:
+        tracemalloc.start()
+        function()
+        stage['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return result, stage
+
+def run_benchmark(people_path, asset_path, sample=DEFAULT_SAMPLE, memory=True):
+    """
+    Verilen veri dosyaları üzerinde tüm aşamaları ölçer.
+
+    Returns:
+        dict: aşama adı -> ölçüm sözlüğü
+    """
+    stages = {}
+
+    def load_people():
+        invalidate(people_path)
+        return JsonStorage(people_path).load_people()
+
+    def load_asset_info():
+        invalidate(asset_path)
+        return load_json(asset_path)
+
+    people, stages['load_people'] = measure(load_people, None, memory)
+    stages['load_people']['items'] = len(people)
+    stages['load_people']['items_per_second'] = len(people) / stages['load_people']['seconds']
+    asset_info, stages['load_asset_info'] = measure(load_asset_info, 1, memory)
+
+    _, stages['normalize_people'] = measure(lambda: normalize_people(people, asset_info, report=False),
+                                            len(people), memory)
+
+    _, stages['people_book'] = measure(lambda: PeopleBook.from_people(people, AssetUniverse(asset_info)),
+                                       len(people), memory)
+
+    subset = people[:sample]
+    current_dists = [current_distribution(p) for p in subset]
+
+    def risk_and_return():
+        for person, current_dist in zip(subset, current_dists):
+            calculate_portfolio_risk(current_dist, asset_info)
+            calculate_portfolio_return(current_dist, asset_info)
+            calculate_portfolio_risk(person['target_portfolio'], asset_info)
+            calculate_portfolio_return(person['target_portfolio'], asset_info)
+
+    _, stages['risk_return_per_person'] = measure(risk_and_return, len(subset), memory)
+    _, stages['scenario_analysis'] = measure(lambda: evaluate_people(people, asset_info), len(people), memory)
+
+    sector_config = load_sector_config()
+
+    def sector_allocation():
+        for person in subset:
+            us_percent = person['target_portfolio'].get('Foreign Stocks', 0)
+            calculate_us_sector_allocation(person['principal'], us_percent, sector_config)
+
+    _, stages['sector_allocation'] = measure(sector_allocation, len(subset), memory)
+
+    def render_reports():
+        return sum(len(render_person_report(person, asset_info, "comparison")[0]) for person in subset)
+
+    _, stages['report_rendering'] = measure(render_reports, len(subset), memory)
+    return stages
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare_with_baseline(results, baseline):
+    """
+    Aynı boyuttaki çalıştırmaların aşama sürelerini önceki sonuçlarla karşılaştırır.
+    """
+    previous = {(run['people'], run['assets']): run for run in baseline.get('runs', [])}
+    print("\n" + "=" * 78)
+    print(f"KARŞILAŞTIRMA (önceki: {baseline.get('revision') or '-'})".center(78))
+    print("=" * 78)
+    print(f"{'BOYUT':<16} | {'AŞAMA':<24} | {'ÖNCE (sn)':>10} | {'ŞİMDİ (sn)':>10} | {'ORAN':>6}")
+    print("-" * 78)
+    for run in results['runs']:
+        old = previous.get((run['people'], run['assets']))
+        if old is None:
+            continue
+        size = f"{run['people']}x{run['assets']}"
+        for stage, values in run['stages'].items():
+            old_stage = old['stages'].get(stage)
+            if not old_stage or not old_stage['seconds']:
+                continue
+            ratio = values['seconds'] / old_stage['seconds']
+            flag = "  YAVAŞLAMA" if ratio > REGRESSION_RATIO else ""
+            print(f"{size:<16} | {stage:<24} | {old_stage['seconds']:>10.4f} | {values['seconds']:>10.4f} | {ratio:>6.2f}{flag}")
+    print("=" * 78)
+
+def show_results(run):
+    print("\n" + "=" * 78)
+    print(f"BENCHMARK: {run['people']:,} kişi x {run['assets']} varlık".center(78))
+    print("=" * 78)
+    print(f"{'AŞAMA':<24} | {'SÜRE (sn)':>10} | {'ADET':>10} | {'ADET/SN':>12} | {'BELLEK (MB)':>11}")
+    print("-" * 78)
+    for stage, values in run['stages'].items():
+        rate = f"{values['items_per_second']:,.0f}" if values['items_per_second'] else "-"
+        peak = f"{values['peak_memory_mb']:,.1f}" if values['peak_memory_mb'] is not None else "-"
+        print(f"{stage:<24} | {values['seconds']:>10.4f} | {values['items']:>10,} | {rate:>12} | {peak:>11}")
+    print("=" * 78)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Sentetik verilerle ölçeklenme testleri çalıştırır.")
+    parser.add_argument("--people", type=int, nargs="+", default=[1000], help="Kişi sayıları")
+    parser.add_argument("--assets", type=int, nargs="+", default=[10], help="Varlık sayıları")
+    parser.add_argument("--holdings", type=int, default=DEFAULT_HOLDINGS, help="Kişi başına varlık sayısı")
+    parser.add_argument("--sample", type=int, default=DEFAULT_SAMPLE, help="Kişi başına ölçülen aşamalardaki kişi sayısı")
+    parser.add_argument("--seed", type=int, default=0, help="Rastgele sayı tohumu")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="Sonuç ve sentetik veri klasörü")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--no-memory", action="store_true", help="Bellek ölçümünü atla")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = {
+        'revision': git_revision(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'sample': args.sample,
+        'holdings': args.holdings,
+        'runs': []
+    }
+
+    for n_assets in args.assets:
+        for n_people in args.people:
+            data_dir = os.path.join(args.output, "data", f"{n_people}x{n_assets}")
+            start = time.perf_counter()
+            people_path, asset_path = write_synthetic_data(data_dir, n_people, n_assets, args.holdings, args.seed)
+            generation_seconds = time.perf_counter() - start
+
+            run = {
+                'people': n_people,
+                'assets': n_assets,
+                'generation_seconds': generation_seconds,
+                'stages': run_benchmark(people_path, asset_path, args.sample, not args.no_memory)
+            }
+            results['runs'].append(run)
+            show_results(run)
+            invalidate()
+
+    # ru_maxrss Linux'ta KB, macOS'ta bayt cinsindendir; Windows'ta ölçülmez
+    results['max_rss_mb'] = None
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        results['max_rss_mb'] = max_rss / 2 ** 20 if sys.platform == "darwin" else max_rss / 2 ** 10
+
+    output_file = os.path.join(args.output, f"benchmark_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output_file, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=4)
+    if results['max_rss_mb'] is not None:
+        print(f"\nEn yüksek bellek (RSS): {results['max_rss_mb']:,.1f} MB")
+    print(f"Sonuçlar: {os.path.abspath(output_file)}")
+
+    if args.baseline:
+        try:
+            with open(args.baseline, 'r', encoding='utf-8') as f:
+                compare_with_baseline(results, json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            print(f"Hata: '{args.baseline}' okunamadı.")
@@ -4,22 +4,44 @@ from us_sector_calculator import (
     load_sector_config, 
     validate_sector_percentages,
     calculate_us_sector_allocation,
-    get_sector_summary_table,
-    get_usd_rate
+    build_us_sector_report
 )
+from portfolio_engine import (
+    SCENARIOS,
+    get_asset_table,
+    pack_weights,
+    evaluate_weights,
+    normalize_people,
+    portfolio_risk,
+    portfolio_return
+)
+from monte_carlo import (
+    load_simulation_config,
+    simulate_person,
+    build_monte_carlo_section,
+    format_monte_carlo_lines
+)
+from risk_metrics import build_risk_sections, format_risk_metric_lines, format_risk_contribution_lines
+from projection import (
+    load_projection_config,
+    person_projection_config,
+    build_projection_section,
+    format_projection_lines
+)
+from report_renderer import make_report, make_section, get_section, register_text_template, emit
+from storage import get_storage
+from rebalancer import load_trading_config, rebalance_people, show_rebalance_plan
 
-PEOPLE_FILE = "../data/people.json"
-ASSET_FILE = "../data/asset_info.json"
-CURRENCY_FILE = "../data/currency.json"
+from profiler import configure as configure_profiler, stage
+from data_store import load_json, ASSET_FILE
 
 def load_file(file_path):
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if not content:
-                print(f"Hata: '{file_path}' dosyası boş.")
-                return [] if 'people.json' in file_path else {}
-            return json.loads(content)
+        data = load_json(file_path)
+        if data is None:
+            print(f"Hata: '{file_path}' dosyası boş.")
+            return [] if 'people.json' in file_path else {}
+        return data
     except FileNotFoundError:
         print(f"Hata: '{file_path}' bulunamadı. Lütfen dosya yolunu kontrol edin.")
         return None
@@ -46,142 +68,207 @@ def select_person(people):
             print("Geçersiz giriş. Lütfen bir sayı girin.")
 
 def calculate_portfolio_risk(portfolio_distribution, asset_info):
-    total_risk_score = 0
-    if not portfolio_distribution: return 0
-    for asset, percent in portfolio_distribution.items():
-        if asset in asset_info:
-            risk_score = asset_info[asset].get('risk_score', 0)
-            total_risk_score += percent * risk_score
-    return total_risk_score
+    return portfolio_risk(portfolio_distribution, get_asset_table(asset_info))
 
 def calculate_portfolio_return(portfolio_distribution, asset_info, scenario='base'):
-    if not portfolio_distribution: return 0
-    scenario_keys = {
-        "base": "expected_percentage_return",
-        "good": "good_scenario_return",
-        "bad": "bad_scenario_return"
-    }
-    key = scenario_keys.get(scenario, "expected_percentage_return")
-    total_return_percent = 0
-    usd_return_expectation = asset_info.get("USD TRY Based", {}).get(key, 0)
-    for asset, percent in portfolio_distribution.items():
-        if asset in asset_info:
-            asset_return = asset_info[asset].get(key, 0)
-            usd_based = asset_info[asset].get('is_usd_based', False)
-            if usd_based:
-                combined_return = (1 + asset_return) * (1 + usd_return_expectation) - 1
-                total_return_percent += percent * combined_return
-            else:
-                total_return_percent += percent * asset_return
-    return total_return_percent
+    return portfolio_return(portfolio_distribution, get_asset_table(asset_info), scenario)
 
-def show_scenario_analysis(principal, current_dist, target_dist, asset_info):
-    table_width = 95
-    print("\n" + "-"*table_width)
-    print("SENARYO ANALİZİ (Yıllık TL Bazlı Getiri ve Portföy Değeri)".center(table_width))
-    print("-" * table_width)
-    print(f"{'SENARYO':<15} | {'MEVCUT PORTFÖY':^35} | {'HEDEF PORTFÖY':^35}")
-    print(f"{'':<15} | {'% Getiri':^16} | {'Son Değer (TL)':>16} | {'% Getiri':^16} | {'Son Değer (TL)':>16}")
-    print("-" * table_width)
-
-    scenarios = [
-        ("Kötü Senaryo", "bad"),
-        ("Baz Senaryo", "base"),
-        ("İyi Senaryo", "good")
+SCENARIO_LABELS = [
+    ("Kötü Senaryo", "bad"),
+    ("Baz Senaryo", "base"),
+    ("İyi Senaryo", "good")
+]
+
+def build_scenario_section(principal, current_dist, target_dist, asset_info):
+    """
+    Mevcut ve hedef portföyün senaryo getirilerini rapor bölümü olarak hazırlar.
+    """
+    # Mevcut ve hedef portföyün tüm senaryoları tek matris işlemiyle hesaplanır
+    table = get_asset_table(asset_info)
+    results = evaluate_weights(pack_weights([current_dist, target_dist], table), table)
+
+    rows = []
+    for scenario_name, scenario_code in SCENARIO_LABELS:
+        current_return, target_return = results['returns'][:, SCENARIOS.index(scenario_code)]
+        rows.append({
+            'scenario': scenario_code,
+            'label': scenario_name,
+            'current_return': float(current_return),
+            'current_final': float(principal * (1 + current_return)),
+            'target_return': float(target_return),
+            'target_final': float(principal * (1 + target_return))
+        })
+    columns = [
+        ('label', 'Senaryo'),
+        ('current_return', 'Mevcut % Getiri'),
+        ('current_final', 'Mevcut Son Değer (TL)'),
+        ('target_return', 'Hedef % Getiri'),
+        ('target_final', 'Hedef Son Değer (TL)')
     ]
+    return make_section('scenarios', 'Senaryo Analizi', columns, rows)
 
-    for scenario_name, scenario_code in scenarios:
-        current_return = calculate_portfolio_return(current_dist, asset_info, scenario=scenario_code)
-        current_final = principal * (1 + current_return)
-        
-        target_return = calculate_portfolio_return(target_dist, asset_info, scenario=scenario_code)
-        target_final = principal * (1 + target_return)
-        
-        print(
-            f"{scenario_name:<15} | "
-            f"{current_return*100:^15.2f}% | {current_final:>16,.2f} | "
-            f"{target_return*100:^15.2f}% | {target_final:>16,.2f}"
+def format_scenario_lines(section):
+    table_width = 95
+    lines = [
+        "",
+        "-" * table_width,
+        "SENARYO ANALİZİ (Yıllık TL Bazlı Getiri ve Portföy Değeri)".center(table_width),
+        "-" * table_width,
+        f"{'SENARYO':<15} | {'MEVCUT PORTFÖY':^35} | {'HEDEF PORTFÖY':^35}",
+        f"{'':<15} | {'% Getiri':^16} | {'Son Değer (TL)':>16} | {'% Getiri':^16} | {'Son Değer (TL)':>16}",
+        "-" * table_width
+    ]
+    for row in section['rows']:
+        lines.append(
+            f"{row['label']:<15} | "
+            f"{row['current_return']*100:^15.2f}% | {row['current_final']:>16,.2f} | "
+            f"{row['target_return']*100:^15.2f}% | {row['target_final']:>16,.2f}"
         )
+    return lines
 
-def show_comparison_report(name, principal, current_dist, target_dist, asset_info):
-    table_width = 120
-    print("\n" + "="*table_width)
-    print(f"Kişi: {name}".center(table_width))
-    print(f"Ana Para: {principal:,.2f} TL".center(table_width))
-    print("="*table_width)
-    print("PORTFÖY DAĞILIM KARŞILAŞTIRMASI".center(table_width))
-    print("-" * table_width)
-    print(f"{'VARLIK':<20} | {'MEVCUT':^30} | {'HEDEF':^30} | {'DEĞİŞİM (Al/Sat)':^25}")
-    print("-" * table_width)
-
-    all_assets = set(current_dist.keys()) | set(target_dist.keys())
-    
-    for asset in sorted(list(all_assets)):
-        current_percent = current_dist.get(asset, 0)
-        current_amount = current_percent * principal
+def show_scenario_analysis(principal, current_dist, target_dist, asset_info):
+    section = build_scenario_section(principal, current_dist, target_dist, asset_info)
+    sys.stdout.write("\n".join(format_scenario_lines(section)) + "\n")
 
+def build_comparison_report(name, principal, current_dist, target_dist, asset_info, sim_config=None,
+                            projection_config=None):
+    """
+    Mevcut ve hedef portföy karşılaştırmasını rapor belgesi olarak hazırlar.
+    sim_config verilirse Monte Carlo bölümü, projection_config verilirse çok
+    yıllık projeksiyon bölümü de eklenir.
+    """
+    rows = []
+    for asset in sorted(set(current_dist.keys()) | set(target_dist.keys())):
+        current_percent = current_dist.get(asset, 0)
         target_percent = target_dist.get(asset, 0)
-        target_amount = target_percent * principal
-        
-        diff_amount = target_amount - current_amount
+        rows.append({
+            'asset': asset,
+            'current_amount': current_percent * principal,
+            'current_percent': current_percent,
+            'target_amount': target_percent * principal,
+            'target_percent': target_percent,
+            'diff_amount': (target_percent - current_percent) * principal
+        })
+    columns = [
+        ('asset', 'Varlık'),
+        ('current_amount', 'Mevcut (TL)'),
+        ('current_percent', 'Mevcut Oran'),
+        ('target_amount', 'Hedef (TL)'),
+        ('target_percent', 'Hedef Oran'),
+        ('diff_amount', 'Değişim (Al/Sat)')
+    ]
+    sections = [make_section('allocation', 'Portföy Dağılım Karşılaştırması', columns, rows)]
+    with stage("risk_metrics"):
+        sections += build_risk_sections(principal, current_dist, target_dist, asset_info)
+    with stage("scenarios"):
+        sections.append(build_scenario_section(principal, current_dist, target_dist, asset_info))
+    if sim_config:
+        with stage("monte_carlo"):
+            summary = simulate_person(principal, current_dist, target_dist, asset_info, sim_config)
+            sections.append(build_monte_carlo_section(summary, principal))
+    if projection_config:
+        with stage("projection"):
+            sections.append(build_projection_section(principal, current_dist, target_dist, asset_info,
+                                                     projection_config))
 
-        current_str = f"{current_amount:,.2f} TL (%{current_percent*100:.1f})"
-        target_str = f"{target_amount:,.2f} TL (%{target_percent*100:.1f})"
-        diff_str = f"{diff_amount:+,.2f} TL" if abs(diff_amount) > 0.01 else ""
-        
-        print(f"{asset:<20} | {current_str:>30} | {target_str:>30} | {diff_str:>25}")
-
-    print("-" * table_width)
-    
-    current_risk = calculate_portfolio_risk(current_dist, asset_info)
-    target_risk = calculate_portfolio_risk(target_dist, asset_info)
-
-    current_total_str = f"Toplam: {principal:,.2f} TL"
-    target_total_str = f"Toplam: {principal:,.2f} TL"
-    print(f"{'':<20} | {current_total_str:>30} | {target_total_str:>30} | {'':>25}")
-    
-    current_risk_str = f"Ort. Risk: {current_risk:.2f}/10"
-    target_risk_str = f"Ort. Risk: {target_risk:.2f}/10"
-    print(f"{'RİSK SKORU':<20} | {current_risk_str:>30} | {target_risk_str:>30} | {'':>25}")
-    
-    show_scenario_analysis(principal, current_dist, target_dist, asset_info)
-    print("=" * table_width)
+    return make_report("comparison", f"Kişi: {name}", {
+        'name': name,
+        'principal': principal,
+        'current_risk': calculate_portfolio_risk(current_dist, asset_info),
+        'target_risk': calculate_portfolio_risk(target_dist, asset_info)
+    }, sections)
 
-def show_us_sector_analysis(name, principal, target_dist):
+def format_comparison_text(report):
+    fields = report['fields']
+    principal = fields['principal']
+    table_width = 120
+    lines = [
+        "",
+        "=" * table_width,
+        f"Kişi: {fields['name']}".center(table_width),
+        f"Ana Para: {principal:,.2f} TL".center(table_width),
+        "=" * table_width,
+        "PORTFÖY DAĞILIM KARŞILAŞTIRMASI".center(table_width),
+        "-" * table_width,
+        f"{'VARLIK':<20} | {'MEVCUT':^30} | {'HEDEF':^30} | {'DEĞİŞİM (Al/Sat)':^25}",
+        "-" * table_width
+    ]
+    for row in get_section(report, 'allocation')['rows']:
+        current_str = f"{row['current_amount']:,.2f} TL (%{row['current_percent']*100:.1f})"
+        target_str = f"{row['target_amount']:,.2f} TL (%{row['target_percent']*100:.1f})"
+        diff_str = f"{row['diff_amount']:+,.2f} TL" if abs(row['diff_amount']) > 0.01 else ""
+        lines.append(f"{row['asset']:<20} | {current_str:>30} | {target_str:>30} | {diff_str:>25}")
+    lines.append("-" * table_width)
+
+    total_str = f"Toplam: {principal:,.2f} TL"
+    lines.append(f"{'':<20} | {total_str:>30} | {total_str:>30} | {'':>25}")
+    current_risk_str = f"Ort. Risk: {fields['current_risk']:.2f}/10"
+    target_risk_str = f"Ort. Risk: {fields['target_risk']:.2f}/10"
+    lines.append(f"{'RİSK SKORU':<20} | {current_risk_str:>30} | {target_risk_str:>30} | {'':>25}")
+    risk_metrics = get_section(report, 'risk_metrics')
+    if risk_metrics:
+        lines += format_risk_metric_lines(risk_metrics)
+        lines += format_risk_contribution_lines(get_section(report, 'risk_contributions'))
+
+    lines += format_scenario_lines(get_section(report, 'scenarios'))
+    monte_carlo = get_section(report, 'monte_carlo')
+    if monte_carlo:
+        lines += format_monte_carlo_lines(monte_carlo)
+    projection = get_section(report, 'projection')
+    if projection:
+        lines += format_projection_lines(projection)
+    lines.append("=" * table_width)
+    return lines
+
+register_text_template("comparison", format_comparison_text)
+
+def show_comparison_report(name, principal, current_dist, target_dist, asset_info, sim_config=None,
+                           projection_config=None):
+    emit([build_comparison_report(name, principal, current_dist, target_dist, asset_info, sim_config,
+                                  projection_config)])
+
+def build_us_sector_analysis(name, principal, target_dist):
     """
-    Amerika sektörel dağılımını Foreign Stocks hedef oranı üzerinden gösterir (USD bazlı).
+    Foreign Stocks hedef oranı üzerinden Amerika sektörel dağılım belgesini hazırlar.
+    Amerika payı yoksa veya sektör konfigürasyonu geçersizse None döndürür.
     """
     foreign_stocks_allocation = target_dist.get("Foreign Stocks", 0) if target_dist else 0
     if foreign_stocks_allocation <= 0:
-        return
-    
+        return None
+
     sector_config = load_sector_config()
     if not sector_config or not validate_sector_percentages(sector_config):
-        print("\nAmerika sektör konfigürasyonu yüklenemedi veya geçersiz.")
-        return
-    
-    usd_rate = get_usd_rate()
+        return None
+
     sector_allocation = calculate_us_sector_allocation(principal, foreign_stocks_allocation, sector_config)
-    
-    us_total_tl = principal * foreign_stocks_allocation
-    us_total_usd = us_total_tl / usd_rate
-    
-    print("\n" + "="*70)
-    print(f"AMERİKA SEKTÖREL DAĞILIM ANALİZİ - {name}")
-    print("="*70)
-    print(f"Toplam Portföy: {principal:,.2f} TL (${principal/usd_rate:,.2f})")
-    print(f"Amerika'ya Ayrılan: ${us_total_usd:,.2f} USD (%{foreign_stocks_allocation*100:.0f})")
-    print(f"                 = {us_total_tl:,.2f} TL (Kur: {usd_rate:.2f})")
-    print(get_sector_summary_table(sector_allocation))
-    print("="*70)
+    return build_us_sector_report(name, principal, foreign_stocks_allocation, sector_allocation,
+                                  kind="us_sector_summary")
+
+def show_us_sector_analysis(name, principal, target_dist):
+    """
+    Amerika sektörel dağılımını Foreign Stocks hedef oranı üzerinden gösterir (USD bazlı).
+    """
+    report = build_us_sector_analysis(name, principal, target_dist)
+    if report is not None:
+        emit([report])
+    elif target_dist and target_dist.get("Foreign Stocks", 0) > 0:
+        print("\nAmerika sektör konfigürasyonu yüklenemedi veya geçersiz.")
 
 if __name__ == "__main__":
-    people_list = load_file(PEOPLE_FILE)
-    asset_info = load_file(ASSET_FILE)
+    configure_profiler()
+    with stage("load"):
+        people_list = get_storage().load_people()
+        asset_info = load_file(ASSET_FILE)
     if people_list is None or asset_info is None:
         sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    with stage("normalize"):
+        normalize_people(people_list, asset_info)
+    with stage("load"):
+        sim_config = load_simulation_config()
+        projection_config = load_projection_config()
 
-    selected_person = select_person(people_list)
+    with stage("select"):
+        selected_person = select_person(people_list)
     if selected_person:
         name = selected_person['name']
         
@@ -197,15 +284,26 @@ if __name__ == "__main__":
             current_dist = {asset: amount / principal for asset, amount in current_amount_dist.items()}
         
         if current_dist and target_dist:
-            show_comparison_report(
-                name,
-                principal,
-                current_dist,
-                target_dist,
-                asset_info
-            )
+            with stage("valuation", person=name, hot=True):
+                report = build_comparison_report(
+                    name,
+                    principal,
+                    current_dist,
+                    target_dist,
+                    asset_info,
+                    sim_config,
+                    person_projection_config(selected_person, projection_config) if projection_config else None
+                )
+            with stage("render", person=name):
+                emit([report])
+            # Maliyetleri dikkate alan dengeleme planını göster
+            with stage("rebalance", person=name):
+                trading_config = load_trading_config()
+                if trading_config:
+                    show_rebalance_plan(rebalance_people([selected_person], asset_info, trading_config))
             # Amerika sektör analizini göster
-            show_us_sector_analysis(name, principal, target_dist)
+            with stage("sector_allocation", person=name):
+                show_us_sector_analysis(name, principal, target_dist)
         else:
             print("\nMevcut ve/veya hedef portföy bilgileri eksik.")
             print("Karşılaştırma raporu oluşturulamadı.")
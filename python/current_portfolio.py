@@ -1,10 +1,12 @@
 import json
 import sys
+from portfolio_engine import get_asset_table, normalize_people, portfolio_risk, portfolio_return
+from storage import get_storage
+from snapshot_store import SnapshotStore
+from report_renderer import make_report, make_section, get_section, register_text_template, emit
+from profiler import configure as configure_profiler, stage
 
-# Dosya yolları
-PEOPLE_FILE = "../data/people.json"
-ASSET_FILE = "../data/asset_info.json"
-CURRENCY_FILE = "../data/currency.json"
+from data_store import load_json, save_json, get_usd_rate, ASSET_FILE
 
 def load_file(file_path):
     """
@@ -12,11 +14,10 @@ def load_file(file_path):
     Dosya eksik veya boşsa boş bir liste/sözlük döndürür.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-            if not content:
-                return [] if 'people.json' in file_path else {}
-            return json.loads(content)
+        data = load_json(file_path)
+        if data is None:
+            return [] if 'people.json' in file_path else {}
+        return data
     except FileNotFoundError:
         print(f"Bilgi: '{file_path}' bulunamadı. Yeni bir dosya oluşturulacak.")
         return [] if 'people.json' in file_path else {}
@@ -28,19 +29,9 @@ def save_file(data, file_path):
     """
     Verilen veriyi belirtilen JSON dosyasına kaydeder.
     """
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=4)
+    save_json(data, file_path, indent=4)
     print(f"Veri başarıyla '{file_path}' dosyasına kaydedildi.")
 
-def get_usd_rate():
-    """
-    currency.json dosyasından USD/TRY kurunu okur.
-    """
-    currency_data = load_file(CURRENCY_FILE)
-    if isinstance(currency_data, dict) and 'USD_TRY' in currency_data:
-        return currency_data['USD_TRY']
-    return 34.0  # Varsayılan kur
-
 def select_person(people):
     """
     Kullanıcının listeden bir kişi seçmesini sağlar ve seçilen kişinin sözlüğünü döndürür.
@@ -122,82 +113,97 @@ def calculate_portfolio_risk(portfolio_distribution, asset_info):
     """
     Varlık risk puanlarına göre portföyün toplam riskini hesaplar.
     """
-    total_risk_score = 0
-    if not portfolio_distribution: return 0
-    for asset, percent in portfolio_distribution.items():
-        if asset in asset_info:
-            risk_score = asset_info[asset].get('risk_score', 0)
-            total_risk_score += percent * risk_score
-    return total_risk_score
+    return portfolio_risk(portfolio_distribution, get_asset_table(asset_info))
 
 def calculate_portfolio_return(portfolio_distribution, asset_info):
     """
     Varlık getirileri ve kur artışına göre portföyün toplam beklenen getirisini hesaplar.
+    Kur artışı beklentisini "USD Based Interest" varlığından alır.
     """
-    total_return_percent = 0
-    if not portfolio_distribution: return 0
-    usd_return_expectation = asset_info.get("USD Based Interest", {}).get('expected_percentage_return', 0)
-    for asset, percent in portfolio_distribution.items():
-        if asset in asset_info:
-            asset_return = asset_info[asset].get('expected_percentage_return', 0)
-            usd_based = asset_info[asset].get('is_usd_based', False)
-            if usd_based:
-                combined_return = (1 + asset_return) * (1 + usd_return_expectation) - 1
-                total_return_percent += percent * combined_return
-            else:
-                total_return_percent += percent * asset_return
-    return total_return_percent
+    table = get_asset_table(asset_info, fx_asset="USD Based Interest")
+    return portfolio_return(portfolio_distribution, table)
 
-def show_portfolio_report(name, overall_data, asset_info):
+def build_portfolio_report(name, overall_data, asset_info):
     """
-    Genel portföy durumunu bir tabloda özetler.
+    Genel portföy durumunu rapor belgesi olarak hazırlar.
     """
     (overall_principal, overall_amount_dist, overall_percent_dist) = overall_data
 
     sorted_assets = sorted(list(overall_amount_dist.keys()), key=lambda x: overall_amount_dist.get(x, 0), reverse=True)
-
+    rows = [
+        {
+            'asset': asset,
+            'amount': overall_amount_dist.get(asset, 0),
+            'percent': overall_percent_dist.get(asset, 0)
+        }
+        for asset in sorted_assets
+        if abs(overall_amount_dist.get(asset, 0)) >= 0.01
+    ]
+    columns = [('asset', 'Varlık'), ('amount', 'Tutar (TL)'), ('percent', 'Oran')]
+
+    return make_report("portfolio", f"PORTFÖY DURUM RAPORU: {name}", {
+        'name': name,
+        'principal': overall_principal,
+        'risk': calculate_portfolio_risk(overall_percent_dist, asset_info),
+        'expected_return': calculate_portfolio_return(overall_percent_dist, asset_info)
+    }, [make_section('holdings', 'Varlıklar', columns, rows)])
+
+def format_portfolio_text(report):
+    fields = report['fields']
     asset_col_width = 25
     amount_col_width = 20
     percent_col_width = 15
     total_width = asset_col_width + amount_col_width + percent_col_width + 5
 
-    print("\n" + "=" * total_width)
-    print(f"PORTFÖY DURUM RAPORU: {name}".center(total_width))
-    print(f"(Ana Para: {overall_principal:,.2f} TL)".center(total_width))
-    print("=" * total_width)
-    print(f"{'VARLIK':<{asset_col_width}} | {'TUTAR (TL)':>{amount_col_width}} | {'YÜZDE (%)':>{percent_col_width}}")
-    print("-" * total_width)
-
-    for asset in sorted_assets:
-        amount = overall_amount_dist.get(asset, 0)
-        percent = overall_percent_dist.get(asset, 0) * 100
-        
-        if abs(amount) < 0.01:
-            continue
-
-        print(f"{asset:<{asset_col_width}} | {amount:>{amount_col_width},.2f} | {f'{percent:>{percent_col_width-2}.1f}%'}")
-
-    print("-" * total_width)
-    print(f"{'TOPLAM':<{asset_col_width}} | {overall_principal:>{amount_col_width},.2f} | {f'100.0%':>{percent_col_width}}")
-    print("-" * total_width)
-
-    overall_risk = calculate_portfolio_risk(overall_percent_dist, asset_info)
-    overall_return = calculate_portfolio_return(overall_percent_dist, asset_info) * 100
+    lines = [
+        "",
+        "=" * total_width,
+        f"PORTFÖY DURUM RAPORU: {fields['name']}".center(total_width),
+        f"(Ana Para: {fields['principal']:,.2f} TL)".center(total_width),
+        "=" * total_width,
+        f"{'VARLIK':<{asset_col_width}} | {'TUTAR (TL)':>{amount_col_width}} | {'YÜZDE (%)':>{percent_col_width}}",
+        "-" * total_width
+    ]
+    for row in get_section(report, 'holdings')['rows']:
+        percent = row['percent'] * 100
+        lines.append(f"{row['asset']:<{asset_col_width}} | {row['amount']:>{amount_col_width},.2f} | {f'{percent:>{percent_col_width-2}.1f}%'}")
+
+    lines += [
+        "-" * total_width,
+        f"{'TOPLAM':<{asset_col_width}} | {fields['principal']:>{amount_col_width},.2f} | {f'100.0%':>{percent_col_width}}",
+        "-" * total_width,
+        f"{'Ortalama Risk Puanı':<{asset_col_width}}: {fields['risk']:.2f} / 10",
+        f"{'Yıllık Beklenen Getiri':<{asset_col_width}}: %{fields['expected_return'] * 100:.2f}",
+        "=" * total_width
+    ]
+    return lines
+
+register_text_template("portfolio", format_portfolio_text)
 
-    print(f"{'Ortalama Risk Puanı':<{asset_col_width}}: {overall_risk:.2f} / 10")
-    print(f"{'Yıllık Beklenen Getiri':<{asset_col_width}}: %{overall_return:.2f}")
-    print("=" * total_width)
+def show_portfolio_report(name, overall_data, asset_info):
+    """
+    Genel portföy durumunu bir tabloda özetler.
+    """
+    emit([build_portfolio_report(name, overall_data, asset_info)])
 
 # --- Ana Program ---
 if __name__ == "__main__":
-    people_list = load_file(PEOPLE_FILE)
-    asset_info = load_file(ASSET_FILE)
+    configure_profiler()
+    with stage("load"):
+        storage = get_storage()
+        people_list = storage.load_people()
+        asset_info = load_file(ASSET_FILE)
     if people_list is None or asset_info is None:
         sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    with stage("normalize"):
+        normalize_people(people_list, asset_info)
 
-    selected_person = select_person(people_list)
+    with stage("select"):
+        selected_person = select_person(people_list)
     if selected_person:
-        overall_amount_dist = get_current_portfolio_info(asset_info)
+        name = selected_person['name']
+        with stage("input", person=name):
+            overall_amount_dist = get_current_portfolio_info(asset_info)
         overall_principal = sum(overall_amount_dist.values())
         
         if overall_principal == 0:
@@ -210,19 +216,28 @@ if __name__ == "__main__":
         # --- DEĞİŞİKLİK ---
         # Seçilen kişinin verileri people.json'a kaydetmek için güncelleniyor.
         # Artık sadece ana para ve tutarlar (amount) kaydediliyor.
-        selected_person['principal'] = overall_principal
-        selected_person['current_portfolio_amount'] = overall_amount_dist
+        # Kayıt, normalize edilmemiş haliyle depodan alınır; diğer alanlar olduğu gibi kalır.
+        stored = storage.get_person(name) or selected_person
+        updated = dict(stored, principal=overall_principal, current_portfolio_amount=overall_amount_dist)
         
         # --- KALDIRILDI ---
         # current_portfolio ve eski anahtarlar artık kaydedilmiyor.
         # selected_person['current_portfolio'] = overall_percent_dist.copy()
         # selected_person['current_values'] = overall_amount_dist
         
-        save_file(people_list, PEOPLE_FILE)
+        with stage("save", person=name):
+            # Sadece seçilen kişinin kaydı güncelleniyor (SQLite depolamada O(1) satır).
+            storage.save_person(updated)
+            # Eski değerler kaybolmasın diye güncelleme tarihli snapshot olarak da ekleniyor.
+            SnapshotStore().append(name, overall_principal, overall_amount_dist)
+        print("Veri başarıyla kaydedildi.")
 
         # Raporlama, hesaplanan güncel verilerle yapılıyor.
-        show_portfolio_report(
-            selected_person['name'],
-            (overall_principal, overall_amount_dist, overall_percent_dist),
-            asset_info
-        )
\ No newline at end of file
+        with stage("valuation", person=name, hot=True):
+            report = build_portfolio_report(
+                name,
+                (overall_principal, overall_amount_dist, overall_percent_dist),
+                asset_info
+            )
+        with stage("render", person=name):
+            emit([report])
@@ -0,0 +1,282 @@
+"""
+Dashboard Bundle Builder
+web/portfolio_displayer.html için her kişinin dağılımlarını, risk puanlarını,
+senaryo sonuçlarını, çok yıllık projeksiyonunu ve Amerika sektör dağılımını önceden hesaplayıp kişi başına
+küçük JSON dosyalarına (bundle) yazan derleme adımı.
+
+Her kişinin girdileri ve ortak varsayımlar (asset_info, sektör konfigürasyonu,
+kur, projeksiyon ayarları) özetlenerek (SHA-256) index.json içinde saklanır. Sonraki çalıştırmalarda
+yalnızca verisi değişen kişiler yeniden hesaplanır; ortak varsayımlar değişirse
+tüm kişiler yeniden üretilir.
+
+Kullanım:
+    python dashboard_bundle.py
+    python dashboard_bundle.py --force
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+from data_store import load_json, get_usd_rate, ASSET_FILE, SECTOR_CONFIG_FILE
+from portfolio_engine import SCENARIOS, compile_people, evaluate_weights, get_asset_table, normalize_people
+from projection import FREQUENCIES, load_projection_config, milestone_years, people_cash_flows, project
+from storage import get_storage
+
+BUNDLE_VERSION = 3
+BUNDLE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "web", "bundle"))
+INDEX_FILE_NAME = "index.json"
+PEOPLE_DIR_NAME = "people"
+
+def input_hash(*values):
+    """
+    Değerlerin anahtar sırasından bağımsız JSON gösterimini SHA-256 ile özetler.
+    """
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(json.dumps(value, sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+def bundle_file_name(name):
+    """
+    Kişi adından, kişi sırası değişse de aynı kalan bir dosya adı üretir.
+    """
+    safe_name = re.sub(r'[^\w\-]+', '_', name, flags=re.UNICODE).strip('_') or 'person'
+    return f"{safe_name}_{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}.json"
+
+def build_bundles(people, asset_info, sector_config, usd_rate, projection_config=None):
+    """
+    Kişilerin dashboard verilerini tek matris işlemiyle hesaplar.
+    projection_config verilmezse projection_config.json kullanılır.
+
+    Returns:
+        list: Her kişi için bundle sözlüğü (people ile aynı sırada)
+    """
+    table = get_asset_table(asset_info)
+    compiled = compile_people(people, table)
+    current = evaluate_weights(compiled['current'], table)
+    target = evaluate_weights(compiled['target'], table)
+    sectors = (sector_config or {}).get('sectors', {})
+    projections = project_bundles(people, compiled, current, target, projection_config)
+
+    bundles = []
+    for row, person in enumerate(people):
+        principal = float(compiled['principal'][row])
+        amounts = person.get('current_portfolio_amount') or {}
+        target_dist = person.get('target_portfolio') or {}
+        current_dist = {asset: amount / principal for asset, amount in amounts.items()} if principal > 0 else {}
+
+        # Dashboard varlıkları mevcut tutara göre büyükten küçüğe sıralar
+        all_assets = sorted(dict.fromkeys([*amounts, *target_dist]), key=lambda asset: -amounts.get(asset, 0))
+
+        scenarios = {}
+        for col, scenario in enumerate(SCENARIOS):
+            current_return = float(current['returns'][row, col])
+            target_return = float(target['returns'][row, col])
+            scenarios[scenario] = {
+                'current_return': current_return,
+                'current_value': principal * (1 + current_return),
+                'target_return': target_return,
+                'target_value': principal * (1 + target_return)
+            }
+
+        bundles.append({
+            'version': BUNDLE_VERSION,
+            'name': person.get('name', ''),
+            'principal': principal,
+            'all_assets': all_assets,
+            'current': {
+                'amounts': amounts,
+                'percents': current_dist,
+                'risk': float(current['risk'][row])
+            },
+            'target': {
+                'amounts': {asset: principal * percent for asset, percent in target_dist.items()},
+                'percents': target_dist,
+                'risk': float(target['risk'][row])
+            },
+            'scenarios': scenarios,
+            'projection': projections[row] if projections else None,
+            'us_sector': us_sector_block(principal, target_dist.get("Foreign Stocks", 0), sectors, usd_rate)
+        })
+    return bundles
+
+def project_bundles(people, compiled, current, target, projection_config=None):
+    """
+    Kişilerin mevcut ve hedef portföyleri için yıllık projeksiyon bölümlerini hazırlar.
+
+    Returns:
+        list veya None: Her kişi için projeksiyon sözlüğü; ayarlar okunamazsa None
+    """
+    if projection_config is None:
+        projection_config = load_projection_config()
+    if projection_config is None:
+        return None
+    contributions, withdrawals = people_cash_flows(people, projection_config)
+    periods = FREQUENCIES[projection_config['frequency']]
+    projected = {
+        key: project(results['returns'], compiled['principal'], contributions, withdrawals, periods)
+        for key, results in (('current', current), ('target', target))
+    }
+    contributed = projected['current']['contributed'].tolist()
+    withdrawn = projected['current']['withdrawn'].tolist()
+    values = {key: result['values'].tolist() for key, result in projected.items()}
+    depleted = {key: result['depleted'].tolist() for key, result in projected.items()}
+    milestones = milestone_years(projection_config)
+
+    return [
+        {
+            'years': projection_config['years'],
+            'frequency': projection_config['frequency'],
+            'milestones': milestones,
+            'contributed': contributed[row],
+            'withdrawn': withdrawn[row],
+            'current': dict(zip(SCENARIOS, values['current'][row])),
+            'target': dict(zip(SCENARIOS, values['target'][row])),
+            'depleted': {key: dict(zip(SCENARIOS, depleted[key][row])) for key in depleted}
+        }
+        for row in range(len(people))
+    ]
+
+def us_sector_block(principal, foreign_stocks_percent, sectors, usd_rate):
+    """
+    Bundle'ın Amerika sektör dağılımı bölümünü hesaplar. Kur veya sektör
+    konfigürasyonu değiştiğinde yalnızca bu bölüm yeniden hesaplanabilir.
+
+    Returns:
+        dict veya None: Amerika'ya ayrılan tutar yoksa None
+    """
+    us_total_tl = principal * foreign_stocks_percent
+    if us_total_tl <= 0 or not sectors:
+        return None
+    return {
+        'foreign_stocks_percent': foreign_stocks_percent,
+        'usd_rate': usd_rate,
+        'total_tl': us_total_tl,
+        'total_usd': us_total_tl / usd_rate,
+        'sectors_usd': {
+            sector: us_total_tl * info.get('percentage', 0) / usd_rate
+            for sector, info in sectors.items()
+        }
+    }
+
+def load_index(bundle_dir):
+    try:
+        with open(os.path.join(bundle_dir, INDEX_FILE_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def shared_input_hash(asset_info, sector_config, usd_rate, projection_config=None):
+    """
+    Tüm kişileri etkileyen ortak varsayımların özeti.
+    """
+    if projection_config is None:
+        projection_config = load_projection_config()
+    return input_hash(BUNDLE_VERSION, asset_info, sector_config, usd_rate, projection_config)
+
+def write_bundle(people_dir, file_name, bundle):
+    # json.dumps C kodlayıcısını kullanır; json.dump dosyaya parça parça yazar ve yavaştır
+    with open(os.path.join(people_dir, file_name), 'w', encoding='utf-8') as f:
+        f.write(json.dumps(bundle, ensure_ascii=False, separators=(',', ':')))
+
+def write_index(bundle_dir, shared_hash, entries):
+    """
+    index.json dosyasını geçici dosya üzerinden atomik olarak yazar.
+    """
+    index = {
+        'version': BUNDLE_VERSION,
+        'generated_at': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'shared_hash': shared_hash,
+        'people_dir': PEOPLE_DIR_NAME,
+        'people': entries
+    }
+    temp_path = os.path.join(bundle_dir, INDEX_FILE_NAME + ".tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(index, ensure_ascii=False, separators=(',', ':')))
+    os.replace(temp_path, os.path.join(bundle_dir, INDEX_FILE_NAME))
+
+def update_bundles(people, asset_info, sector_config, usd_rate, bundle_dir=BUNDLE_DIR, force=False):
+    """
+    Değişen kişilerin bundle dosyalarını yeniden üretir, artık bulunmayan kişilerin
+    dosyalarını siler ve index.json dosyasını günceller.
+
+    Args:
+        people: Kişi listesi
+        asset_info: asset_info.json içeriği
+        sector_config: us_sector_config.json içeriği
+        usd_rate: USD/TRY kuru
+        bundle_dir: Çıktı klasörü
+        force: True ise tüm kişiler yeniden üretilir
+
+    Returns:
+        dict: 'people', 'rebuilt', 'reused', 'removed' sayıları
+    """
+    people_dir = os.path.join(bundle_dir, PEOPLE_DIR_NAME)
+    os.makedirs(people_dir, exist_ok=True)
+
+    shared_hash = shared_input_hash(asset_info, sector_config, usd_rate)
+    previous = load_index(bundle_dir)
+    previous_entries = {}
+    if previous and previous.get('shared_hash') == shared_hash and not force:
+        previous_entries = {entry['file']: entry for entry in previous.get('people', [])}
+
+    entries = []
+    changed = []
+    for person in people:
+        name = person.get('name', '')
+        file_name = bundle_file_name(name)
+        person_hash = input_hash(person)
+        old = previous_entries.get(file_name)
+        if old is None or old['hash'] != person_hash or not os.path.exists(os.path.join(people_dir, file_name)):
+            changed.append((len(entries), person))
+        entries.append({'name': name, 'file': file_name, 'hash': person_hash})
+
+    if changed:
+        bundles = build_bundles([person for _, person in changed], asset_info, sector_config, usd_rate)
+        for (position, _), bundle in zip(changed, bundles):
+            write_bundle(people_dir, entries[position]['file'], bundle)
+
+    current_files = {entry['file'] for entry in entries}
+    removed = 0
+    for file_name in os.listdir(people_dir):
+        if file_name.endswith(".json") and file_name not in current_files:
+            os.remove(os.path.join(people_dir, file_name))
+            removed += 1
+
+    write_index(bundle_dir, shared_hash, entries)
+
+    return {
+        'people': len(entries),
+        'rebuilt': len(changed),
+        'reused': len(entries) - len(changed),
+        'removed': removed
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dashboard için kişi başına önceden hesaplanmış veri üretir.")
+    parser.add_argument("--output", default=BUNDLE_DIR, help="Bundle klasörü")
+    parser.add_argument("--force", action="store_true", help="Tüm kişileri yeniden üret")
+    args = parser.parse_args()
+
+    people_list = get_storage().load_people()
+    try:
+        asset_info = load_json(ASSET_FILE)
+        sector_config = load_json(SECTOR_CONFIG_FILE)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Hata: Veri dosyası okunamadı ({e}).")
+        asset_info = None
+    if people_list is None or asset_info is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    normalize_people(people_list, asset_info)
+
+    start = time.perf_counter()
+    stats = update_bundles(people_list, asset_info, sector_config, get_usd_rate(), args.output, args.force)
+    elapsed = time.perf_counter() - start
+    print(f"Kişi: {stats['people']} | Yeniden üretilen: {stats['rebuilt']} | "
+          f"Değişmeyen: {stats['reused']} | Silinen: {stats['removed']}")
+    print(f"Süre: {elapsed:.2f} sn | Klasör: {os.path.abspath(args.output)}")
@@ -0,0 +1,114 @@
+"""
+Data Store
+people.json, asset_info.json, currency.json ve us_sector_config.json dosyalarını
+tek bir noktadan okuyan, ayrıştırılmış içeriği dosya yolu ve değişiklik zamanına
+göre önbellekte tutan veri erişim katmanı.
+
+orjson kuruluysa JSON ayrıştırma için otomatik olarak kullanılır.
+"""
+
+import json
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DATA_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data"))
+PEOPLE_FILE = os.path.join(DATA_DIR, "people.json")
+PEOPLE_DB_FILE = os.path.join(DATA_DIR, "people.db")
+PEOPLE_JSONL_FILE = os.path.join(DATA_DIR, "people.jsonl")
+ASSET_FILE = os.path.join(DATA_DIR, "asset_info.json")
+CURRENCY_FILE = os.path.join(DATA_DIR, "currency.json")
+FX_RATES_FILE = os.path.join(DATA_DIR, "fx_rates.json")
+SECTOR_CONFIG_FILE = os.path.join(DATA_DIR, "us_sector_config.json")
+ALLOCATION_TREE_FILE = os.path.join(DATA_DIR, "allocation_tree.json")
+SIMULATION_CONFIG_FILE = os.path.join(DATA_DIR, "simulation_config.json")
+TRADING_CONFIG_FILE = os.path.join(DATA_DIR, "trading_config.json")
+OPTIMIZER_CONFIG_FILE = os.path.join(DATA_DIR, "optimizer_config.json")
+PROJECTION_CONFIG_FILE = os.path.join(DATA_DIR, "projection_config.json")
+IMPORT_RULES_FILE = os.path.join(DATA_DIR, "import_rules.json")
+
+DEFAULT_USD_RATE = 34.0
+
+# Mutlak dosya yolu -> ((mtime_ns, boyut), ayrıştırılmış içerik)
+_cache = {}
+_stats = {'hits': 0, 'misses': 0}
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def parse_json(content):
+    """
+    JSON metnini (str veya bytes) ayrıştırır; orjson kuruluysa onu kullanır.
+    """
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def load_json(file_path):
+    """
+    JSON dosyasını yükler. Dosya son okumadan beri değişmediyse önbellekteki
+    nesne döndürülür. Boş dosyalar için None döndürür.
+
+    Döndürülen nesne önbellekle paylaşılır; değiştiren çağıranlar değişikliği
+    save_json ile kaydetmelidir.
+
+    Raises:
+        FileNotFoundError: Dosya bulunamazsa
+        json.JSONDecodeError: Dosya geçerli bir JSON değilse
+    """
+    path = os.path.abspath(file_path)
+    signature = _file_signature(path)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == signature:
+        _stats['hits'] += 1
+        return cached[1]
+
+    _stats['misses'] += 1
+    with open(path, 'rb') as f:
+        content = f.read()
+    data = parse_json(content) if content.strip() else None
+    _cache[path] = (signature, data)
+    return data
+
+def save_json(data, file_path, indent=4):
+    """
+    Veriyi JSON olarak kaydeder ve önbelleği yeni içerikle günceller.
+    """
+    path = os.path.abspath(file_path)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    _cache[path] = (_file_signature(path), data)
+
+def invalidate(file_path=None):
+    """
+    Verilen dosyanın (veya tüm dosyaların) önbellek kaydını siler.
+    """
+    if file_path is None:
+        _cache.clear()
+    else:
+        _cache.pop(os.path.abspath(file_path), None)
+
+def cache_stats():
+    """
+    Önbellek isabet ve ıska sayılarını döndürür.
+    """
+    return dict(_stats)
+
+def reset_cache_stats():
+    _stats['hits'] = 0
+    _stats['misses'] = 0
+
+def load_sector_config():
+    return load_json(SECTOR_CONFIG_FILE)
+
+def get_usd_rate(date=None):
+    """
+    Verilen tarihte (varsayılan: en son) geçerli USD/TRY kurunu fx_rates modülünün
+    kur tablosundan döndürür. Kur dosyaları okunamazsa varsayılan kuru döndürür.
+    """
+    from fx_rates import get_rate
+    return get_rate("USD", date)
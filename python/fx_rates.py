@@ -0,0 +1,217 @@
+"""
+FX Rates
+Birden çok para birimi (USD, EUR, GBP, XAU) için tarihli kur serilerini tutan ve
+"o tarihte geçerli kur" (as-of) sorgularını ikili arama ile yanıtlayan kur tablosu.
+
+Kurlar data/fx_rates.json dosyasından okunur; currency.json içindeki USD_TRY
+değeri last_updated tarihli bir USD kuru olarak seriye eklenir. Tablo dosyalar
+değişmedikçe yeniden oluşturulmaz, bu yüzden tekrarlanan çağrılar dosyayı okumaz.
+
+Kullanım:
+    python fx_rates.py
+    python fx_rates.py USD --date 2025-06-15
+"""
+
+import argparse
+import bisect
+import datetime
+import json
+import sys
+
+import numpy as np
+
+from data_store import load_json, CURRENCY_FILE, DEFAULT_USD_RATE, FX_RATES_FILE
+
+BASE_CURRENCY = "TRY"
+
+# (fx_rates.json nesnesi, currency.json nesnesi, tablo); load_json aynı nesneyi
+# döndürdüğü sürece tablo yeniden kullanılır
+_table_cache = None
+
+def _day(value):
+    """
+    Tarih, datetime, 'YYYY-MM-DD' metni veya datetime64 değerini gün sayısına çevirir.
+    """
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+def _days(values):
+    return np.asarray(values, dtype='datetime64[D]').astype(np.int64)
+
+class FxTable:
+    """
+    Para birimi başına tarihe göre sıralı (gün, kur) dizileri.
+    Kurlar 1 birim yabancı paranın TL karşılığıdır.
+    """
+
+    def __init__(self, series):
+        """
+        Args:
+            series: {para birimi: {tarih: kur, ...}, ...}
+        """
+        self._days = {}
+        self._day_lists = {}
+        self._rates = {}
+        for currency, points in series.items():
+            if not points:
+                continue
+            items = sorted((_day(date), float(rate)) for date, rate in points.items())
+            self._day_lists[currency] = [day for day, _ in items]
+            self._days[currency] = np.array(self._day_lists[currency], dtype=np.int64)
+            self._rates[currency] = np.array([rate for _, rate in items])
+
+    @property
+    def currencies(self):
+        return [BASE_CURRENCY] + list(self._rates)
+
+    def _series(self, currency):
+        if currency not in self._rates:
+            raise KeyError(f"'{currency}' için kur serisi bulunamadı.")
+        return self._day_lists[currency], self._rates[currency]
+
+    def rate(self, currency, date=None):
+        """
+        Verilen tarihte geçerli olan (o gün veya öncesindeki son) kuru döndürür.
+        Tarih verilmezse en son kur döner; serinin ilk tarihinden önceki tarihler
+        için ilk kur kullanılır.
+        """
+        if currency == BASE_CURRENCY:
+            return 1.0
+        day_list, rates = self._series(currency)
+        if date is None:
+            return float(rates[-1])
+        position = bisect.bisect_right(day_list, _day(date)) - 1
+        return float(rates[max(position, 0)])
+
+    def rates_at(self, currency, dates):
+        """
+        Tarih dizisinin her elemanı için geçerli kuru tek bir searchsorted ile döndürür.
+        """
+        dates = _days(dates)
+        if currency == BASE_CURRENCY:
+            return np.ones(dates.shape)
+        _, rates = self._series(currency)
+        positions = np.searchsorted(self._days[currency], dates, side='right') - 1
+        return rates[np.maximum(positions, 0)]
+
+    def to_base(self, amounts, currency, dates=None):
+        """
+        Yabancı para tutarlarını TL'ye çevirir. dates verilirse her tutar kendi
+        tarihindeki kurla, verilmezse en son kurla çevrilir.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if dates is None:
+            return amounts * self.rate(currency)
+        return amounts * self.rates_at(currency, dates)
+
+    def from_base(self, amounts, currency, dates=None):
+        """
+        TL tutarlarını verilen para birimine çevirir (to_base işleminin tersi).
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        if dates is None:
+            return amounts / self.rate(currency)
+        return amounts / self.rates_at(currency, dates)
+
+    def convert_holdings(self, amounts, currencies, dates=None):
+        """
+        Varlık tutarları matrisini (satır x varlık) varlıkların para birimlerinden
+        TL'ye çevirir. Her para birimi için kur sütunu bir kez hesaplanır.
+
+        Args:
+            amounts: Satır x varlık tutar matrisi (her varlık kendi para biriminde)
+            currencies: Her varlık sütununun para birimi
+            dates: Her satırın tarihi (None ise en son kurlar)
+
+        Returns:
+            numpy.ndarray: TL cinsinden satır x varlık matrisi
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        factors = np.ones(amounts.shape)
+        for currency in set(currencies) - {BASE_CURRENCY}:
+            columns = [i for i, c in enumerate(currencies) if c == currency]
+            if dates is None:
+                factors[:, columns] = self.rate(currency)
+            else:
+                factors[:, columns] = self.rates_at(currency, dates)[:, None]
+        return amounts * factors
+
+def asset_currencies(asset_info, names):
+    """
+    Varlıkların para birimlerini döndürür. asset_info.json'da 'currency' alanı
+    varsa o, yoksa is_usd_based alanına göre USD veya TRY kullanılır.
+    """
+    currencies = []
+    for name in names:
+        info = asset_info.get(name, {})
+        currencies.append(info.get('currency') or ("USD" if info.get('is_usd_based') else BASE_CURRENCY))
+    return currencies
+
+def build_series(fx_data, currency_data):
+    """
+    fx_rates.json ve currency.json içeriklerinden {para birimi: {tarih: kur}} üretir.
+    """
+    series = {}
+    if isinstance(fx_data, dict):
+        for currency, points in (fx_data.get('series') or {}).items():
+            series[currency] = dict(points)
+
+    if isinstance(currency_data, dict) and 'USD_TRY' in currency_data:
+        date = currency_data.get('last_updated') or datetime.date.today().isoformat()
+        series.setdefault("USD", {})[date] = currency_data['USD_TRY']
+
+    if not series.get("USD"):
+        series["USD"] = {"1970-01-01": DEFAULT_USD_RATE}
+    return series
+
+def _load_optional(file_path):
+    try:
+        return load_json(file_path)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        print(f"Hata: '{file_path}' dosyası geçerli bir JSON formatında değil ({e}).")
+        return None
+    except OSError as e:
+        print(f"Hata: '{file_path}' dosyası okunamadı ({e}).")
+        return None
+
+def load_fx_table():
+    """
+    Kur tablosunu döndürür. Kaynak dosyalar değişmediyse önceki tablo kullanılır.
+    """
+    global _table_cache
+    fx_data = _load_optional(FX_RATES_FILE)
+    currency_data = _load_optional(CURRENCY_FILE)
+    if _table_cache is not None and _table_cache[0] is fx_data and _table_cache[1] is currency_data:
+        return _table_cache[2]
+    table = FxTable(build_series(fx_data, currency_data))
+    _table_cache = (fx_data, currency_data, table)
+    return table
+
+def get_rate(currency, date=None):
+    """
+    Bir para biriminin verilen tarihte (varsayılan: en son) geçerli TL kurunu döndürür.
+    """
+    return load_fx_table().rate(currency, date)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tarihli döviz kurlarını gösterir.")
+    parser.add_argument("currencies", nargs="*", help="Para birimleri (varsayılan: tümü)")
+    parser.add_argument("--date", help="Kur tarihi (YYYY-MM-DD, varsayılan: en son)")
+    args = parser.parse_args()
+    if args.date:
+        try:
+            _day(args.date)
+        except ValueError:
+            sys.exit(f"Hata: '{args.date}' geçerli bir tarih değil (YYYY-MM-DD).")
+
+    fx_table = load_fx_table()
+    wanted = args.currencies or [c for c in fx_table.currencies if c != BASE_CURRENCY]
+    print(f"\nKurlar ({args.date or 'en son'}, 1 birim = ? {BASE_CURRENCY}):")
+    for currency in wanted:
+        try:
+            print(f"  {currency:<5}: {fx_table.rate(currency, args.date):>14,.4f}")
+        except KeyError as e:
+            print(f"  Hata: {e.args[0]}")
@@ -0,0 +1,469 @@
+"""
+Holdings Import
+Banka ve aracı kurum pozisyon dosyalarından (CSV/XLSX) birçok kişinin varlık
+tutarlarını toplu olarak içe aktaran modül.
+
+Her satır bir kişinin bir enstrümandaki pozisyonudur. Sütunlar başlıklarına göre
+data/import_rules.json'daki 'columns' listeleriyle eşleşir. Enstrüman satırları
+asset_info.json varlıklarına sıralı düzenli ifade kurallarıyla eşlenir (ilk eşleşen
+kural kullanılır); eşleme her farklı (enstrüman, açıklama, tür, para birimi) için
+bir kez yapılır. Tutar 'amount' sütunundan ya da adet x fiyat olarak alınır ve
+satırın tarihindeki kurla TL'ye çevrilir.
+
+Dosyalar satır satır okunur ve partiler halinde kişi x varlık toplamlarına
+(numpy bincount ile) eklenir; bellek kullanımı satır sayısından bağımsızdır.
+Sonuçta her kişinin current_portfolio_amount ve principal değerleri tek bir
+yazma işlemiyle güncellenir (kişinin önceki tutarlarının yerini alır) ve
+snapshot geçmişine eklenir. Kayıtlı olmayan kişiler oluşturulmaz, raporlanır.
+
+XLSX dosyaları için openpyxl paketi gerekir.
+
+Kullanım:
+    python holdings_import.py pozisyonlar.csv
+    python holdings_import.py banka.csv kurum.xlsx --date 2024-06-28
+    python holdings_import.py pozisyonlar.csv --dry-run --output ../reports/import.csv
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+from data_store import load_json, ASSET_FILE, IMPORT_RULES_FILE
+from fx_rates import BASE_CURRENCY, load_fx_table
+from portfolio_engine import get_asset_table
+from snapshot_store import SnapshotStore
+from storage import get_storage
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+RULE_FIELDS = ("instrument", "description", "type", "any")
+REQUIRED_COLUMNS = ("person",)
+BATCH_ROWS = 100_000
+TOP_UNMATCHED = 10
+CSV_DELIMITERS = ",;\t|"
+
+def load_import_rules(file_path=IMPORT_RULES_FILE):
+    """
+    İçe aktarma kurallarını okur.
+
+    Returns:
+        dict veya None (dosya okunamazsa)
+    """
+    try:
+        return load_json(file_path)
+    except FileNotFoundError:
+        print(f"Hata: '{file_path}' dosyası bulunamadı.")
+    except json.JSONDecodeError as e:
+        print(f"Hata: '{file_path}' dosyası geçerli bir JSON formatında değil ({e}).")
+    return None
+
+def compile_rules(config, table):
+    """
+    Kural listesini (varlık ID, alan, derlenmiş ifade, para birimleri) dörtlülerine çevirir.
+
+    Returns:
+        tuple: (kurallar, hata mesajları)
+    """
+    rules, errors = [], []
+    for i, rule in enumerate(config.get('rules') or []):
+        asset = table['index'].get(rule.get('asset'))
+        field = rule.get('field', 'any')
+        if asset is None:
+            errors.append(f"{i + 1}. kural: '{rule.get('asset')}' varlığı asset_info.json'da yok.")
+            continue
+        if field not in RULE_FIELDS:
+            errors.append(f"{i + 1}. kural: 'field' {', '.join(RULE_FIELDS)} değerlerinden biri olmalı.")
+            continue
+        try:
+            pattern = re.compile(rule.get('pattern', ''))
+        except re.error as e:
+            errors.append(f"{i + 1}. kural: geçersiz ifade ({e}).")
+            continue
+        currencies = rule.get('currencies')
+        rules.append((asset, field, pattern, set(currencies) if currencies else None))
+    return rules, errors
+
+def _header_key(value):
+    return " ".join(str(value or "").replace("_", " ").split()).casefold()
+
+def resolve_columns(header, config):
+    """
+    Başlık satırındaki sütunları alanlara eşler.
+
+    Returns:
+        dict: {alan: sütun sırası}
+    """
+    positions = {_header_key(name): i for i, name in reversed(list(enumerate(header)))}
+    columns = {}
+    for field, candidates in (config.get('columns') or {}).items():
+        for candidate in candidates:
+            position = positions.get(_header_key(candidate))
+            if position is not None:
+                columns[field] = position
+                break
+    return columns
+
+def check_columns(columns):
+    """
+    Zorunlu sütunların bulunup bulunmadığını denetler; eksikleri döndürür.
+    """
+    missing = [field for field in REQUIRED_COLUMNS if field not in columns]
+    if 'amount' not in columns and not ('quantity' in columns and 'price' in columns):
+        missing.append("amount (veya quantity + price)")
+    if not any(field in columns for field in ("asset", "instrument", "description", "type")):
+        missing.append("asset / instrument / description / type")
+    return missing
+
+def make_number_parser(decimal):
+    """
+    Sayı metinlerini float'a çeviren fonksiyon döndürür. decimal="," ise
+    "1.234,56" biçimi, aksi halde "1,234.56" biçimi beklenir.
+    """
+    thousands = "." if decimal == "," else ","
+    def parse(value):
+        if value is None or value == "":
+            return None
+        if isinstance(value, (int, float)):
+            return float(value)
+        text = value.strip().replace(" ", "").replace(thousands, "")
+        if decimal == ",":
+            text = text.replace(",", ".")
+        return float(text) if text else None
+    return parse
+
+def _sniff_delimiter(line):
+    counts = {delimiter: line.count(delimiter) for delimiter in CSV_DELIMITERS}
+    delimiter = max(counts, key=counts.get)
+    return delimiter if counts[delimiter] else ","
+
+def iter_csv_rows(file_path):
+    """
+    CSV dosyasının satırlarını (başlık dahil) sırayla döndürür; ayraç ilk satırdan belirlenir.
+    """
+    with open(file_path, newline='', encoding='utf-8-sig') as f:
+        delimiter = _sniff_delimiter(f.readline())
+        f.seek(0)
+        yield from csv.reader(f, delimiter=delimiter)
+
+def iter_xlsx_rows(file_path):
+    """
+    XLSX dosyasının ilk sayfasındaki satırları salt okunur modda sırayla döndürür.
+    """
+    if openpyxl is None:
+        raise RuntimeError("XLSX dosyaları için openpyxl paketi gerekli (pip install openpyxl).")
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+def iter_rows(file_path):
+    if os.path.splitext(file_path)[1].lower() in (".xlsx", ".xlsm"):
+        return iter_xlsx_rows(file_path)
+    return iter_csv_rows(file_path)
+
+class HoldingsAccumulator:
+    """
+    Kişi x varlık TL toplamlarını tutar. Yeni kişiler geldikçe matris büyütülür.
+    """
+
+    def __init__(self, asset_count):
+        self.asset_count = asset_count
+        self.people = {}
+        self.names = []
+        self.totals = np.zeros((0, asset_count))
+
+    def person_id(self, name):
+        person = self.people.get(name)
+        if person is None:
+            person = self.people[name] = len(self.names)
+            self.names.append(name)
+        return person
+
+    def add(self, people, assets, values):
+        """
+        Bir partiyi (kişi ID'leri, varlık ID'leri, TL tutarları) toplamlara ekler.
+        """
+        if not len(people):
+            return
+        rows = len(self.names)
+        if rows > self.totals.shape[0]:
+            grown = np.zeros((max(rows, 2 * self.totals.shape[0]), self.asset_count))
+            grown[:self.totals.shape[0]] = self.totals
+            self.totals = grown
+        flat = np.asarray(people, dtype=np.int64) * self.asset_count + np.asarray(assets, dtype=np.int64)
+        sums = np.bincount(flat, weights=np.asarray(values, dtype=np.float64), minlength=rows * self.asset_count)
+        self.totals[:rows] += sums.reshape(rows, self.asset_count)
+
+    def result(self):
+        return self.names, self.totals[:len(self.names)]
+
+class HoldingsImporter:
+    """
+    Pozisyon dosyalarını okuyup kişi x varlık toplamlarını biriktirir.
+    """
+
+    def __init__(self, config, table, rules, fx_table, date=None):
+        self.config = config
+        self.table = table
+        self.rules = rules
+        self.fx_table = fx_table
+        self.date = date
+        self.default_currency = config.get('default_currency', BASE_CURRENCY)
+        self.currency_aliases = {key.upper(): value for key, value in (config.get('currency_aliases') or {}).items()}
+        self.asset_index = {_header_key(name): i for name, i in table['index'].items()}
+        self.parse_number = make_number_parser(config.get('decimal', "."))
+        self.accumulator = HoldingsAccumulator(len(table['names']))
+        self._assets = {}
+        self._rates = {}
+        self._currencies = {}
+        self.rows = 0
+        self.imported = 0
+        self.invalid = 0
+        self.unmatched = {}
+        self.unknown_currencies = {}
+
+    def currency(self, value):
+        currency = self._currencies.get(value)
+        if currency is None:
+            code = str(value or "").strip().upper() or self.default_currency
+            currency = self._currencies[value] = self.currency_aliases.get(code, code)
+        return currency
+
+    def classify(self, instrument, description, kind, currency):
+        """
+        Enstrüman satırını kurallara göre bir varlık ID'sine eşler; eşleşme yoksa None.
+        """
+        fields = {'instrument': instrument, 'description': description, 'type': kind,
+                  'any': " | ".join(value for value in (instrument, description, kind) if value)}
+        for asset, field, pattern, currencies in self.rules:
+            if currencies is not None and currency not in currencies:
+                continue
+            if fields[field] and pattern.search(fields[field]):
+                return asset
+        return None
+
+    def rate(self, currency, date):
+        """
+        Para biriminin verilen tarihteki TL kurunu döndürür; para birimi bilinmiyorsa None.
+
+        Raises:
+            ValueError: Tarih geçerli değilse
+        """
+        key = (currency, date)
+        rate = self._rates.get(key, False)
+        if rate is False:
+            try:
+                rate = self.fx_table.rate(currency, date)
+            except KeyError:
+                rate = None
+            self._rates[key] = rate
+        return rate
+
+    def import_file(self, file_path):
+        """
+        Bir dosyanın tüm satırlarını partiler halinde toplamlara ekler.
+
+        Returns:
+            int: Okunan veri satırı sayısı
+        """
+        rows = iter_rows(file_path)
+        header = next(rows, None)
+        if header is None:
+            return 0
+        columns = resolve_columns(header, self.config)
+        missing = check_columns(columns)
+        if missing:
+            raise ValueError(f"'{file_path}' dosyasında eksik sütunlar: {', '.join(missing)}")
+
+        def cell(name):
+            position = columns.get(name)
+            if position is None:
+                return lambda row: None
+            return lambda row: row[position] if position < len(row) else None
+
+        get_person, get_asset = cell('person'), cell('asset')
+        get_instrument, get_description, get_type = cell('instrument'), cell('description'), cell('type')
+        get_amount, get_quantity, get_price = cell('amount'), cell('quantity'), cell('price')
+        get_currency, get_date = cell('currency'), cell('date')
+        has_amount = 'amount' in columns
+        fixed_date = self.date
+
+        people, assets, values = [], [], []
+        person_id = self.accumulator.person_id
+        parse = self.parse_number
+        count = 0
+        for row in rows:
+            count += 1
+            name = get_person(row)
+            name = str(name).strip() if name is not None else ""
+            if not name:
+                self.invalid += 1
+                continue
+            try:
+                amount = parse(get_amount(row)) if has_amount else None
+                if amount is None:
+                    quantity, price = parse(get_quantity(row)), parse(get_price(row))
+                    amount = quantity * price if quantity is not None and price is not None else None
+            except (TypeError, ValueError):
+                amount = None
+            if amount is None:
+                self.invalid += 1
+                continue
+
+            currency = self.currency(get_currency(row))
+            key = (get_asset(row), get_instrument(row), get_description(row), get_type(row), currency)
+            asset = self._assets.get(key, False)
+            if asset is False:
+                asset = self.asset_index.get(_header_key(key[0])) if key[0] else None
+                if asset is None:
+                    asset = self.classify(*(str(value).strip() if value is not None else "" for value in key[1:4]), currency)
+                self._assets[key] = asset
+            if asset is None:
+                unmatched = self.unmatched.setdefault(key[1:], [0, 0.0])
+                unmatched[0] += 1
+                unmatched[1] += amount
+                continue
+
+            date = fixed_date or get_date(row) or None
+            try:
+                rate = self.rate(currency, date)
+            except ValueError:
+                self.invalid += 1
+                continue
+            if rate is None:
+                self.unknown_currencies[currency] = self.unknown_currencies.get(currency, 0) + 1
+                continue
+
+            people.append(person_id(name))
+            assets.append(asset)
+            values.append(amount * rate)
+            if len(values) >= BATCH_ROWS:
+                self.accumulator.add(people, assets, values)
+                self.imported += len(values)
+                people, assets, values = [], [], []
+
+        self.accumulator.add(people, assets, values)
+        self.imported += len(values)
+        self.rows += count
+        return count
+
+    def holdings(self):
+        """
+        Returns:
+            dict: {ad: (ana para, {varlık: TL tutar})}; ana para tutarların toplamıdır
+        """
+        names, totals = self.accumulator.result()
+        asset_names = self.table['names']
+        totals = np.round(totals, 2)
+        principals = totals.sum(axis=1)
+        return {
+            name: (float(principals[i]), dict(zip(asset_names, totals[i].tolist())))
+            for i, name in enumerate(names)
+        }
+
+def write_holdings_csv(holdings, asset_names, file_path):
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "principal"] + list(asset_names))
+        for name, (principal, amounts) in holdings.items():
+            writer.writerow([name, principal] + [amounts[asset] for asset in asset_names])
+
+def format_import_summary(importer, seconds, updated, unknown_people):
+    lines = [
+        "İÇE AKTARMA ÖZETİ",
+        "=" * 60,
+        f"{'Okunan satır:':<28}{importer.rows:>14,}",
+        f"{'Aktarılan satır:':<28}{importer.imported:>14,}",
+        f"{'Geçersiz satır:':<28}{importer.invalid:>14,}",
+        f"{'Eşleşmeyen satır:':<28}{sum(count for count, _ in importer.unmatched.values()):>14,}",
+        f"{'Bilinmeyen para birimi:':<28}{sum(importer.unknown_currencies.values()):>14,}",
+        f"{'Kişi:':<28}{len(importer.accumulator.names):>14,}",
+        f"{'Güncellenen kişi:':<28}{updated:>14,}",
+        f"{'Süre:':<28}{seconds:>13.2f}s",
+        f"{'Satır/saniye:':<28}{importer.rows / seconds if seconds else 0:>14,.0f}",
+    ]
+    if unknown_people:
+        shown = ", ".join(unknown_people[:TOP_UNMATCHED])
+        more = f" (+{len(unknown_people) - TOP_UNMATCHED})" if len(unknown_people) > TOP_UNMATCHED else ""
+        lines.append(f"Kayıtlı olmayan kişiler: {shown}{more}")
+    if importer.unknown_currencies:
+        lines.append("Kuru bulunamayan para birimleri: " + ", ".join(sorted(importer.unknown_currencies)))
+    if importer.unmatched:
+        lines.append("")
+        lines.append(f"En sık eşleşmeyen enstrümanlar (ilk {TOP_UNMATCHED}):")
+        top = sorted(importer.unmatched.items(), key=lambda item: -item[1][0])[:TOP_UNMATCHED]
+        for (instrument, description, kind, currency), (count, amount) in top:
+            label = " / ".join(str(value) for value in (instrument, description, kind) if value) or "-"
+            lines.append(f"  {label[:40]:<40} {currency:<4} {count:>10,} satır {amount:>16,.2f}")
+    return lines
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pozisyon dosyalarından varlık tutarlarını toplu olarak içe aktarır.")
+    parser.add_argument("files", nargs="+", help="CSV veya XLSX pozisyon dosyaları")
+    parser.add_argument("--rules", default=IMPORT_RULES_FILE, help="Eşleme kuralları dosyası")
+    parser.add_argument("--date", help="Tüm satırlar için kur tarihi (varsayılan: satırın tarih sütunu, yoksa en son kur)")
+    parser.add_argument("--dry-run", action="store_true", help="Sonuçları kaydetmeden yalnızca özet göster")
+    parser.add_argument("--no-snapshot", action="store_true", help="Snapshot geçmişine ekleme")
+    parser.add_argument("--output", help="Kişi x varlık toplamlarını CSV olarak kaydet")
+    args = parser.parse_args()
+    if args.date:
+        try:
+            np.datetime64(args.date, 'D')
+        except ValueError:
+            sys.exit(f"Hata: '{args.date}' geçerli bir tarih değil (YYYY-MM-DD).")
+
+    config = load_import_rules(args.rules)
+    asset_info = load_json(ASSET_FILE)
+    if config is None or asset_info is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+
+    table = get_asset_table(asset_info)
+    rules, errors = compile_rules(config, table)
+    if errors:
+        for error in errors:
+            print(f"Hata: {error}")
+        sys.exit("Geçersiz içe aktarma kuralları nedeniyle program durduruldu.")
+
+    importer = HoldingsImporter(config, table, rules, load_fx_table(), args.date)
+    started = time.perf_counter()
+    for file_path in args.files:
+        try:
+            importer.import_file(file_path)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"Hata: {e}")
+            sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    holdings = importer.holdings()
+
+    storage = get_storage()
+    people = storage.iter_people()
+    if people is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    known = {person.get('name') for person in people}
+    unknown_people = [name for name in holdings if name not in known]
+    holdings = {name: value for name, value in holdings.items() if name in known}
+
+    updated = 0
+    if not args.dry_run and holdings:
+        updated = storage.update_holdings(holdings)
+        if not args.no_snapshot:
+            SnapshotStore().append_many(
+                (name, principal, amounts, args.date) for name, (principal, amounts) in holdings.items()
+            )
+    seconds = time.perf_counter() - started
+
+    if args.output:
+        write_holdings_csv(holdings, table['names'], args.output)
+    print("\n".join(format_import_summary(importer, seconds, updated, unknown_people)))
+    if args.output:
+        print(f"\nToplamlar kaydedildi: {args.output}")
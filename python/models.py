@@ -0,0 +1,578 @@
+"""
+Typed Models
+Kişi, varlık, portföy ve sektör dağılımı için iç içe sözlükler yerine kullanılabilen
+sıkı (compact) model sınıfları.
+
+Bütün sınıflar __slots__ kullanır; nesne başına __dict__ tutulmaz. Portföyler
+varlık evrenine (asset_info.json sırası) göre sabit uzunluklu float64 dizilerdir;
+varlık adları ve takma adları portfolio_engine tablosundaki ID'lere eşlenir.
+
+PeopleBook kişileri sütun biçiminde saklar: adlar bir liste, risk puanı ve ana para
+birer dizi, mevcut tutarlar ve hedef ağırlıklar kişi x varlık matrisleridir.
+book[i] bu satırlara bakan (kopyalamayan) bir PersonRow döndürür; ana para, risk
+puanı ve portföylerde yapılan değişiklikler doğrudan kitaba yazılır. Kişi
+sözlükleri storage.iter_people() ile tek tek okunup eklendiği için JSONL ve
+SQLite depolamada bütün sözlük listesi hiçbir zaman bellekte tutulmaz.
+
+JSON'a dönüşümde içerik korunur: portföylerde hangi varlık anahtarlarının
+bulunduğu (değeri 0 olsa bile) kişi x varlık bir maske olarak tutulur ve yalnızca
+bu anahtarlar geri yazılır; modelde alanı olmayan kişi alanları ve asset_info'da
+bulunmayan portföy anahtarları 'extra' içinde saklanır. Farklar: takma adlar asıl
+varlık adına çevrilir (normalize_people ile aynı), portföy anahtarları
+asset_info sırasıyla yazılır ve sayılar float olarak döner.
+
+Kullanım:
+    python models.py                 # people.json için bellek karşılaştırması
+    python models.py --synthetic 1000000
+"""
+
+import argparse
+import copy
+import math
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from data_store import load_json, ASSET_FILE
+from portfolio_engine import SCENARIOS, SCENARIO_KEYS, get_asset_table
+from storage import get_storage
+
+# Kişi sözlüğünde modelin doğrudan tuttuğu alanlar
+PERSON_FIELDS = ("name", "risk_score", "principal", "current_portfolio_amount", "target_portfolio")
+ASSET_FIELDS = ("risk_score", "is_usd_based", "aliases") + tuple(SCENARIO_KEYS[s] for s in SCENARIOS)
+INITIAL_CAPACITY = 1024
+
+class Asset:
+    """
+    asset_info.json'daki tek bir varlık.
+    """
+    __slots__ = ('id', 'name', 'risk_score', 'returns', 'is_usd_based', 'aliases', 'extra')
+
+    def __init__(self, id, name, risk_score=0.0, returns=(0.0, 0.0, 0.0), is_usd_based=False, aliases=(), extra=None):
+        self.id = id
+        self.name = name
+        self.risk_score = risk_score
+        self.returns = returns
+        self.is_usd_based = is_usd_based
+        self.aliases = aliases
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, id, name, info):
+        extra = {key: value for key, value in info.items() if key not in ASSET_FIELDS and key != 'risk_puani'}
+        return cls(
+            id,
+            name,
+            float(info.get('risk_score', info.get('risk_puani', 0))),
+            tuple(float(info.get(SCENARIO_KEYS[s], 0)) for s in SCENARIOS),
+            bool(info.get('is_usd_based', False)),
+            tuple(info.get('aliases', ())),
+            extra or None
+        )
+
+    def to_dict(self):
+        info = {'risk_score': self.risk_score}
+        info.update({SCENARIO_KEYS[s]: value for s, value in zip(SCENARIOS, self.returns)})
+        info['is_usd_based'] = self.is_usd_based
+        if self.aliases:
+            info['aliases'] = list(self.aliases)
+        if self.extra:
+            info.update(self.extra)
+        return info
+
+    def __repr__(self):
+        return f"Asset({self.id}, {self.name!r})"
+
+class AssetUniverse:
+    """
+    Varlıkların sıralı listesi; portföy dizilerinin sütun düzenini belirler.
+    """
+    __slots__ = ('assets', 'names', 'index', 'table')
+
+    def __init__(self, asset_info):
+        self.table = get_asset_table(asset_info)
+        self.names = self.table['names']
+        self.index = self.table['index']
+        self.assets = tuple(Asset.from_dict(i, name, asset_info[name]) for i, name in enumerate(self.names))
+
+    def id(self, name):
+        """
+        Varlık adının (veya takma adının) ID'sini döndürür; bilinmiyorsa None.
+        """
+        return self.index.get(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.assets)
+
+    def __getitem__(self, key):
+        return self.assets[key if isinstance(key, int) else self.index[key]]
+
+    def to_dict(self):
+        return {asset.name: asset.to_dict() for asset in self.assets}
+
+class Portfolio:
+    """
+    Varlık evreni üzerinde sabit uzunluklu tutar veya ağırlık dizisi.
+    values ve present bir PeopleBook matrisinin satırı olabilir; bu durumda
+    değişiklikler doğrudan kitaba yansır. present, JSON'da bulunan varlık
+    anahtarlarının maskesidir (None ise tüm varlıklar).
+    """
+    __slots__ = ('universe', 'values', 'present')
+
+    def __init__(self, universe, values=None, present=None):
+        self.universe = universe
+        self.values = np.zeros(len(universe)) if values is None else values
+        self.present = present
+
+    @classmethod
+    def from_dict(cls, distribution, universe, out=None, out_present=None):
+        """
+        {varlık: değer} sözlüğünü diziye çevirir. Takma adlar asıl varlığa eklenir.
+
+        Returns:
+            tuple: (Portfolio, bilinmeyen anahtarlar sözlüğü veya None)
+        """
+        # Toplama Python listesinde yapılır, diziye tek atamayla yazılır
+        size, index = len(universe), universe.index
+        values, present = [0.0] * size, [False] * size
+        unknown = None
+        for asset, value in (distribution or {}).items():
+            col = index.get(asset)
+            if col is None:
+                if unknown is None:
+                    unknown = {}
+                unknown[asset] = value
+            else:
+                values[col] += value
+                present[col] = True
+        if out is None:
+            out = np.array(values)
+        else:
+            out[:] = values
+        if out_present is None:
+            out_present = np.array(present, dtype=bool)
+        else:
+            out_present[:] = present
+        return cls(universe, out, out_present), unknown
+
+    def to_dict(self, skip_zero=False):
+        """
+        Asset evreni sırasına göre {varlık: değer} sözlüğü döndürür. Yalnızca
+        present maskesindeki anahtarlar (skip_zero ise sıfır olmayanlar) yazılır.
+        """
+        pairs = zip(self.universe.names, self.values.tolist())
+        if skip_zero:
+            return {asset: value for asset, value in pairs if value}
+        if self.present is None:
+            return dict(pairs)
+        return {asset: value for (asset, value), present in zip(pairs, self.present.tolist()) if present}
+
+    @property
+    def total(self):
+        return float(self.values.sum())
+
+    def weights(self, principal=None):
+        """
+        Tutarları ana paraya (verilmezse toplama) bölerek ağırlık portföyü döndürür.
+        """
+        principal = self.total if principal is None else principal
+        if principal <= 0:
+            return Portfolio(self.universe)
+        return Portfolio(self.universe, self.values / principal)
+
+    def __getitem__(self, asset):
+        return float(self.values[self.universe.index[asset]])
+
+    def __setitem__(self, asset, value):
+        col = self.universe.index[asset]
+        self.values[col] = value
+        if self.present is not None:
+            self.present[col] = True
+
+    def __len__(self):
+        return len(self.values)
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __repr__(self):
+        return f"Portfolio({self.to_dict(skip_zero=True)})"
+
+class Person:
+    """
+    Tek bir kişi kaydı. current mevcut tutarları (TL), target hedef ağırlıkları tutar.
+    """
+    __slots__ = ('name', 'risk_score', 'principal', 'current', 'target', 'extra')
+
+    def __init__(self, name, risk_score, principal, current, target, extra=None):
+        self.name = name
+        self.risk_score = risk_score
+        self.principal = principal
+        self.current = current
+        self.target = target
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, person, universe):
+        current, unknown_current = Portfolio.from_dict(person.get('current_portfolio_amount'), universe)
+        target, unknown_target = Portfolio.from_dict(person.get('target_portfolio'), universe)
+        risk_score = person.get('risk_score')
+        return cls(
+            person.get('name', ''),
+            None if risk_score is None else float(risk_score),
+            float(person.get('principal', 0)),
+            current,
+            target,
+            _person_extra(person, unknown_current, unknown_target)
+        )
+
+    def to_dict(self):
+        return _person_dict(self.name, self.risk_score, self.principal, self.current, self.target, self.extra)
+
+    @property
+    def current_weights(self):
+        return self.current.weights(self.principal)
+
+    def __repr__(self):
+        return f"Person({self.name!r}, principal={self.principal:,.2f})"
+
+def _person_extra(person, unknown_current, unknown_target):
+    extra = None
+    if any(key not in PERSON_FIELDS for key in person):
+        extra = {key: value for key, value in person.items() if key not in PERSON_FIELDS}
+    if unknown_current or unknown_target:
+        extra = extra or {}
+        extra['_unknown'] = {'current_portfolio_amount': unknown_current or {}, 'target_portfolio': unknown_target or {}}
+    return extra or None
+
+def _person_dict(name, risk_score, principal, current, target, extra):
+    person = {'name': name}
+    if risk_score is not None:
+        person['risk_score'] = risk_score
+    person['principal'] = principal
+    unknown = (extra or {}).get('_unknown') or {}
+    person['target_portfolio'] = {**target.to_dict(), **unknown.get('target_portfolio', {})}
+    person['current_portfolio_amount'] = {**current.to_dict(), **unknown.get('current_portfolio_amount', {})}
+    if extra:
+        person.update((key, value) for key, value in extra.items() if key != '_unknown')
+    return person
+
+class PersonRow:
+    """
+    PeopleBook içindeki bir satıra bakan kişi görünümü. Person ile aynı alanlara
+    sahiptir; atamalar kitabın dizilerine yazılır.
+    """
+    __slots__ = ('book', 'row')
+
+    def __init__(self, book, row):
+        self.book = book
+        self.row = row
+
+    @property
+    def name(self):
+        return self.book.names[self.row]
+
+    @property
+    def risk_score(self):
+        risk_score = float(self.book.risk_scores[self.row])
+        return None if math.isnan(risk_score) else risk_score
+
+    @risk_score.setter
+    def risk_score(self, value):
+        self.book.risk_scores[self.row] = np.nan if value is None else value
+
+    @property
+    def principal(self):
+        return float(self.book.principal[self.row])
+
+    @principal.setter
+    def principal(self, value):
+        self.book.principal[self.row] = value
+
+    @property
+    def current(self):
+        book = self.book
+        return Portfolio(book.universe, book.amounts[self.row], book.current_keys[self.row])
+
+    @property
+    def target(self):
+        book = self.book
+        return Portfolio(book.universe, book.target[self.row], book.target_keys[self.row])
+
+    @property
+    def extra(self):
+        return self.book.extras.get(self.row)
+
+    def to_dict(self):
+        return _person_dict(self.name, self.risk_score, self.principal, self.current, self.target, self.extra)
+
+    @property
+    def current_weights(self):
+        return self.current.weights(self.principal)
+
+    def __repr__(self):
+        return f"PersonRow({self.row}, {self.name!r}, principal={self.principal:,.2f})"
+
+class PeopleBook:
+    """
+    Kişileri sütun dizileri halinde tutan kitap. Diziler eklendikçe iki katına
+    büyütülür; trim() fazla kapasiteyi bırakır.
+    """
+    __slots__ = ('universe', 'names', 'risk_scores', 'principal', 'amounts', 'target',
+                 'current_keys', 'target_keys', 'extras', '_size', '_lookup')
+
+    def __init__(self, universe, capacity=INITIAL_CAPACITY):
+        self.universe = universe
+        self.names = []
+        self.extras = {}
+        self._size = 0
+        self._lookup = None
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        size, assets = self._size, len(self.universe)
+        risk_scores, principal = np.full(capacity, np.nan), np.zeros(capacity)
+        amounts, target = np.zeros((capacity, assets)), np.zeros((capacity, assets))
+        current_keys, target_keys = np.zeros((capacity, assets), dtype=bool), np.zeros((capacity, assets), dtype=bool)
+        if size:
+            risk_scores[:size] = self.risk_scores[:size]
+            principal[:size] = self.principal[:size]
+            amounts[:size] = self.amounts[:size]
+            target[:size] = self.target[:size]
+            current_keys[:size] = self.current_keys[:size]
+            target_keys[:size] = self.target_keys[:size]
+        self.risk_scores, self.principal, self.amounts, self.target = risk_scores, principal, amounts, target
+        self.current_keys, self.target_keys = current_keys, target_keys
+
+    @classmethod
+    def from_people(cls, people, universe):
+        """
+        Kişi sözlüklerinden (liste veya üreteç) kitap oluşturur.
+        """
+        size = len(people) if hasattr(people, '__len__') else INITIAL_CAPACITY
+        book = cls(universe, max(size, 1))
+        for person in people:
+            book.append(person)
+        return book.trim()
+
+    def append(self, person):
+        """
+        Bir kişi sözlüğünü kitaba ekler ve satır numarasını döndürür.
+        """
+        row = self._size
+        if row == len(self.principal):
+            self._allocate(max(1, 2 * row))
+        _, unknown_current = Portfolio.from_dict(person.get('current_portfolio_amount'), self.universe,
+                                                 self.amounts[row], self.current_keys[row])
+        _, unknown_target = Portfolio.from_dict(person.get('target_portfolio'), self.universe,
+                                                self.target[row], self.target_keys[row])
+        risk_score = person.get('risk_score')
+        if risk_score is not None:
+            self.risk_scores[row] = risk_score
+        self.principal[row] = person.get('principal', 0)
+        extra = _person_extra(person, unknown_current, unknown_target)
+        if extra:
+            self.extras[row] = extra
+        name = person.get('name', '')
+        self.names.append(name)
+        if self._lookup is not None:
+            self._lookup.setdefault(name, row)
+        self._size = row + 1
+        return row
+
+    def trim(self):
+        """
+        Dizileri kişi sayısına kadar küçültür.
+        """
+        if self._size < len(self.principal):
+            self._allocate(self._size)
+        return self
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self._size
+        if not 0 <= row < self._size:
+            raise IndexError(row)
+        return PersonRow(self, row)
+
+    def __iter__(self):
+        return (self[row] for row in range(self._size))
+
+    def find(self, name):
+        """
+        Adı verilen kişinin satır numarasını döndürür; bulunamazsa None.
+        """
+        if self._lookup is None:
+            self._lookup = {}
+            for row, person_name in enumerate(self.names):
+                self._lookup.setdefault(person_name, row)
+        return self._lookup.get(name)
+
+    def compile(self, table=None):
+        """
+        portfolio_engine.compile_people ile aynı biçimde dizileri döndürür
+        (kopyalama yapılmaz; current ağırlıkları hesaplanır).
+        """
+        size = self._size
+        principal, amounts = self.principal[:size], self.amounts[:size]
+        current = np.divide(amounts, principal[:, None], out=np.zeros_like(amounts), where=principal[:, None] > 0)
+        return {
+            'names': self.names,
+            'principal': principal,
+            'amounts': amounts,
+            'current': current,
+            'target': self.target[:size]
+        }
+
+    def to_people(self):
+        """
+        Kişi sözlüklerini sırayla üretir (storage.save_people için).
+        """
+        for row in range(self._size):
+            yield PersonRow(self, row).to_dict()
+
+    @property
+    def nbytes(self):
+        """
+        Dizilerin ve adların yaklaşık bellek kullanımı (bayt).
+        """
+        arrays = sum(array.nbytes for array in (self.risk_scores, self.principal, self.amounts, self.target,
+                                                self.current_keys, self.target_keys))
+        return arrays + sum(sys.getsizeof(name) for name in self.names) + sys.getsizeof(self.names)
+
+class SectorAllocation:
+    """
+    Yabancı hisse payının sektörlere dağılımı. Sektör oranları bir dizidir;
+    tutarlar ana para x yabancı hisse payı x sektör oranı olarak hesaplanır.
+    """
+    __slots__ = ('sectors', 'descriptions', 'percentages', 'principal', 'foreign_allocation')
+
+    def __init__(self, sectors, descriptions, percentages, principal=0.0, foreign_allocation=0.0):
+        self.sectors = sectors
+        self.descriptions = descriptions
+        self.percentages = percentages
+        self.principal = principal
+        self.foreign_allocation = foreign_allocation
+
+    @classmethod
+    def from_config(cls, sector_config, principal=0.0, foreign_allocation=0.0):
+        sectors = (sector_config or {}).get('sectors') or {}
+        return cls(
+            tuple(sectors),
+            tuple(info.get('description', '') for info in sectors.values()),
+            np.array([info['percentage'] for info in sectors.values()], dtype=np.float64),
+            principal,
+            foreign_allocation
+        )
+
+    def for_person(self, principal, foreign_allocation):
+        """
+        Aynı sektör dizileriyle başka bir kişi için dağılım döndürür.
+        """
+        return SectorAllocation(self.sectors, self.descriptions, self.percentages, principal, foreign_allocation)
+
+    @property
+    def amounts(self):
+        return self.principal * self.foreign_allocation * self.percentages
+
+    @property
+    def percentages_of_total(self):
+        return self.foreign_allocation * self.percentages
+
+    def allocate(self, principals, foreign_allocations):
+        """
+        Birçok kişi için sektör tutarlarını (kişi x sektör) tek işlemde hesaplar.
+        """
+        us_totals = np.asarray(principals, dtype=np.float64) * np.asarray(foreign_allocations, dtype=np.float64)
+        return np.outer(us_totals, self.percentages)
+
+    def to_dict(self):
+        """
+        us_sector_calculator.calculate_us_sector_allocation çıktısıyla aynı sözlük.
+        """
+        return {
+            sector: {
+                'amount': amount,
+                'percentage_of_us': percent,
+                'percentage_of_total': self.foreign_allocation * percent,
+                'description': description
+            }
+            for sector, description, percent, amount in zip(
+                self.sectors, self.descriptions, self.percentages.tolist(), self.amounts.tolist()
+            )
+        }
+
+def load_book(asset_info, storage=None):
+    """
+    Depolamadaki kişileri tek tek okuyarak PeopleBook oluşturur.
+
+    Returns:
+        PeopleBook veya None (okuma hatası)
+    """
+    people = (storage or get_storage()).iter_people()
+    if people is None:
+        return None
+    return PeopleBook.from_people(people, AssetUniverse(asset_info))
+
+def _synthetic_people(count, universe, seed=0):
+    rng = np.random.default_rng(seed)
+    names = universe.names
+    for start in range(0, count, INITIAL_CAPACITY):
+        size = min(INITIAL_CAPACITY, count - start)
+        amounts = rng.uniform(0, 50_000, (size, len(names))).round(2)
+        weights = rng.dirichlet(np.ones(len(names)), size).round(4)
+        risk_scores = rng.uniform(1, 10, size).round(1)
+        for i in range(size):
+            yield {
+                'name': f"Person {start + i:07d}",
+                'risk_score': float(risk_scores[i]),
+                'principal': float(amounts[i].sum()),
+                'target_portfolio': dict(zip(names, weights[i].tolist())),
+                'current_portfolio_amount': dict(zip(names, amounts[i].tolist()))
+            }
+
+def _measure(function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = function()
+    seconds = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, seconds, current, peak
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Kişi sözlükleri ile PeopleBook bellek kullanımını karşılaştırır.")
+    parser.add_argument("--synthetic", type=int, help="people.json yerine bu kadar sentetik kişi kullan")
+    args = parser.parse_args()
+
+    asset_info = load_json(ASSET_FILE)
+    if asset_info is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    universe = AssetUniverse(asset_info)
+
+    if args.synthetic:
+        people, dict_seconds, dict_bytes, _ = _measure(lambda: list(_synthetic_people(args.synthetic, universe)))
+        book, book_seconds, book_bytes, book_peak = _measure(
+            lambda: PeopleBook.from_people(_synthetic_people(args.synthetic, universe), universe)
+        )
+    else:
+        people = get_storage().load_people()
+        if people is None:
+            sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+        _, dict_seconds, dict_bytes, _ = _measure(lambda: copy.deepcopy(people))
+        book, book_seconds, book_bytes, book_peak = _measure(lambda: PeopleBook.from_people(people, universe))
+
+    print(f"{'Kişi sayısı:':<28}{len(book):>14,}")
+    print(f"{'Sözlük listesi (MB):':<28}{dict_bytes / 2 ** 20:>14,.1f}")
+    print(f"{'PeopleBook (MB):':<28}{book_bytes / 2 ** 20:>14,.1f}")
+    print(f"{'PeopleBook en yüksek (MB):':<28}{book_peak / 2 ** 20:>14,.1f}")
+    print(f"{'Oran:':<28}{book_bytes / dict_bytes if dict_bytes else 0:>14.3f}")
+    print(f"{'Yükleme süresi (sn):':<28}{book_seconds:>14.2f}  (tracemalloc açıkken)")
@@ -0,0 +1,364 @@
+"""
+Monte Carlo Scenario Simulator
+Korelasyonlu varlık getirileri ve USD/TRY hareketleri çekerek mevcut ve hedef
+portföylerin yıl sonu değerleri için yüzdelik bantlar üreten modül.
+"""
+
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from portfolio_engine import (
+    USD_TRY_ASSET,
+    SCENARIOS,
+    get_asset_table,
+    pack_weights
+)
+from data_store import load_json, SIMULATION_CONFIG_FILE
+from report_renderer import make_section
+
+DEFAULT_PATHS = 1_000_000
+DEFAULT_CHUNK_SIZE = 100_000
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Yüzdelikler yolların tamamı yerine sabit boyutlu bir getiri histogramından
+# hesaplanır. Aralık dışında kalan getiriler uç kutulara yazılır.
+RETURN_RANGE = (-1.0, 4.0)
+HISTOGRAM_BINS = 20_000
+
+def load_simulation_config():
+    """
+    Simülasyon konfigürasyon dosyasını yükler.
+    Returns:
+        dict: Simülasyon ayarlarını içeren dictionary veya None
+    """
+    try:
+        return load_json(SIMULATION_CONFIG_FILE)
+    except FileNotFoundError:
+        print(f"Hata: '{SIMULATION_CONFIG_FILE}' bulunamadı.")
+        return None
+    except json.JSONDecodeError:
+        print(f"Hata: '{SIMULATION_CONFIG_FILE}' geçerli bir JSON dosyası değil.")
+        return None
+
+def build_correlation_matrix(names, sim_config):
+    """
+    Konfigürasyondaki korelasyon matrisini asset_info varlık sırasına göre dizer.
+    Matriste bulunmayan varlıklar diğerleriyle korelasyonsuz kabul edilir.
+
+    Args:
+        names: asset_info varlık adları (pack_asset_info sırası)
+        sim_config: Simülasyon konfigürasyonu
+
+    Returns:
+        np.ndarray: (varlık sayısı, varlık sayısı) korelasyon matrisi
+    """
+    correlation = np.eye(len(names))
+    config = (sim_config or {}).get('correlation', {})
+    config_assets = config.get('assets', [])
+    config_matrix = np.array(config.get('matrix', []), dtype=np.float64)
+    if config_matrix.shape != (len(config_assets), len(config_assets)):
+        if config_assets:
+            print("\nUYARI: Korelasyon matrisinin boyutu varlık listesiyle uyuşmuyor. Korelasyon kullanılmayacak.")
+        return correlation
+
+    position = {name: i for i, name in enumerate(names)}
+    rows = [i for i, asset in enumerate(config_assets) if asset in position]
+    cols = [position[config_assets[i]] for i in rows]
+    correlation[np.ix_(cols, cols)] = config_matrix[np.ix_(rows, rows)]
+    np.fill_diagonal(correlation, 1.0)
+    return correlation
+
+def _cholesky(correlation):
+    """
+    Korelasyon matrisinin Cholesky ayrışımını döndürür. Matris pozitif tanımlı
+    değilse negatif özdeğerler kırpılarak en yakın geçerli matris kullanılır.
+    """
+    try:
+        return np.linalg.cholesky(correlation)
+    except np.linalg.LinAlgError:
+        print("\nUYARI: Korelasyon matrisi pozitif tanımlı değil. En yakın geçerli matris kullanılıyor.")
+        eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+        fixed = eigenvectors @ np.diag(np.clip(eigenvalues, 1e-10, None)) @ eigenvectors.T
+        scale = np.sqrt(np.diag(fixed))
+        return np.linalg.cholesky(fixed / np.outer(scale, scale))
+
+def build_simulation_model(asset_info, sim_config):
+    """
+    asset_info ve simülasyon konfigürasyonundan çekiliş modelini oluşturur.
+    Her varlığın ortalaması baz senaryo getirisi, oynaklığı 'volatility' alanıdır.
+    'distribution' alanı "normal" veya "lognormal" olabilir.
+
+    Returns:
+        dict: Ortalama, oynaklık, lognormal parametreleri, Cholesky çarpanı
+              ve kurla birleştirme maskesi
+    """
+    table = get_asset_table(asset_info)
+    means = table['returns'][SCENARIOS.index('base')]
+    volatility = np.array(
+        [info.get('volatility', 0) for info in asset_info.values()],
+        dtype=np.float64
+    )
+    is_lognormal = np.array(
+        [info.get('distribution', 'normal') == 'lognormal' for info in asset_info.values()],
+        dtype=bool
+    )
+
+    # Lognormal varlıklarda 1 + getiri ortalaması ve oynaklığı korunur
+    gross_mean = np.maximum(1 + means, 1e-9)
+    log_sigma = np.sqrt(np.log1p((volatility / gross_mean) ** 2))
+    log_mu = np.log(gross_mean) - 0.5 * log_sigma ** 2
+
+    correlation = build_correlation_matrix(table['names'], sim_config)
+    return {
+        'names': table['names'],
+        'means': means,
+        'volatility': volatility,
+        'is_lognormal': is_lognormal,
+        'log_mu': log_mu,
+        'log_sigma': log_sigma,
+        'cholesky': _cholesky(correlation),
+        'combine_mask': table['combine_mask'],
+        'fx_index': table['index'].get(USD_TRY_ASSET)
+    }
+
+def draw_returns(model, n_paths, rng):
+    """
+    Korelasyonlu varlık getirilerini çeker ve USD bazlı varlıkları aynı yoldaki
+    USD/TRY hareketiyle birleştirir.
+
+    Returns:
+        np.ndarray: (yol sayısı, varlık sayısı) TL bazlı getiri matrisi
+    """
+    shocks = rng.standard_normal((n_paths, len(model['names']))) @ model['cholesky'].T
+    returns = np.where(
+        model['is_lognormal'],
+        np.expm1(model['log_mu'] + model['log_sigma'] * shocks),
+        model['means'] + model['volatility'] * shocks
+    )
+    # Bir varlık değerinin tamamından fazlasını kaybedemez
+    np.maximum(returns, -1.0, out=returns)
+
+    if model['fx_index'] is not None:
+        fx_move = returns[:, model['fx_index']][:, None]
+        returns = np.where(model['combine_mask'], (1 + returns) * (1 + fx_move) - 1, returns)
+    return returns
+
+def _simulate_chunk(job):
+    """
+    Tek bir yol parçasını simüle eder ve yalnızca histogram özetini döndürür.
+    Süreç havuzunda çalışabilmesi için modül seviyesinde tanımlanmıştır.
+    """
+    model, weights, n_paths, seed = job
+    rng = np.random.default_rng(seed)
+    portfolio_returns = draw_returns(model, n_paths, rng) @ weights.T
+
+    low, high = RETURN_RANGE
+    width = (high - low) / HISTOGRAM_BINS
+    bins = np.clip(((portfolio_returns - low) / width).astype(np.int64), 0, HISTOGRAM_BINS - 1)
+    offsets = np.arange(weights.shape[0], dtype=np.int64) * HISTOGRAM_BINS
+    counts = np.bincount((bins + offsets).ravel(), minlength=weights.shape[0] * HISTOGRAM_BINS)
+
+    return (
+        counts.reshape(weights.shape[0], HISTOGRAM_BINS),
+        portfolio_returns.sum(axis=0),
+        portfolio_returns.min(axis=0),
+        portfolio_returns.max(axis=0)
+    )
+
+def histogram_percentiles(counts, minimum, maximum, percentiles):
+    """
+    Getiri histogramından yüzdelikleri kutu içi doğrusal enterpolasyonla hesaplar.
+
+    Returns:
+        np.ndarray: (portföy sayısı, yüzdelik sayısı) getiri matrisi
+    """
+    low, high = RETURN_RANGE
+    width = (high - low) / HISTOGRAM_BINS
+    cumulative = np.cumsum(counts, axis=1)
+    totals = cumulative[:, -1:]
+    result = np.empty((counts.shape[0], len(percentiles)))
+    for col, percentile in enumerate(percentiles):
+        target = totals[:, 0] * percentile / 100
+        bin_index = np.minimum((cumulative < target[:, None]).sum(axis=1), HISTOGRAM_BINS - 1)
+        rows = np.arange(counts.shape[0])
+        before = np.where(bin_index > 0, cumulative[rows, np.maximum(bin_index - 1, 0)], 0)
+        in_bin = np.maximum(counts[rows, bin_index], 1)
+        fraction = np.clip((target - before) / in_bin, 0, 1)
+        result[:, col] = low + (bin_index + fraction) * width
+    return np.clip(result, minimum[:, None], maximum[:, None])
+
+def simulate_portfolios(weights, model, n_paths=DEFAULT_PATHS, seed=None,
+                        workers=None, chunk_size=DEFAULT_CHUNK_SIZE,
+                        percentiles=DEFAULT_PERCENTILES):
+    """
+    Ağırlık matrisindeki her portföy için n_paths yol simüle eder. Yollar parça
+    parça üretilip histograma eklenir; bellekte hiçbir zaman tüm yollar tutulmaz.
+    Aynı seed her işçi sayısında aynı sonucu verir.
+
+    Args:
+        weights: (portföy sayısı, varlık sayısı) ağırlık matrisi
+        model: build_simulation_model çıktısı
+        n_paths: Simüle edilecek yol sayısı
+        seed: Rastgele sayı üreteci tohumu
+        workers: Süreç havuzu boyutu (None veya 1 ise tek süreç)
+        chunk_size: Parça başına yol sayısı
+        percentiles: Hesaplanacak yüzdelikler
+
+    Returns:
+        dict: 'paths', 'percentiles', 'returns' (portföy x yüzdelik getiri),
+              'mean', 'min' ve 'max' getirileri
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    n_chunks = max(1, -(-n_paths // chunk_size))
+    sizes = [chunk_size] * (n_chunks - 1) + [n_paths - chunk_size * (n_chunks - 1)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    jobs = [(model, weights, size, chunk_seed) for size, chunk_seed in zip(sizes, seeds)]
+
+    counts = np.zeros((weights.shape[0], HISTOGRAM_BINS), dtype=np.int64)
+    total = np.zeros(weights.shape[0])
+    minimum = np.full(weights.shape[0], np.inf)
+    maximum = np.full(weights.shape[0], -np.inf)
+
+    def accumulate(results):
+        nonlocal total
+        for chunk_counts, chunk_sum, chunk_min, chunk_max in results:
+            counts[:] += chunk_counts
+            total = total + chunk_sum
+            np.minimum(minimum, chunk_min, out=minimum)
+            np.maximum(maximum, chunk_max, out=maximum)
+
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            accumulate(executor.map(_simulate_chunk, jobs))
+    else:
+        accumulate(map(_simulate_chunk, jobs))
+
+    return {
+        'paths': n_paths,
+        'percentiles': tuple(percentiles),
+        'returns': histogram_percentiles(counts, minimum, maximum, percentiles),
+        'mean': total / n_paths,
+        'min': minimum,
+        'max': maximum
+    }
+
+def simulate_person(principal, current_dist, target_dist, asset_info, sim_config=None,
+                    n_paths=None, seed=None, workers=None):
+    """
+    Bir kişinin mevcut ve hedef portföyünü aynı yollar üzerinde simüle eder.
+    Belirtilmeyen parametreler simülasyon konfigürasyonundan okunur.
+
+    Returns:
+        dict: simulate_portfolios sonucu ve TL bazlı 'final_values'
+              (0: mevcut, 1: hedef portföy)
+    """
+    sim_config = sim_config or {}
+    model = build_simulation_model(asset_info, sim_config)
+    table = get_asset_table(asset_info)
+    weights = pack_weights([current_dist, target_dist], table)
+
+    summary = simulate_portfolios(
+        weights,
+        model,
+        n_paths=n_paths or sim_config.get('paths', DEFAULT_PATHS),
+        seed=seed if seed is not None else sim_config.get('seed'),
+        workers=workers if workers is not None else sim_config.get('workers'),
+        chunk_size=sim_config.get('chunk_size', DEFAULT_CHUNK_SIZE),
+        percentiles=sim_config.get('percentiles', DEFAULT_PERCENTILES)
+    )
+    summary['final_values'] = principal * (1 + summary['returns'])
+    return summary
+
+def build_monte_carlo_section(summary, principal):
+    """
+    simulate_person sonucunu rapor belgesi bölümü olarak hazırlar.
+    """
+    rows = []
+    for col, percentile in enumerate(summary['percentiles']):
+        current_return, target_return = summary['returns'][:, col]
+        current_final, target_final = summary['final_values'][:, col]
+        rows.append({
+            'percentile': f"P{percentile}",
+            'current_return': float(current_return),
+            'current_final': float(current_final),
+            'target_return': float(target_return),
+            'target_final': float(target_final)
+        })
+    current_mean, target_mean = summary['mean']
+    columns = [
+        ('percentile', 'Yüzdelik'),
+        ('current_return', 'Mevcut % Getiri'),
+        ('current_final', 'Mevcut Son Değer (TL)'),
+        ('target_return', 'Hedef % Getiri'),
+        ('target_final', 'Hedef Son Değer (TL)')
+    ]
+    return make_section('monte_carlo', 'Monte Carlo Analizi', columns, rows, {
+        'paths': int(summary['paths']),
+        'current_mean': float(current_mean),
+        'target_mean': float(target_mean),
+        'current_mean_final': float(principal * (1 + current_mean)),
+        'target_mean_final': float(principal * (1 + target_mean))
+    })
+
+def format_monte_carlo_lines(section):
+    """
+    Monte Carlo bölümünü metin tablosu satırlarına çevirir.
+    """
+    fields = section['fields']
+    table_width = 95
+    lines = [
+        "",
+        "-" * table_width,
+        f"MONTE CARLO ANALİZİ ({fields['paths']:,} yol, Yıllık TL Bazlı)".center(table_width),
+        "-" * table_width,
+        f"{'YÜZDELİK':<15} | {'MEVCUT PORTFÖY':^35} | {'HEDEF PORTFÖY':^35}",
+        f"{'':<15} | {'% Getiri':^16} | {'Son Değer (TL)':>16} | {'% Getiri':^16} | {'Son Değer (TL)':>16}",
+        "-" * table_width
+    ]
+    for row in section['rows']:
+        lines.append(
+            f"{row['percentile']:<15} | "
+            f"{row['current_return']*100:^15.2f}% | {row['current_final']:>16,.2f} | "
+            f"{row['target_return']*100:^15.2f}% | {row['target_final']:>16,.2f}"
+        )
+    lines.append("-" * table_width)
+    lines.append(
+        f"{'Ortalama':<15} | "
+        f"{fields['current_mean']*100:^15.2f}% | {fields['current_mean_final']:>16,.2f} | "
+        f"{fields['target_mean']*100:^15.2f}% | {fields['target_mean_final']:>16,.2f}"
+    )
+    return lines
+
+def show_monte_carlo_analysis(principal, current_dist, target_dist, asset_info, sim_config=None):
+    """
+    Mevcut ve hedef portföyün yıl sonu değer yüzdeliklerini yan yana gösterir.
+    """
+    summary = simulate_person(principal, current_dist, target_dist, asset_info, sim_config)
+    sys.stdout.write("\n".join(format_monte_carlo_lines(build_monte_carlo_section(summary, principal))) + "\n")
+    return summary
+
+if __name__ == "__main__":
+    from comparison_report import load_file, select_person, ASSET_FILE
+    from portfolio_engine import current_distribution, normalize_people
+    from storage import get_storage
+
+    people_list = get_storage().load_people()
+    asset_info = load_file(ASSET_FILE)
+    sim_config = load_simulation_config()
+    if people_list is None or asset_info is None or sim_config is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    normalize_people(people_list, asset_info)
+
+    selected_person = select_person(people_list)
+    if selected_person:
+        print(f"\nKişi: {selected_person['name']}")
+        show_monte_carlo_analysis(
+            selected_person.get('principal', 0),
+            current_distribution(selected_person),
+            selected_person.get('target_portfolio') or {},
+            asset_info,
+            sim_config
+        )
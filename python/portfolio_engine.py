@@ -0,0 +1,265 @@
+"""
+Portfolio Valuation Engine
+Varlık bilgilerini ve kişileri NumPy dizilerine paketleyerek risk ve senaryo
+getirilerini tüm kişiler için tek bir matris işlemiyle hesaplayan modül.
+
+Varlıklar asset_info.json sırasına göre sıfırdan başlayan tamsayı kimliklerle
+(ID) indekslenir. asset_info içindeki "aliases" listesi, aynı varlığın farklı
+yazımlarını (ör. "Turkish Stock") aynı kimliğe eşler.
+"""
+
+import numpy as np
+
+USD_TRY_ASSET = "USD TRY Based"
+
+# Kişi kayıtlarında varlık adı anahtarı taşıyan alanlar
+PORTFOLIO_FIELDS = ("current_portfolio_amount", "target_portfolio")
+
+SCENARIOS = ("bad", "base", "good")
+SCENARIO_KEYS = {
+    "bad": "bad_scenario_return",
+    "base": "expected_percentage_return",
+    "good": "good_scenario_return"
+}
+
+# Son paketlenen asset_info tablosu: (asset_info, fx_asset, tablo)
+_table_cache = None
+
+def pack_asset_info(asset_info, fx_asset=USD_TRY_ASSET):
+    """
+    asset_info sözlüğünü varlık sırasına göre NumPy dizilerine paketler.
+
+    Args:
+        asset_info: asset_info.json içeriği
+        fx_asset: Kur artışı beklentisinin okunacağı varlık adı
+
+    Returns:
+        dict: names, index (ad ve takma ad -> ID), risk_scores, returns
+              (senaryo x varlık), is_usd_based, kurla birleştirilecek varlıklar
+              (combine_mask) ve kurla birleştirilmiş combined_returns dizileri
+    """
+    names = list(asset_info.keys())
+    index = {name: i for i, name in enumerate(names)}
+    for i, info in enumerate(asset_info.values()):
+        for alias in info.get('aliases', ()):
+            index.setdefault(alias, i)
+
+    risk_scores = np.array(
+        [info.get('risk_score', info.get('risk_puani', 0)) for info in asset_info.values()],
+        dtype=np.float64
+    )
+    returns = np.array(
+        [[info.get(SCENARIO_KEYS[s], 0) for info in asset_info.values()] for s in SCENARIOS],
+        dtype=np.float64
+    ).reshape(len(SCENARIOS), len(names))
+    is_usd_based = np.array(
+        [bool(info.get('is_usd_based', False)) for info in asset_info.values()],
+        dtype=bool
+    )
+
+    # Kur artışı beklentisi her senaryo için ayrı okunur
+    fx_returns = np.array(
+        [asset_info.get(fx_asset, {}).get(SCENARIO_KEYS[s], 0) for s in SCENARIOS],
+        dtype=np.float64
+    )
+    # "USD TRY Based" varlığının kendisi zaten kur artışını temsil ettiği için birleştirilmez
+    combine_mask = is_usd_based.copy()
+    if USD_TRY_ASSET in index:
+        combine_mask[index[USD_TRY_ASSET]] = False
+    combined_returns = np.where(
+        combine_mask,
+        (1 + returns) * (1 + fx_returns[:, None]) - 1,
+        returns
+    )
+
+    return {
+        'names': names,
+        'index': index,
+        'risk_scores': risk_scores,
+        'returns': returns,
+        'is_usd_based': is_usd_based,
+        'fx_asset': fx_asset,
+        'fx_returns': fx_returns,
+        'combine_mask': combine_mask,
+        'combined_returns': combined_returns
+    }
+
+def get_asset_table(asset_info, fx_asset=USD_TRY_ASSET):
+    """
+    Aynı asset_info nesnesi için paketlenmiş tabloyu tekrar kullanır.
+    Tek kişilik hesaplamalarda her çağrıda yeniden paketleme yapılmasını önler.
+    """
+    global _table_cache
+    if _table_cache is not None:
+        cached_info, cached_fx, cached_table = _table_cache
+        if cached_info is asset_info and cached_fx == fx_asset:
+            return cached_table
+    table = pack_asset_info(asset_info, fx_asset)
+    _table_cache = (asset_info, fx_asset, table)
+    return table
+
+def pack_weights(distributions, table):
+    """
+    Portföy dağılımlarını (varlık -> oran) kişi x varlık ağırlık matrisine çevirir.
+    Takma adlar asıl varlığa eklenir; asset_info içinde bulunmayan varlıklar
+    hesaba katılmaz (bunlar yükleme sırasında normalize_people ile raporlanır).
+
+    Args:
+        distributions: Portföy dağılımı sözlüklerinden oluşan liste
+        table: pack_asset_info çıktısı
+
+    Returns:
+        np.ndarray: (kişi sayısı, varlık sayısı) boyutunda ağırlık matrisi
+    """
+    index = table['index']
+    weights = np.zeros((len(distributions), len(table['names'])), dtype=np.float64)
+    for row, distribution in enumerate(distributions):
+        if not distribution:
+            continue
+        for asset, percent in distribution.items():
+            col = index.get(asset)
+            if col is not None:
+                weights[row, col] += percent
+    return weights
+
+def asset_id(name, table):
+    """
+    Varlık adının (veya takma adının) tamsayı kimliğini döndürür; bilinmiyorsa None.
+    """
+    return table['index'].get(name)
+
+def normalize_people(people, asset_info, report=True):
+    """
+    Kişilerin portföy anahtarlarını yükleme sırasında doğrular: takma adlar asıl
+    varlık adına çevrilir (aynı varlığa düşen değerler toplanır), asset_info içinde
+    bulunmayan anahtarlar bir kez, tek bir uyarıda raporlanır. Bilinmeyen anahtarlar
+    veriden silinmez, yalnızca hesaplamalara dahil edilmez.
+
+    Kişi sözlükleri yerinde değiştirilmez (load_json önbelleğiyle paylaşılabilirler);
+    anahtarı çevrilen kişiler listede yeni sözlüklerle değiştirilir.
+
+    Args:
+        people: Kişi listesi (elemanları gerektiğinde yeni sözlüklerle değiştirilir)
+        asset_info: asset_info.json içeriği
+        report: True ise bilinmeyen anahtarlar ekrana yazdırılır
+
+    Returns:
+        dict: {bilinmeyen varlık adı: [kişi adları]}
+    """
+    table = get_asset_table(asset_info)
+    index, names = table['index'], table['names']
+    unknown = {}
+    for i, person in enumerate(people):
+        updated = None
+        for field in PORTFOLIO_FIELDS:
+            distribution = person.get(field)
+            if not distribution or all(asset in asset_info for asset in distribution):
+                continue
+            canonical = {}
+            for asset, value in distribution.items():
+                col = index.get(asset)
+                if col is None:
+                    unknown.setdefault(asset, []).append(person.get('name', ''))
+                    key = asset
+                else:
+                    key = names[col]
+                canonical[key] = canonical.get(key, 0) + value
+            if updated is None:
+                updated = dict(person)
+            updated[field] = canonical
+        if updated is not None:
+            people[i] = updated
+
+    if report:
+        for asset, owners in unknown.items():
+            shown = ", ".join(sorted(set(owners))[:5])
+            more = f" (+{len(set(owners)) - 5} kişi)" if len(set(owners)) > 5 else ""
+            print(f"UYARI: '{asset}' varlığı asset_info.json içinde tanımlı değil, hesaplamalara dahil edilmeyecek. Kişiler: {shown}{more}")
+    return unknown
+
+def compile_people(people, table):
+    """
+    Kişileri varlık kimliğine göre indekslenmiş dizilere dönüştürür.
+
+    Returns:
+        dict: 'names', 'principal' (kişi,), 'amounts', 'current' ve 'target'
+              (kişi x varlık) dizileri
+    """
+    if hasattr(people, 'compile'):
+        # models.PeopleBook zaten varlık sırasına göre dizilerde tutulur
+        return people.compile(table)
+    principal = np.array([p.get('principal', 0) for p in people], dtype=np.float64)
+    amounts = pack_weights([p.get('current_portfolio_amount') or {} for p in people], table)
+    current = np.divide(amounts, principal[:, None], out=np.zeros_like(amounts), where=principal[:, None] > 0)
+    return {
+        'names': [p.get('name', '') for p in people],
+        'principal': principal,
+        'amounts': amounts,
+        'current': current,
+        'target': pack_weights([p.get('target_portfolio') or {} for p in people], table)
+    }
+
+def current_distribution(person):
+    """
+    Kişinin mevcut tutarlarını ana paraya bölerek oran dağılımını döndürür.
+    """
+    principal = person.get('principal', 0)
+    if principal <= 0:
+        return {}
+    amounts = person.get('current_portfolio_amount', {})
+    return {asset: amount / principal for asset, amount in amounts.items()}
+
+def evaluate_weights(weights, table):
+    """
+    Ağırlık matrisindeki tüm portföyler için risk ve senaryo getirilerini hesaplar.
+
+    Args:
+        weights: (kişi sayısı, varlık sayısı) boyutunda ağırlık matrisi
+        table: pack_asset_info çıktısı
+
+    Returns:
+        dict: 'risk' (kişi,) ve 'returns' (kişi, senaryo) dizileri.
+              Senaryo sırası SCENARIOS ile aynıdır (bad, base, good).
+    """
+    return {
+        'risk': weights @ table['risk_scores'],
+        'returns': weights @ table['combined_returns'].T
+    }
+
+def evaluate_people(people, asset_info, fx_asset=USD_TRY_ASSET):
+    """
+    Tüm kişilerin mevcut ve hedef portföyleri için risk ve senaryo getirilerini
+    toplu olarak hesaplar.
+
+    Returns:
+        dict: 'names', 'principal' ile 'current' ve 'target' için
+              evaluate_weights sonuçları
+    """
+    table = get_asset_table(asset_info, fx_asset)
+    compiled = compile_people(people, table)
+    return {
+        'names': compiled['names'],
+        'principal': compiled['principal'],
+        'current': evaluate_weights(compiled['current'], table),
+        'target': evaluate_weights(compiled['target'], table)
+    }
+
+def portfolio_risk(portfolio_distribution, table):
+    """
+    Tek bir portföyün ağırlıklı ortalama risk puanını döndürür.
+    """
+    if not portfolio_distribution:
+        return 0
+    weights = pack_weights([portfolio_distribution], table)[0]
+    return float(weights @ table['risk_scores'])
+
+def portfolio_return(portfolio_distribution, table, scenario='base'):
+    """
+    Tek bir portföyün verilen senaryodaki TL bazlı getirisini döndürür.
+    Bilinmeyen senaryo adları baz senaryo olarak değerlendirilir.
+    """
+    if not portfolio_distribution:
+        return 0
+    row = SCENARIOS.index(scenario) if scenario in SCENARIOS else SCENARIOS.index('base')
+    weights = pack_weights([portfolio_distribution], table)[0]
+    return float(weights @ table['combined_returns'][row])
@@ -0,0 +1,280 @@
+"""
+Mean-Variance Portfolio Optimizer
+Beklenen getiriler ve kovaryans matrisinden etkin sınırı (efficient frontier) bir
+kez hesaplayan ve her kişiye risk skoruna uygun bir hedef dağılım öneren modül.
+
+Beklenen getiriler calculate_portfolio_return ile aynı şekilde USD/TRY
+beklentisiyle birleştirilir. Sınır, aynı ağırlık sınırlarına sahip tüm kişiler
+için tek sefer hesaplanıp tekrar kullanılır.
+
+Kullanım:
+    python portfolio_optimizer.py            # sınırı ve kişi önerilerini göster
+    python portfolio_optimizer.py --save     # önerileri target_portfolio olarak kaydet
+"""
+
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from portfolio_engine import USD_TRY_ASSET, SCENARIOS, get_asset_table, normalize_people
+from monte_carlo import load_simulation_config, build_correlation_matrix
+from data_store import load_json, OPTIMIZER_CONFIG_FILE
+
+DEFAULT_FRONTIER_POINTS = 200
+DEFAULT_MAX_WEIGHT = 1.0
+SOLVER_ITERATIONS = 5000
+SOLVER_TOLERANCE = 1e-10
+
+def load_optimizer_config():
+    """
+    Optimizasyon konfigürasyon dosyasını yükler.
+    Returns:
+        dict: Optimizasyon ayarlarını içeren dictionary veya None
+    """
+    try:
+        return load_json(OPTIMIZER_CONFIG_FILE)
+    except FileNotFoundError:
+        print(f"Hata: '{OPTIMIZER_CONFIG_FILE}' bulunamadı.")
+        return None
+    except json.JSONDecodeError:
+        print(f"Hata: '{OPTIMIZER_CONFIG_FILE}' geçerli bir JSON dosyası değil.")
+        return None
+
+def build_covariance(asset_info, sim_config=None, opt_config=None):
+    """
+    TL bazlı getiri kovaryans matrisini döndürür.
+
+    Konfigürasyonda açık bir 'covariance' matrisi verilmişse o kullanılır. Aksi
+    halde varlık oynaklıkları ve korelasyon matrisinden yerel getiri kovaryansı
+    kurulur ve USD bazlı varlıkların (1 + r) * (1 + kur) - 1 birleşimi birinci
+    dereceden yaklaşımla kovaryansa yansıtılır.
+
+    Returns:
+        np.ndarray: (varlık, varlık) kovaryans matrisi
+    """
+    table = get_asset_table(asset_info)
+    names = table['names']
+    explicit = (opt_config or {}).get('covariance')
+    if explicit:
+        position = {name: i for i, name in enumerate(explicit.get('assets', []))}
+        matrix = np.array(explicit.get('matrix', []), dtype=np.float64)
+        order = [position.get(name) for name in names]
+        if any(i is None for i in order) or matrix.shape != (len(position), len(position)):
+            raise ValueError("Kovaryans matrisi asset_info.json içindeki tüm varlıkları içermelidir.")
+        return matrix[np.ix_(order, order)]
+
+    volatility = np.array([info.get('volatility', 0) for info in asset_info.values()], dtype=np.float64)
+    correlation = build_correlation_matrix(names, sim_config)
+    local_cov = correlation * np.outer(volatility, volatility)
+
+    fx_index = table['index'].get(USD_TRY_ASSET)
+    if fx_index is None:
+        return local_cov
+    base = SCENARIOS.index('base')
+    means = table['returns'][base]
+    fx_mean = table['fx_returns'][base]
+    jacobian = np.eye(len(names))
+    combined = np.flatnonzero(table['combine_mask'])
+    jacobian[combined, combined] = 1 + fx_mean
+    jacobian[combined, fx_index] += 1 + means[combined]
+    return jacobian @ local_cov @ jacobian.T
+
+def weight_bounds(names, opt_config=None, person_constraints=None):
+    """
+    Varlık bazlı alt ve üst ağırlık sınırlarını dizi olarak döndürür. Kişiye özel
+    sınırlar genel konfigürasyonun üzerine yazılır.
+
+    Raises:
+        ValueError: Sınırlarla toplamı 1 olan bir dağılım mümkün değilse
+    """
+    opt_config = opt_config or {}
+    person_constraints = person_constraints or {}
+    min_weights = {**opt_config.get('min_weights', {}), **person_constraints.get('min', {})}
+    max_weights = {**opt_config.get('max_weights', {}), **person_constraints.get('max', {})}
+    lower = np.array([min_weights.get(n, opt_config.get('default_min_weight', 0.0)) for n in names], dtype=np.float64)
+    upper = np.array([max_weights.get(n, opt_config.get('default_max_weight', DEFAULT_MAX_WEIGHT)) for n in names], dtype=np.float64)
+    if np.any(lower > upper) or lower.sum() > 1 + 1e-9 or upper.sum() < 1 - 1e-9:
+        raise ValueError("Ağırlık sınırları ile toplamı %100 olan bir portföy oluşturulamıyor.")
+    return lower, upper
+
+def project_to_bounds(values, lower, upper):
+    """
+    Her satırı, toplamı 1 olan ve [lower, upper] aralığında kalan en yakın
+    ağırlık vektörüne izdüşürür.
+
+    clip(values - shift, lower, upper) toplamı shift'e göre parçalı doğrusal ve
+    azalandır; kırılma noktalarında hesaplanıp toplamın 1 olduğu aralıkta
+    doğrusal enterpolasyonla kesin kaydırma değeri bulunur.
+    """
+    rows = np.arange(values.shape[0])
+    breakpoints = np.sort(np.concatenate([values - lower, values - upper], axis=1), axis=1)
+    totals = np.clip(values[:, None, :] - breakpoints[:, :, None], lower, upper).sum(axis=2)
+    right = np.minimum((totals > 1).sum(axis=1), breakpoints.shape[1] - 1)
+    left = np.maximum(right - 1, 0)
+    drop = totals[rows, left] - totals[rows, right]
+    fraction = np.where(drop > 0, (totals[rows, left] - 1) / np.where(drop > 0, drop, 1), 0)
+    shift = breakpoints[rows, left] + np.clip(fraction, 0, 1) * (breakpoints[rows, right] - breakpoints[rows, left])
+    return np.clip(values - shift[:, None], lower, upper)
+
+def compute_frontier(expected_returns, covariance, lower, upper, points=DEFAULT_FRONTIER_POINTS):
+    """
+    Etkin sınırı, farklı risk iştahı (lambda) değerleri için
+    max  mu'w - lambda/2 * w'Σw  problemini aynı anda çözerek hesaplar.
+    Tüm lambda değerleri tek bir izdüşümlü gradyan döngüsünde birlikte çözülür.
+
+    Returns:
+        dict: 'weights' (nokta, varlık), 'returns', 'volatility' ve 'risk_aversion'
+              (getiriye göre artan sırada, baskın olmayan ve tekrarsız noktalar)
+    """
+    risk_aversion = np.concatenate([np.geomspace(1000, 0.01, points - 1), [0.0]])
+    lipschitz = max(np.linalg.eigvalsh(covariance).max(), 1e-12)
+    step = 1 / (risk_aversion * lipschitz + 1)
+
+    # Hızlandırılmış (FISTA) izdüşümlü gradyan; tüm noktalar yakınsayınca durur
+    weights = project_to_bounds(np.full((points, len(expected_returns)), 1 / len(expected_returns)), lower, upper)
+    momentum_point, momentum = weights, 1.0
+    for _ in range(SOLVER_ITERATIONS):
+        gradient = expected_returns - risk_aversion[:, None] * (momentum_point @ covariance)
+        new_weights = project_to_bounds(momentum_point + step[:, None] * gradient, lower, upper)
+        new_momentum = (1 + np.sqrt(1 + 4 * momentum ** 2)) / 2
+        momentum_point = new_weights + ((momentum - 1) / new_momentum) * (new_weights - weights)
+        converged = np.abs(new_weights - weights).max() < SOLVER_TOLERANCE
+        weights, momentum = new_weights, new_momentum
+        if converged:
+            break
+
+    returns = weights @ expected_returns
+    volatility = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', weights, covariance, weights), 0))
+    order = np.argsort(returns, kind='stable')
+    weights, returns, volatility, risk_aversion = weights[order], returns[order], volatility[order], risk_aversion[order]
+
+    # Daha yüksek getirili bir nokta aynı veya daha düşük oynaklığa sahipse bu nokta elenir
+    later_min = np.append(np.minimum.accumulate(volatility[::-1])[::-1][1:], np.inf)
+    keep = np.flatnonzero(volatility <= later_min + 1e-10)
+    # Aynı noktaya yakınsayan lambda değerlerinden yalnızca ilki tutulur
+    pairs = np.round(np.column_stack([returns[keep], volatility[keep]]), 10)
+    _, first = np.unique(pairs, axis=0, return_index=True)
+    keep = keep[np.sort(first)]
+    return {
+        'weights': weights[keep],
+        'returns': returns[keep],
+        'volatility': volatility[keep],
+        'risk_aversion': risk_aversion[keep]
+    }
+
+def choose_frontier_point(frontier, risk_scores, asset_risk_scores):
+    """
+    Her kişi için, ağırlıklı risk puanı kişinin risk skorunu aşmayan en yüksek
+    getirili sınır noktasını seçer. Hiçbiri uygun değilse en düşük riskli nokta seçilir.
+
+    Returns:
+        np.ndarray: (kişi,) sınır noktası indeksleri
+    """
+    point_risk = frontier['weights'] @ asset_risk_scores
+    allowed = point_risk[None, :] <= np.asarray(risk_scores, dtype=np.float64)[:, None] + 1e-9
+    scored_returns = np.where(allowed, frontier['returns'][None, :], -np.inf)
+    best = np.argmax(scored_returns, axis=1)
+    fallback = np.argmin(point_risk)
+    return np.where(allowed.any(axis=1), best, fallback)
+
+def propose_targets(people, asset_info, opt_config=None, sim_config=None):
+    """
+    Tüm kişiler için risk skorlarına göre hedef dağılım önerir. Aynı ağırlık
+    sınırlarına sahip kişiler aynı sınırı paylaşır; sınır her grup için bir kez
+    hesaplanır.
+
+    Returns:
+        dict: 'names', 'assets', 'weights' (kişi, varlık), 'expected_return',
+              'volatility', 'portfolio_risk' dizileri ve kullanılan 'frontiers'
+    """
+    table = get_asset_table(asset_info)
+    names = table['names']
+    expected_returns = table['combined_returns'][SCENARIOS.index('base')]
+    covariance = build_covariance(asset_info, sim_config, opt_config)
+    points = (opt_config or {}).get('frontier_points', DEFAULT_FRONTIER_POINTS)
+
+    groups = {}
+    for row, person in enumerate(people):
+        key = json.dumps(person.get('weight_constraints') or {}, sort_keys=True)
+        groups.setdefault(key, []).append(row)
+
+    weights = np.zeros((len(people), len(names)))
+    frontiers = {}
+    for key, rows in groups.items():
+        lower, upper = weight_bounds(names, opt_config, json.loads(key))
+        frontier = compute_frontier(expected_returns, covariance, lower, upper, points)
+        frontiers[key] = frontier
+        risk_scores = [people[row].get('risk_score', 0) or 0 for row in rows]
+        weights[rows] = frontier['weights'][choose_frontier_point(frontier, risk_scores, table['risk_scores'])]
+
+    return {
+        'names': [p.get('name', '') for p in people],
+        'assets': names,
+        'weights': weights,
+        'expected_return': weights @ expected_returns,
+        'volatility': np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', weights, covariance, weights), 0)),
+        'portfolio_risk': weights @ table['risk_scores'],
+        'frontiers': frontiers
+    }
+
+def show_frontier(frontier, asset_risk_scores, rows=10):
+    """
+    Etkin sınırdan eşit aralıklı noktaları tablo halinde gösterir.
+    """
+    table_width = 60
+    print("\n" + "="*table_width)
+    print("ETKİN SINIR (Yıllık TL Bazlı)".center(table_width))
+    print("="*table_width)
+    print(f"{'GETİRİ':>12} | {'OYNAKLIK':>12} | {'RİSK PUANI':>12}")
+    print("-" * table_width)
+    point_risk = frontier['weights'] @ asset_risk_scores
+    for i in np.unique(np.linspace(0, len(frontier['returns']) - 1, rows).astype(int)):
+        return_str = f"%{frontier['returns'][i]*100:.2f}"
+        volatility_str = f"%{frontier['volatility'][i]*100:.2f}"
+        print(f"{return_str:>12} | {volatility_str:>12} | {point_risk[i]:>12.2f}")
+    print("="*table_width)
+
+def show_proposal(proposal, row, risk_score):
+    """
+    Bir kişi için önerilen hedef dağılımı ekrana yazdırır.
+    """
+    print(f"\nKişi: {proposal['names'][row]} (Risk Skoru: {risk_score})")
+    for asset, weight in zip(proposal['assets'], proposal['weights'][row]):
+        if weight >= 0.0005:
+            print(f"  {asset:<20}: %{weight*100:.1f}")
+    print(f"  Beklenen Getiri: %{proposal['expected_return'][row]*100:.2f} | "
+          f"Oynaklık: %{proposal['volatility'][row]*100:.2f} | "
+          f"Ort. Risk: {proposal['portfolio_risk'][row]:.2f}/10")
+
+if __name__ == "__main__":
+    from comparison_report import load_file, ASSET_FILE
+    from storage import get_storage
+
+    parser = argparse.ArgumentParser(description="Etkin sınırı hesaplar ve kişilere hedef dağılım önerir.")
+    parser.add_argument("--save", action="store_true", help="Önerileri target_portfolio olarak kaydet")
+    args = parser.parse_args()
+
+    storage = get_storage()
+    people_list = storage.load_people()
+    asset_info = load_file(ASSET_FILE)
+    opt_config = load_optimizer_config()
+    if people_list is None or asset_info is None or opt_config is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    normalize_people(people_list, asset_info)
+
+    proposal = propose_targets(people_list, asset_info, opt_config, load_simulation_config())
+    asset_risk_scores = get_asset_table(asset_info)['risk_scores']
+    show_frontier(next(iter(proposal['frontiers'].values())), asset_risk_scores)
+    for row, person in enumerate(people_list):
+        show_proposal(proposal, row, person.get('risk_score', 0))
+
+    if args.save:
+        for row, person in enumerate(people_list):
+            person['target_portfolio'] = {
+                asset: round(float(weight), 4)
+                for asset, weight in zip(proposal['assets'], proposal['weights'][row])
+            }
+        storage.save_people(people_list)
+        print("\nÖnerilen hedef dağılımlar kaydedildi.")
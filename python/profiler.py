@@ -0,0 +1,234 @@
+"""
+Stage Profiler
+Giriş betiklerinin (current_portfolio.py, target_portfolio.py, comparison_report.py,
+personal_risk.py, us_sector_calculator.py) aşamalarını ölçen isteğe bağlı ölçüm katmanı.
+
+Her aşama için duvar saati süresi, çağrı sayısı ve (tracemalloc ile) bellek farkı
+aşama ve kişi bazında kaydedilir; çalışma sonunda JSON olarak yazılır. İç içe
+aşamalar "rapor/değerleme" biçiminde yol olarak adlandırılır. hot=True ile
+işaretlenen aşamalar için isteğe bağlı olarak cProfile çıktısı da alınır.
+
+Kapalıyken stage() paylaşılan boş bir bağlam döndürür; tracemalloc ve cProfile
+hiç başlatılmaz.
+
+Açmak için:
+    PORTFOLIO_PROFILE=1 python comparison_report.py            # ../reports/profiles/ altına
+    PORTFOLIO_PROFILE=profil.json python target_portfolio.py
+    python comparison_report.py --profile [--cprofile]
+    python comparison_report.py --profile=profil.json
+    PORTFOLIO_PROFILE=1 PORTFOLIO_CPROFILE=1 python current_portfolio.py
+"""
+
+import atexit
+import contextlib
+import cProfile
+import json
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+
+PROFILE_ENV = "PORTFOLIO_PROFILE"
+CPROFILE_ENV = "PORTFOLIO_CPROFILE"
+PROFILE_FLAG = "--profile"
+CPROFILE_FLAG = "--cprofile"
+DEFAULT_OUTPUT_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "reports", "profiles")
+)
+CPROFILE_TOP = 25
+
+_NULL_STAGE = contextlib.nullcontext()
+
+# Etkin profiler; kapalıyken None
+_profiler = None
+
+class _Stage:
+    __slots__ = ('profiler', 'name', 'person', 'hot', 'path', 'owns_person', 'started', 'memory', 'capturing')
+
+    def __init__(self, profiler, name, person, hot):
+        self.profiler = profiler
+        self.name = name
+        self.person = person
+        self.hot = hot
+
+    def __enter__(self):
+        profiler = self.profiler
+        parent_path, parent_person = profiler.stack[-1] if profiler.stack else ("", None)
+        self.path = f"{parent_path}/{self.name}" if parent_path else self.name
+        self.owns_person = self.person is not None and self.person != parent_person
+        if self.person is None:
+            self.person = parent_person
+        profiler.stack.append((self.path, self.person))
+
+        self.capturing = self.hot and profiler.cprofile is not None and not profiler.capturing
+        if self.capturing:
+            profiler.capturing = True
+            profiler.cprofile.enable()
+        self.memory = tracemalloc.get_traced_memory()[0]
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.started
+        memory_delta = tracemalloc.get_traced_memory()[0] - self.memory
+        profiler = self.profiler
+        if self.capturing:
+            profiler.cprofile.disable()
+            profiler.capturing = False
+        profiler.stack.pop()
+        profiler.record(self.path, self.person, seconds, memory_delta, self.owns_person)
+        return False
+
+class StageProfiler:
+    """
+    Aşama ölçümlerini biriktirir ve çalışma sonunda JSON olarak yazar.
+    """
+
+    def __init__(self, script, output=None, capture=False):
+        self.script = script
+        self.output = output
+        self.stack = []
+        self.stages = {}
+        self.people = {}
+        self.cprofile = cProfile.Profile() if capture else None
+        self.capturing = False
+        self.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+        self.started = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def stage(self, name, person=None, hot=False):
+        return _Stage(self, name, person, hot)
+
+    def record(self, path, person, seconds, memory_delta, owns_person=False):
+        entry = self.stages.get((path, person))
+        if entry is None:
+            entry = self.stages[(path, person)] = {'calls': 0, 'seconds': 0.0, 'memory_delta_bytes': 0}
+        entry['calls'] += 1
+        entry['seconds'] += seconds
+        entry['memory_delta_bytes'] += memory_delta
+        # Kişi toplamı yalnızca kişinin verildiği en dış aşamadan alınır (iç aşamalar tekrar sayılmaz)
+        if owns_person:
+            totals = self.people.setdefault(person, {'seconds': 0.0, 'memory_delta_bytes': 0})
+            totals['seconds'] += seconds
+            totals['memory_delta_bytes'] += memory_delta
+
+    def _cprofile_summary(self, prof_path):
+        stats = pstats.Stats(self.cprofile)
+        rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:CPROFILE_TOP]
+        return {
+            'file': prof_path,
+            'top': [
+                {
+                    'function': f"{os.path.basename(file_name)}:{line}({function})",
+                    'calls': calls,
+                    'total_seconds': round(total, 6),
+                    'cumulative_seconds': round(cumulative, 6)
+                }
+                for (file_name, line, function), (_, calls, total, cumulative, _) in rows
+            ]
+        }
+
+    def report(self):
+        _, peak = tracemalloc.get_traced_memory()
+        return {
+            'script': self.script,
+            'argv': sys.argv[1:],
+            'started_at': self.started_at,
+            'total_seconds': time.perf_counter() - self.started,
+            'peak_memory_bytes': peak,
+            'stages': [
+                {
+                    'stage': path,
+                    'person': person,
+                    'calls': entry['calls'],
+                    'seconds': entry['seconds'],
+                    'mean_seconds': entry['seconds'] / entry['calls'],
+                    'memory_delta_bytes': entry['memory_delta_bytes']
+                }
+                for (path, person), entry in self.stages.items()
+            ],
+            'people': [{'person': person, **totals} for person, totals in self.people.items()]
+        }
+
+    def write(self):
+        """
+        Ölçümleri JSON dosyasına yazar; cProfile açıksa .prof dosyasını da kaydeder.
+        """
+        output = self.output
+        if not output:
+            stamp = time.strftime("%Y%m%d_%H%M%S")
+            output = os.path.join(DEFAULT_OUTPUT_DIR, f"{self.script}_{stamp}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+        result = self.report()
+        if self.cprofile is not None:
+            prof_path = os.path.splitext(output)[0] + ".prof"
+            self.cprofile.dump_stats(prof_path)
+            result['cprofile'] = self._cprofile_summary(prof_path)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nProfil kaydedildi: {output}", file=sys.stderr)
+        return output
+
+def _enabled_value(value):
+    return value not in (None, "", "0", "false", "False")
+
+def configure(script=None, argv=None):
+    """
+    Ortam değişkenlerine ve komut satırı bayraklarına göre profiler'ı açar.
+    --profile ve --cprofile bayrakları argv'den (varsayılan: sys.argv) çıkarılır;
+    böylece betiklerin kendi argüman ayrıştırması etkilenmez.
+
+    Returns:
+        StageProfiler veya None (kapalıysa)
+    """
+    global _profiler
+    argv = sys.argv if argv is None else argv
+    env_value = os.environ.get(PROFILE_ENV)
+    enabled = _enabled_value(env_value)
+    output = env_value if enabled and env_value not in ("1", "true", "True") else None
+    capture = _enabled_value(os.environ.get(CPROFILE_ENV))
+
+    remaining = [argv[0]] if argv else []
+    for arg in argv[1:]:
+        if arg == PROFILE_FLAG:
+            enabled = True
+        elif arg.startswith(PROFILE_FLAG + "="):
+            enabled = True
+            output = arg.split("=", 1)[1]
+        elif arg == CPROFILE_FLAG:
+            enabled = capture = True
+        else:
+            remaining.append(arg)
+    argv[:] = remaining
+
+    if not enabled:
+        return None
+    if _profiler is None:
+        if script is None:
+            script = os.path.splitext(os.path.basename(argv[0] if argv else "python"))[0]
+        _profiler = StageProfiler(script, output, capture)
+        atexit.register(_profiler.write)
+    return _profiler
+
+def stage(name, person=None, hot=False):
+    """
+    Bir aşamayı ölçen bağlam yöneticisi döndürür.
+
+    Args:
+        name: Aşama adı
+        person: Kişi adı (verilmezse üst aşamanın kişisi kullanılır)
+        hot: cProfile açıksa bu aşama boyunca profil alınır
+
+    Örnek:
+        with stage("valuation", person=name, hot=True):
+            report = build_comparison_report(...)
+    """
+    if _profiler is None:
+        return _NULL_STAGE
+    return _profiler.stage(name, person, hot)
+
+def is_enabled():
+    return _profiler is not None
@@ -0,0 +1,410 @@
+"""
+Multi-Year Projection
+Kişilerin mevcut ve hedef portföylerinin değerini düzenli katkılar (aylık veya
+yıllık) ve para çekimleriyle birlikte çok yıllık olarak (5-30 yıl) projekte eden modül.
+
+Her senaryonun yıllık TL getirisi, calculate_portfolio_return ile aynı şekilde
+USD bazlı varlıklarda kur artışıyla birleştirilir ve her yıl yeniden uygulanır.
+Yıl içindeki dönemlerde (aylık) getiri eşit dağıtılır; dönem sonu katkıları yıl
+sonuna annüite çarpanıyla taşınır. Tüm kişiler ve senaryolar için yörünge, yıllık
+büyüme çarpanlarının kümülatif çarpımı (cumprod) ile tek adımda hesaplanır:
+
+    V_t = G_t * (V_0 + sum_{k<=t} F_k / G_k),    G_t = prod_{k<=t} (1 + r_k)
+
+Sonuçlar karşılaştırma raporuna (comparison_report.py) ve dashboard bundle'larına
+(dashboard_bundle.py) eklenir.
+
+Kullanım:
+    python projection.py
+    python projection.py --years 30 --contribution 5000 --frequency monthly
+    python projection.py --all --withdrawal 20000 --withdrawal-start 10
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from data_store import load_json, ASSET_FILE, PROJECTION_CONFIG_FILE
+from portfolio_engine import SCENARIOS, compile_people, evaluate_weights, get_asset_table, pack_weights
+from report_renderer import make_section
+
+FREQUENCIES = {"monthly": 12, "annual": 1}
+FREQUENCY_LABELS = {"monthly": "Aylık", "annual": "Yıllık"}
+SCENARIO_NAMES = {"bad": "Kötü", "base": "Baz", "good": "İyi"}
+
+DEFAULT_PROJECTION = {
+    "years": 10,
+    "frequency": "monthly",
+    "contribution": 0,
+    "contribution_increase": 0.0,
+    "withdrawal": 0,
+    "withdrawal_increase": 0.0,
+    "withdrawal_start_year": 1,
+    "milestones": [1, 5, 10, 15, 20, 25, 30]
+}
+
+# Kişi kaydındaki 'projection' alanıyla geçersiz kılınabilen ayarlar
+PERSON_FIELDS = ("contribution", "contribution_increase", "withdrawal", "withdrawal_increase", "withdrawal_start_year")
+
+# %100 kayıpta kümülatif çarpan sıfır olur; katkılar bu alt sınırla taşınır
+MIN_GROWTH = 1e-9
+
+def load_projection_config():
+    """
+    Projeksiyon konfigürasyon dosyasını varsayılanlarla birleştirerek yükler.
+    Dosya yoksa varsayılan ayarlar döndürülür; ayarlar geçersizse hatalar
+    yazdırılır ve None döner.
+    Returns:
+        dict: Projeksiyon ayarlarını içeren dictionary veya None
+    """
+    try:
+        config = load_json(PROJECTION_CONFIG_FILE) or {}
+    except FileNotFoundError:
+        config = {}
+    except json.JSONDecodeError:
+        print(f"Hata: '{PROJECTION_CONFIG_FILE}' geçerli bir JSON dosyası değil.")
+        return None
+    if not isinstance(config, dict):
+        print(f"Hata: '{PROJECTION_CONFIG_FILE}' bir JSON nesnesi içermeli.")
+        return None
+    config = {**DEFAULT_PROJECTION, **{key: value for key, value in config.items() if key in DEFAULT_PROJECTION}}
+    errors = validate_projection_config(config)
+    if errors:
+        for error in errors:
+            print(f"Hata: '{PROJECTION_CONFIG_FILE}': {error}")
+        return None
+    return config
+
+def validate_projection_config(config):
+    """
+    Returns:
+        list: Hata mesajları (geçerliyse boş liste)
+    """
+    errors = []
+    if not isinstance(config.get('years'), int) or not 1 <= config['years'] <= 100:
+        errors.append("'years' 1 ile 100 arasında bir tamsayı olmalı.")
+    if config.get('frequency') not in FREQUENCIES:
+        errors.append(f"'frequency' şunlardan biri olmalı: {', '.join(FREQUENCIES)}.")
+    for key in ("contribution", "withdrawal"):
+        if not isinstance(config.get(key), (int, float)) or config[key] < 0:
+            errors.append(f"'{key}' sıfır veya pozitif bir sayı olmalı.")
+    for key in ("contribution_increase", "withdrawal_increase"):
+        if not isinstance(config.get(key), (int, float)) or config[key] <= -1:
+            errors.append(f"'{key}' -1'den büyük bir oran olmalı.")
+    if not isinstance(config.get('withdrawal_start_year'), int) or config['withdrawal_start_year'] < 1:
+        errors.append("'withdrawal_start_year' 1 veya daha büyük bir tamsayı olmalı.")
+    milestones = config.get('milestones', ())
+    if not isinstance(milestones, (list, tuple)) or not all(isinstance(year, int) and year >= 1 for year in milestones):
+        errors.append("'milestones' pozitif tamsayılardan oluşan bir liste olmalı.")
+    return errors
+
+def person_projection_config(person, config, report=True):
+    """
+    Kişi kaydındaki 'projection' alanını genel ayarların üzerine yazar. Birleşen
+    ayarlar geçersizse (report=True ise kişi adıyla uyarı verilerek) genel
+    ayarlar kullanılır.
+    """
+    overrides = person.get('projection')
+    if not overrides:
+        return config
+    if isinstance(overrides, dict):
+        merged = {**config, **{key: overrides[key] for key in PERSON_FIELDS if key in overrides}}
+        errors = validate_projection_config(merged)
+        if not errors:
+            return merged
+    else:
+        errors = ["'projection' bir JSON nesnesi olmalı."]
+    if report:
+        print(f"UYARI: '{person.get('name', '')}' kişisinin projeksiyon ayarları geçersiz, genel ayarlar kullanılacak. "
+              + " ".join(errors))
+    return config
+
+def cash_flows(contribution, withdrawal, config, contribution_increase=None,
+               withdrawal_increase=None, withdrawal_start=None):
+    """
+    Kişilerin her yıl içindeki dönem başına katkı ve çekim tutarlarını hesaplar.
+
+    Args:
+        contribution, withdrawal: (kişi,) dönem başına TL tutarları
+        config: Projeksiyon ayarları
+        contribution_increase, withdrawal_increase, withdrawal_start: (kişi,)
+            kişi bazında ayarlar; verilmezse config değerleri kullanılır
+
+    Returns:
+        tuple: (katkılar, çekimler) - (kişi, yıl) dizileri
+    """
+    years = np.arange(config['years'], dtype=np.float64)
+    if contribution_increase is None:
+        contribution_increase = np.full(len(contribution), config['contribution_increase'])
+    if withdrawal_increase is None:
+        withdrawal_increase = np.full(len(withdrawal), config['withdrawal_increase'])
+    if withdrawal_start is None:
+        withdrawal_start = np.full(len(withdrawal), config['withdrawal_start_year'])
+
+    contributions = contribution[:, None] * (1 + contribution_increase[:, None]) ** years
+    # Çekimler başlangıç yılından itibaren yapılır ve o yıldan itibaren artar
+    elapsed = years - (withdrawal_start[:, None] - 1)
+    withdrawals = np.where(
+        elapsed >= 0,
+        withdrawal[:, None] * (1 + withdrawal_increase[:, None]) ** np.maximum(elapsed, 0),
+        0.0
+    )
+    return contributions, withdrawals
+
+def people_cash_flows(people, config):
+    """
+    Kişi kayıtlarındaki 'projection' alanlarını dikkate alarak cash_flows çağırır.
+    Geçersiz kişi ayarları person_projection_config ile raporlanır ve yok sayılır.
+    """
+    configs = [person_projection_config(person, config) for person in people]
+
+    def values(key):
+        return np.array([person_config[key] for person_config in configs], dtype=np.float64)
+
+    return cash_flows(
+        values('contribution'),
+        values('withdrawal'),
+        config,
+        values('contribution_increase'),
+        values('withdrawal_increase'),
+        values('withdrawal_start_year')
+    )
+
+def project(returns, principal, contributions, withdrawals, periods_per_year=12):
+    """
+    Tüm portföylerin ve senaryoların yıl sonu değer yörüngesini hesaplar.
+
+    Args:
+        returns: (portföy, senaryo) yıllık TL getirileri veya yıllara göre değişen
+                 getiriler için (portföy, senaryo, yıl) dizisi
+        principal: (portföy,) başlangıç değerleri
+        contributions, withdrawals: (portföy, yıl) dönem başına tutarlar
+        periods_per_year: Yıl içindeki katkı dönemi sayısı (12: aylık, 1: yıllık)
+
+    Returns:
+        dict: 'values' (portföy, senaryo, yıl + 1; ilk sütun başlangıç değeri),
+              'contributed' ve 'withdrawn' (portföy, yıl + 1; kümülatif planlanan
+              tutarlar) ve 'depleted' (portföy, senaryo; portföyün tükendiği yıl,
+              tükenmediyse 0)
+    """
+    n_years = contributions.shape[1]
+    returns = np.asarray(returns, dtype=np.float64)
+    if returns.ndim == 2:
+        returns = np.broadcast_to(returns[:, :, None], returns.shape + (n_years,))
+    growth = np.maximum(1 + returns, MIN_GROWTH)
+
+    # Dönem sonu katkılarının yıl sonu değeri: sum_{k<m} g^k = (G - 1) / (g - 1), g = G^(1/m).
+    # g - 1, sıfıra yakın getirilerde hassasiyet kaybı olmaması için expm1/log1p ile hesaplanır.
+    period_excess = np.expm1(np.log(growth) / periods_per_year)
+    flat = period_excess == 0
+    annuity = np.where(flat, periods_per_year, (growth - 1) / np.where(flat, 1.0, period_excess))
+    flows = (contributions - withdrawals)[:, None, :] * annuity
+
+    cumulative = np.cumprod(growth, axis=2)
+    values = cumulative * (principal[:, None, None] + np.cumsum(flows / cumulative, axis=2))
+    values = np.concatenate([np.broadcast_to(principal[:, None, None], values.shape[:2] + (1,)), values], axis=2)
+
+    # Çekimler portföyü tükettiyse sonraki yıllar sıfır kabul edilir
+    exhausted = values[:, :, 1:] <= 0
+    depleted = np.where(exhausted.any(axis=2), exhausted.argmax(axis=2) + 1, 0)
+    years = np.arange(n_years + 1)
+    values = np.where((depleted[:, :, None] > 0) & (years >= depleted[:, :, None]), 0.0, values)
+
+    zero = np.zeros((len(principal), 1))
+    return {
+        'values': values,
+        'contributed': np.concatenate([zero, np.cumsum(contributions * periods_per_year, axis=1)], axis=1),
+        'withdrawn': np.concatenate([zero, np.cumsum(withdrawals * periods_per_year, axis=1)], axis=1),
+        'depleted': depleted
+    }
+
+def project_people(people, asset_info, config):
+    """
+    Tüm kişilerin mevcut ve hedef portföylerini aynı katkı planıyla projekte eder.
+
+    Returns:
+        dict: 'names', 'principal', 'years' (0..N), 'contributed', 'withdrawn' ve
+              'current' / 'target' için 'values' (kişi, senaryo, yıl + 1) ve 'depleted'
+    """
+    table = get_asset_table(asset_info)
+    compiled = compile_people(people, table)
+    contributions, withdrawals = people_cash_flows(people, config)
+    periods = FREQUENCIES[config['frequency']]
+    result = {
+        'names': compiled['names'],
+        'principal': compiled['principal'],
+        'years': np.arange(config['years'] + 1)
+    }
+    for key in ('current', 'target'):
+        returns = evaluate_weights(compiled[key], table)['returns']
+        projected = project(returns, compiled['principal'], contributions, withdrawals, periods)
+        result[key] = {'values': projected['values'], 'depleted': projected['depleted']}
+        result['contributed'] = projected['contributed']
+        result['withdrawn'] = projected['withdrawn']
+    return result
+
+def milestone_years(config):
+    """
+    Raporda gösterilecek yıllar: ayardaki kilometre taşları ve son yıl.
+    """
+    years = config['years']
+    return sorted({year for year in config.get('milestones', ()) if 1 <= year < years} | {years})
+
+def build_projection_section(principal, current_dist, target_dist, asset_info, config):
+    """
+    Mevcut ve hedef portföyün çok yıllık projeksiyonunu rapor bölümü olarak hazırlar.
+    Kişi bazında ayarlar için config person_projection_config ile hazırlanmalıdır.
+    """
+    table = get_asset_table(asset_info)
+    returns = evaluate_weights(pack_weights([current_dist, target_dist], table), table)['returns']
+    contributions, withdrawals = cash_flows(
+        np.full(2, float(config['contribution'])), np.full(2, float(config['withdrawal'])), config
+    )
+    projected = project(returns, np.full(2, float(principal)), contributions, withdrawals,
+                        FREQUENCIES[config['frequency']])
+
+    rows = []
+    for year in milestone_years(config):
+        row = {
+            'year': year,
+            'contributed': float(projected['contributed'][0, year]),
+            'withdrawn': float(projected['withdrawn'][0, year])
+        }
+        for col, scenario in enumerate(SCENARIOS):
+            row[f"current_{scenario}"] = float(projected['values'][0, col, year])
+            row[f"target_{scenario}"] = float(projected['values'][1, col, year])
+        rows.append(row)
+
+    columns = [('year', 'Yıl'), ('contributed', 'Toplam Katkı (TL)'), ('withdrawn', 'Toplam Çekim (TL)')]
+    columns += [(f"current_{s}", f"Mevcut - {SCENARIO_NAMES[s]}") for s in SCENARIOS]
+    columns += [(f"target_{s}", f"Hedef - {SCENARIO_NAMES[s]}") for s in SCENARIOS]
+    depleted = {
+        f"{key}_depleted": {s: int(projected['depleted'][row, col]) for col, s in enumerate(SCENARIOS)}
+        for row, key in enumerate(("current", "target"))
+    }
+    return make_section('projection', 'Çok Yıllık Projeksiyon', columns, rows, {
+        'years': config['years'],
+        'frequency': config['frequency'],
+        'contribution': float(config['contribution']),
+        'withdrawal': float(config['withdrawal']),
+        **depleted
+    })
+
+def format_projection_lines(section):
+    """
+    Projeksiyon bölümünü metin tablosu satırlarına çevirir.
+    """
+    fields = section['fields']
+    table_width = 120
+    period = FREQUENCY_LABELS.get(fields['frequency'], fields['frequency']).lower()
+    plan = f"{period} katkı: {fields['contribution']:,.0f} TL"
+    if fields['withdrawal'] > 0:
+        plan += f", {period} çekim: {fields['withdrawal']:,.0f} TL"
+    lines = [
+        "",
+        "-" * table_width,
+        f"ÇOK YILLIK PROJEKSİYON ({fields['years']} yıl, {plan})".center(table_width),
+        "-" * table_width,
+        f"{'YIL':>4} | {'KATKI - ÇEKİM (TL)':>18} | {'MEVCUT PORTFÖY (Kötü / Baz / İyi)':^44} | "
+        f"{'HEDEF PORTFÖY (Kötü / Baz / İyi)':^44}",
+        "-" * table_width
+    ]
+    for row in section['rows']:
+        current = " ".join(f"{row[f'current_{s}']:>14,.0f}" for s in SCENARIOS)
+        target = " ".join(f"{row[f'target_{s}']:>14,.0f}" for s in SCENARIOS)
+        lines.append(f"{row['year']:>4} | {row['contributed'] - row['withdrawn']:>18,.0f} | {current} | {target}")
+
+    for key, label in (("current", "Mevcut"), ("target", "Hedef")):
+        depleted = {s: year for s, year in fields[f"{key}_depleted"].items() if year > 0}
+        if depleted:
+            details = ", ".join(f"{SCENARIO_NAMES[s]}: {year}. yıl" for s, year in depleted.items())
+            lines.append(f"UYARI: {label} portföy çekimler nedeniyle tükeniyor ({details}).")
+    return lines
+
+def show_projection(principal, current_dist, target_dist, asset_info, config):
+    section = build_projection_section(principal, current_dist, target_dist, asset_info, config)
+    sys.stdout.write("\n".join(format_projection_lines(section)) + "\n")
+
+def show_book_projection(result, config):
+    """
+    Tüm kişilerin toplam portföy değerinin yıllara göre projeksiyonunu gösterir.
+    """
+    table_width = 95
+    print("\n" + "=" * table_width)
+    print(f"TOPLAM PROJEKSİYON ({len(result['names'])} kişi, {config['years']} yıl)".center(table_width))
+    print("=" * table_width)
+    print(f"{'YIL':>4} | {'KATKI - ÇEKİM (TL)':>20} | {'MEVCUT - BAZ (TL)':>20} | {'HEDEF - BAZ (TL)':>20} | {'HEDEF/MEVCUT':>12}")
+    print("-" * table_width)
+    base = SCENARIOS.index('base')
+    net_flows = (result['contributed'] - result['withdrawn']).sum(axis=0)
+    current_total = result['current']['values'][:, base].sum(axis=0)
+    target_total = result['target']['values'][:, base].sum(axis=0)
+    for year in [0] + milestone_years(config):
+        ratio = target_total[year] / current_total[year] if current_total[year] > 0 else 0
+        print(f"{year:>4} | {net_flows[year]:>20,.0f} | {current_total[year]:>20,.0f} | "
+              f"{target_total[year]:>20,.0f} | {ratio:>12.3f}")
+    print("=" * table_width)
+    for key, label in (("current", "Mevcut"), ("target", "Hedef")):
+        depleted = np.count_nonzero(result[key]['depleted'][:, base])
+        if depleted:
+            print(f"UYARI: {depleted} kişinin {label.lower()} portföyü baz senaryoda çekimler nedeniyle tükeniyor.")
+
+if __name__ == "__main__":
+    from comparison_report import load_file, select_person
+    from portfolio_engine import current_distribution, normalize_people
+    from storage import get_storage
+
+    parser = argparse.ArgumentParser(description="Portföyleri katkı ve çekimlerle çok yıllık olarak projekte eder.")
+    parser.add_argument("--years", type=int, help="Projeksiyon süresi (yıl)")
+    parser.add_argument("--frequency", choices=list(FREQUENCIES), help="Katkı/çekim sıklığı")
+    parser.add_argument("--contribution", type=float, help="Varsayılan dönem başına katkı (TL)")
+    parser.add_argument("--contribution-increase", type=float, help="Katkının yıllık artış oranı")
+    parser.add_argument("--withdrawal", type=float, help="Varsayılan dönem başına çekim (TL)")
+    parser.add_argument("--withdrawal-increase", type=float, help="Çekimin yıllık artış oranı")
+    parser.add_argument("--withdrawal-start", type=int, help="Çekimlerin başladığı yıl")
+    parser.add_argument("--all", action="store_true", help="Tüm kişilerin toplam projeksiyonunu göster")
+    args = parser.parse_args()
+
+    people_list = get_storage().load_people()
+    asset_info = load_file(ASSET_FILE)
+    projection_config = load_projection_config()
+    if people_list is None or asset_info is None or projection_config is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    normalize_people(people_list, asset_info)
+
+    overrides = {
+        'years': args.years,
+        'frequency': args.frequency,
+        'contribution': args.contribution,
+        'contribution_increase': args.contribution_increase,
+        'withdrawal': args.withdrawal,
+        'withdrawal_increase': args.withdrawal_increase,
+        'withdrawal_start_year': args.withdrawal_start
+    }
+    projection_config.update({key: value for key, value in overrides.items() if value is not None})
+    errors = validate_projection_config(projection_config)
+    if errors:
+        for error in errors:
+            print(f"Hata: {error}")
+        sys.exit("Geçersiz projeksiyon ayarları nedeniyle program durduruldu.")
+
+    if args.all:
+        start = time.perf_counter()
+        result = project_people(people_list, asset_info, projection_config)
+        elapsed = time.perf_counter() - start
+        show_book_projection(result, projection_config)
+        print(f"Süre: {elapsed:.3f} sn")
+    else:
+        selected_person = select_person(people_list)
+        if selected_person:
+            print(f"\nKişi: {selected_person['name']}")
+            show_projection(
+                selected_person.get('principal', 0),
+                current_distribution(selected_person),
+                selected_person.get('target_portfolio') or {},
+                asset_info,
+                person_projection_config(selected_person, projection_config)
+            )
@@ -0,0 +1,278 @@
+"""
+Rebalancing Trade Optimizer
+Her kişiyi hedef portföyünün tolerans bandı içine getiren en ucuz al/sat
+işlemlerini, varlık bazlı komisyon, spread, lot büyüklüğü ve satış kısıtlarını
+dikkate alarak tüm kişiler için toplu hesaplayan modül.
+
+Kullanım:
+    python rebalancer.py                       # kişi seçerek
+    python rebalancer.py --all --cash 10000    # tüm kişiler, kişi başı yeni nakit
+    python rebalancer.py --all --cash-only --cash 5000
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from portfolio_engine import get_asset_table, compile_people, normalize_people
+from data_store import load_json, TRADING_CONFIG_FILE
+
+DEFAULT_TOLERANCE = 0.02
+# İşlemler bandın biraz içini hedefler; böylece maliyetler ve lot yuvarlaması
+# sonucu bandın dışına itmez.
+BAND_MARGIN = 0.05
+DEFAULT_TRADING = {
+    "fee_rate": 0.0,
+    "spread": 0.0,
+    "fixed_fee": 0.0,
+    "lot_size": 1.0,
+    "min_trade": 0.0,
+    "no_sell": False
+}
+
+def load_trading_config():
+    """
+    İşlem maliyeti konfigürasyon dosyasını yükler.
+    Returns:
+        dict: Maliyet varsayımlarını içeren dictionary veya None
+    """
+    try:
+        return load_json(TRADING_CONFIG_FILE)
+    except FileNotFoundError:
+        print(f"Hata: '{TRADING_CONFIG_FILE}' bulunamadı.")
+        return None
+    except json.JSONDecodeError:
+        print(f"Hata: '{TRADING_CONFIG_FILE}' geçerli bir JSON dosyası değil.")
+        return None
+
+def build_cost_model(asset_info, trading_config):
+    """
+    Varlık bazlı işlem maliyetlerini asset_info varlık sırasına göre dizilere paketler.
+    Her işlemde tutarın fee_rate + spread/2 kadarı ve varsa fixed_fee ödenir.
+
+    Returns:
+        dict: names, cost_rate, fixed_fee, lot_size, min_trade, no_sell ve tolerance
+    """
+    trading_config = trading_config or {}
+    table = get_asset_table(asset_info)
+    default = {**DEFAULT_TRADING, **trading_config.get('default', {})}
+    settings = [{**default, **trading_config.get('assets', {}).get(name, {})} for name in table['names']]
+
+    def column(key, dtype=np.float64):
+        return np.array([s[key] for s in settings], dtype=dtype)
+
+    return {
+        'names': table['names'],
+        'cost_rate': column('fee_rate') + column('spread') / 2,
+        'fixed_fee': column('fixed_fee'),
+        'lot_size': np.maximum(column('lot_size'), 1e-9),
+        'min_trade': column('min_trade'),
+        'no_sell': column('no_sell', bool),
+        'tolerance': trading_config.get('tolerance', DEFAULT_TOLERANCE)
+    }
+
+def trade_cost(trades, cost_model):
+    """
+    İşlem matrisindeki her satır için toplam işlem maliyetini (TL) döndürür.
+    """
+    traded = np.abs(trades)
+    return traded @ cost_model['cost_rate'] + (traded > 0) @ cost_model['fixed_fee']
+
+def _fill_in_order(capacity, demand, order):
+    """
+    Her satırdaki talebi, kapasiteleri verilen sütun sırasına göre doldurarak dağıtır.
+    """
+    ordered = capacity[:, order]
+    filled_before = np.cumsum(ordered, axis=1) - ordered
+    allocation = np.empty_like(capacity)
+    allocation[:, order] = np.clip(demand[:, None] - filled_before, 0, ordered)
+    return allocation
+
+def rebalance(amounts, weights, cost_model, new_cash=0.0, tolerance=None, cash_only=False):
+    """
+    Her portföyü hedef ağırlıkların tolerans bandı içine getiren işlemleri hesaplar.
+
+    Varlıklar hedefe değil bandın en yakın kenarına kadar alınıp satılır. Alımlar
+    için yeterli nakit yoksa en ucuz satılabilir varlıklardan ek satış yapılır;
+    artan nakit önce hedefe, sonra bandın üst kenarına kadar eksik varlıklara
+    yatırılır. Son olarak alımlar lot büyüklüğüne aşağı, satışlar yukarı yuvarlanır.
+
+    Args:
+        amounts: (kişi, varlık) mevcut tutar matrisi (TL)
+        weights: (kişi, varlık) hedef ağırlık matrisi
+        cost_model: build_cost_model çıktısı
+        new_cash: Kişi başına yatırılacak yeni nakit (skaler veya (kişi,) dizi)
+        tolerance: Ağırlık bandı genişliği; verilmezse konfigürasyondan okunur
+        cash_only: True ise hiçbir varlık satılmaz, sadece yeni nakit kullanılır
+
+    Returns:
+        dict: 'trades', 'cost', 'naive_trades', 'naive_cost', 'saved',
+              'cash_left', 'final_weights' ve 'in_band' dizileri
+    """
+    amounts = np.asarray(amounts, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    n_people = amounts.shape[0]
+    rows = np.arange(n_people)
+    rate = cost_model['cost_rate']
+    lot = cost_model['lot_size']
+    min_trade = cost_model['min_trade']
+    tolerance = cost_model['tolerance'] if tolerance is None else tolerance
+    order = np.argsort(rate, kind='stable')
+
+    cash = np.broadcast_to(np.asarray(new_cash, dtype=np.float64), (n_people,)).copy()
+    total = amounts.sum(axis=1) + cash
+    target = weights * total[:, None]
+    inner_tolerance = tolerance * (1 - BAND_MARGIN)
+    lower = np.maximum(weights - inner_tolerance, 0) * total[:, None]
+    upper = (weights + inner_tolerance) * total[:, None]
+    sellable = np.broadcast_to(~cost_model['no_sell'] & (not cash_only), amounts.shape)
+
+    # 1. Bant dışındaki varlıklar bandın en yakın kenarına kadar alınır/satılır
+    desired = np.clip(amounts, lower, upper)
+    desired = np.where(sellable, desired, np.maximum(desired, amounts))
+    trades = desired - amounts
+    trades[np.abs(trades) < min_trade] = 0
+
+    def funding_gap(trades):
+        buys = np.clip(trades, 0, None)
+        sells = np.clip(-trades, 0, None)
+        return buys @ (1 + rate) - sells @ (1 - rate) + (trades != 0) @ cost_model['fixed_fee'] - cash
+
+    # 2a. Nakit yetmiyorsa alınmayan varlıklardan, alt bant kenarına kadar, en ucuzdan satılır
+    gap = funding_gap(trades)
+    room = np.where(sellable & (trades <= 0), np.maximum(amounts + trades - lower, 0), 0)
+    extra = _fill_in_order(room * (1 - rate), np.maximum(gap, 0), order)
+    trades -= extra / (1 - rate)
+
+    # Hâlâ yetmiyorsa alımlar orantılı olarak küçültülür (bant tam sağlanamaz)
+    gap = funding_gap(trades)
+    buy_cost = np.clip(trades, 0, None) @ (1 + rate)
+    scale = np.where(gap > 0, np.clip(1 - gap / np.maximum(buy_cost, 1e-12), 0, 1), 1)
+    trades = np.where(trades > 0, trades * scale[:, None], trades)
+
+    # 2b. Artan nakit önce hedefe, sonra üst bant kenarına kadar hedefte yer alan
+    # varlıklara yatırılır
+    surplus = np.maximum(-funding_gap(trades), 0)
+    for limit in (target, np.where(weights > 0, upper, 0)):
+        headroom = np.maximum(limit - (amounts + trades), 0)
+        needed = (headroom * (1 + rate)).sum(axis=1)
+        fraction = np.where(needed > 0, np.clip(surplus / np.maximum(needed, 1e-12), 0, 1), 0)
+        added = headroom * fraction[:, None]
+        trades += added
+        surplus -= (added * (1 + rate)).sum(axis=1)
+
+    # 3. Lot yuvarlama: alımlar aşağı, satışlar yukarı (eldeki tutarla sınırlı)
+    trades = np.where(
+        trades > 0,
+        np.floor(trades / lot) * lot,
+        -np.minimum(np.ceil(-trades / lot) * lot, amounts)
+    )
+    trades[(trades > 0) & (trades < min_trade)] = 0
+
+    # Sabit ücretler nedeniyle oluşabilecek küçük açık en büyük alımdan kesilir
+    cash_left = cash - trades.sum(axis=1) - trade_cost(trades, cost_model)
+    deficit = np.maximum(-cash_left, 0)
+    largest = np.argmax(trades, axis=1)
+    cut = np.ceil(deficit / (1 + rate[largest]) / lot[largest]) * lot[largest]
+    trades[rows, largest] -= np.minimum(cut, np.maximum(trades[rows, largest], 0))
+
+    cost = trade_cost(trades, cost_model)
+    cash_left = cash - trades.sum(axis=1) - cost
+    final = amounts + trades
+    final_total = final.sum(axis=1) + cash_left
+    final_weights = final / np.where(final_total > 0, final_total, 1)[:, None]
+    in_band = np.all(np.abs(final_weights - weights) <= tolerance + 1e-9, axis=1)
+
+    # Karşılaştırma: tüm varlıkların tam hedefe getirildiği naif dengeleme
+    naive_trades = target - amounts
+    naive_cost = trade_cost(naive_trades, cost_model)
+    return {
+        'trades': trades,
+        'cost': cost,
+        'naive_trades': naive_trades,
+        'naive_cost': naive_cost,
+        'saved': naive_cost - cost,
+        'cash_left': cash_left,
+        'final_weights': final_weights,
+        'in_band': in_band
+    }
+
+def rebalance_people(people, asset_info, trading_config, new_cash=0.0, tolerance=None, cash_only=False):
+    """
+    Tüm kişilerin dengeleme işlemlerini tek seferde hesaplar.
+
+    Returns:
+        dict: rebalance sonucu ile 'names' (kişi adları), 'assets' ve 'amounts'
+    """
+    table = get_asset_table(asset_info)
+    cost_model = build_cost_model(asset_info, trading_config)
+    compiled = compile_people(people, table)
+    result = rebalance(compiled['amounts'], compiled['target'], cost_model, new_cash, tolerance, cash_only)
+    result.update(names=compiled['names'], assets=table['names'], amounts=compiled['amounts'])
+    return result
+
+def show_rebalance_plan(result, row=0):
+    """
+    Bir kişinin dengeleme işlemlerini ve maliyet karşılaştırmasını ekrana yazdırır.
+    """
+    table_width = 95
+    print("\n" + "-"*table_width)
+    print(f"DENGELEME PLANI - {result['names'][row]}".center(table_width))
+    print("-" * table_width)
+    print(f"{'VARLIK':<20} | {'MEVCUT (TL)':>16} | {'İŞLEM (TL)':>16} | {'NAİF (TL)':>16} | {'SON ORAN':>10}")
+    print("-" * table_width)
+
+    for col, asset in enumerate(result['assets']):
+        amount = result['amounts'][row, col]
+        trade = result['trades'][row, col]
+        naive = result['naive_trades'][row, col]
+        if abs(amount) < 0.01 and abs(trade) < 0.01 and abs(naive) < 0.01:
+            continue
+        trade_str = f"{trade:+,.2f}" if abs(trade) > 0.01 else ""
+        weight_str = f"%{result['final_weights'][row, col]*100:.1f}"
+        print(f"{asset:<20} | {amount:>16,.2f} | {trade_str:>16} | {naive:>+16,.2f} | {weight_str:>10}")
+
+    print("-" * table_width)
+    print(f"İşlem Maliyeti: {result['cost'][row]:,.2f} TL | "
+          f"Tam Dengeleme Maliyeti: {result['naive_cost'][row]:,.2f} TL | "
+          f"Tasarruf: {result['saved'][row]:,.2f} TL")
+    print(f"Kalan Nakit: {result['cash_left'][row]:,.2f} TL | "
+          f"Tolerans bandı içinde: {'Evet' if result['in_band'][row] else 'Hayır'}")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hedef portföye en düşük maliyetle dengeleme işlemlerini hesaplar.")
+    parser.add_argument("--all", action="store_true", help="Tüm kişiler için toplu hesapla")
+    parser.add_argument("--cash", type=float, default=0.0, help="Kişi başına yatırılacak yeni nakit (TL)")
+    parser.add_argument("--cash-only", action="store_true", help="Satış yapma, sadece yeni nakdi kullan")
+    parser.add_argument("--tolerance", type=float, help="Ağırlık tolerans bandı (ör. 0.02)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    from comparison_report import load_file, select_person, ASSET_FILE
+    from storage import get_storage
+
+    args = parse_args()
+    people_list = get_storage().load_people()
+    asset_info = load_file(ASSET_FILE)
+    trading_config = load_trading_config()
+    if people_list is None or asset_info is None or trading_config is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    normalize_people(people_list, asset_info)
+
+    if args.all:
+        start = time.perf_counter()
+        result = rebalance_people(people_list, asset_info, trading_config, args.cash, args.tolerance, args.cash_only)
+        elapsed = time.perf_counter() - start
+        print(f"Kişi sayısı: {len(people_list)} | Bant içinde: {int(result['in_band'].sum())}")
+        print(f"Toplam işlem maliyeti: {result['cost'].sum():,.2f} TL")
+        print(f"Tam dengeleme maliyeti: {result['naive_cost'].sum():,.2f} TL")
+        print(f"Tasarruf: {result['saved'].sum():,.2f} TL")
+        print(f"Süre: {elapsed:.2f} sn")
+    else:
+        selected_person = select_person(people_list)
+        if selected_person:
+            result = rebalance_people([selected_person], asset_info, trading_config, args.cash, args.tolerance, args.cash_only)
+            show_rebalance_plan(result)
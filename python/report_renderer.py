@@ -0,0 +1,242 @@
+"""
+Report Renderer
+Raporların hesaplama kısmını sunumdan ayıran çıktı katmanı.
+
+Her rapor modülü (comparison_report, current_portfolio, target_portfolio,
+us_sector_calculator, monte_carlo) hesapladığı değerleri bir rapor belgesi
+(sözlük) olarak döndürür. Bu modül belgeyi tek bir metin tamponunda metin, CSV,
+JSON veya statik HTML olarak üretir; ReportWriter ise çok sayıda raporu bellekte
+biriktirip çıktıya büyük bloklar halinde yazar.
+
+Rapor belgesi yapısı:
+    {
+        'kind': 'comparison',           # metin şablonunu seçer
+        'title': 'Kişi: ...',
+        'fields': {'name': ..., ...},   # tekil değerler
+        'sections': [
+            {'id': 'allocation', 'title': ..., 'columns': [[anahtar, başlık], ...],
+             'rows': [{anahtar: değer, ...}, ...], 'fields': {...}}
+        ]
+    }
+"""
+
+import csv
+import html
+import io
+import json
+import sys
+
+FORMATS = ("text", "csv", "json", "html")
+FILE_EXTENSIONS = {"text": "txt", "csv": "csv", "json": "json", "html": "html"}
+# ReportWriter çıktısının uzantıları (JSON biçimi JSON Lines olarak yazılır)
+COMBINED_EXTENSIONS = dict(FILE_EXTENSIONS, json="jsonl")
+CSV_COLUMNS = ("report", "name", "section", "row", "field", "value")
+DEFAULT_BUFFER_SIZE = 1 << 20
+
+HTML_HEADER = """<!DOCTYPE html>
+<html lang="tr">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+section {{ margin-bottom: 2.5em; }}
+table {{ border-collapse: collapse; margin: 0.5em 0 1em; }}
+th, td {{ border: 1px solid #ccc; padding: 4px 10px; }}
+td.num {{ text-align: right; }}
+th {{ background: #f0f0f0; }}
+</style>
+</head>
+<body>
+"""
+HTML_FOOTER = "</body>\n</html>\n"
+
+# Rapor türü -> belgeyi metne çeviren fonksiyon
+_text_templates = {}
+
+def make_report(kind, title, fields, sections):
+    return {'kind': kind, 'title': title, 'fields': fields, 'sections': sections}
+
+def make_section(section_id, title, columns, rows, fields=None):
+    return {
+        'id': section_id,
+        'title': title,
+        'columns': [list(column) for column in columns],
+        'rows': rows,
+        'fields': fields or {}
+    }
+
+def get_section(report, section_id):
+    for section in report['sections']:
+        if section['id'] == section_id:
+            return section
+    return None
+
+def register_text_template(kind, template):
+    """
+    Bir rapor türünün metin şablonunu kaydeder. Şablon belgeyi alır ve satır
+    listesi döndürür; her rapor modülü kendi şablonunu yüklenirken kaydeder.
+    """
+    _text_templates[kind] = template
+
+def render_text(report):
+    template = _text_templates.get(report['kind'])
+    if template is None:
+        return _render_generic_text(report)
+    return "\n".join(template(report)) + "\n"
+
+def _render_generic_text(report):
+    lines = ["", "=" * 70, report['title'], "=" * 70]
+    for key, value in report['fields'].items():
+        lines.append(f"{key}: {value}")
+    for section in report['sections']:
+        lines.append("")
+        lines.append(section['title'])
+        lines.append(" | ".join(label for _, label in section['columns']))
+        for row in section['rows']:
+            lines.append(" | ".join(str(row.get(key, "")) for key, _ in section['columns']))
+    return "\n".join(lines) + "\n"
+
+def csv_rows(report):
+    """
+    Belgeyi uzun biçimli (rapor, kişi, bölüm, satır, alan, değer) CSV satırlarına çevirir.
+    Farklı raporlar aynı sütunlara sahip olduğu için tek bir dosyada birleştirilebilir.
+    """
+    kind = report['kind']
+    name = report['fields'].get('name', '')
+    for key, value in report['fields'].items():
+        yield (kind, name, "", "", key, value)
+    for section in report['sections']:
+        for key, value in section['fields'].items():
+            yield (kind, name, section['id'], "", key, value)
+        for index, row in enumerate(section['rows']):
+            for key, _ in section['columns']:
+                yield (kind, name, section['id'], index, key, row.get(key, ""))
+
+def render_csv(reports, header=True):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    for report in reports:
+        writer.writerows(csv_rows(report))
+    return buffer.getvalue()
+
+def _html_value(value):
+    if isinstance(value, float):
+        return f'<td class="num">{value:,.4f}</td>'
+    if isinstance(value, int) and not isinstance(value, bool):
+        return f'<td class="num">{value:,}</td>'
+    return f"<td>{html.escape(str(value))}</td>"
+
+def render_html_section(report):
+    """
+    Belgeyi tam sayfa olmadan tek bir <section> bloğu olarak üretir.
+    """
+    parts = [f"<section>\n<h2>{html.escape(report['title'])}</h2>\n<table>\n"]
+    for key, value in report['fields'].items():
+        parts.append(f"<tr><th>{html.escape(key)}</th>{_html_value(value)}</tr>\n")
+    parts.append("</table>\n")
+    for section in report['sections']:
+        parts.append(f"<h3>{html.escape(section['title'])}</h3>\n<table>\n<tr>")
+        parts.extend(f"<th>{html.escape(label)}</th>" for _, label in section['columns'])
+        parts.append("</tr>\n")
+        for row in section['rows']:
+            parts.append("<tr>")
+            parts.extend(_html_value(row.get(key, "")) for key, _ in section['columns'])
+            parts.append("</tr>\n")
+        parts.append("</table>\n")
+        for key, value in section['fields'].items():
+            parts.append(f"<p>{html.escape(key)}: {html.escape(str(value))}</p>\n")
+    parts.append("</section>\n")
+    return "".join(parts)
+
+def render(reports, fmt="text"):
+    """
+    Bir veya daha fazla rapor belgesini tek bir metin olarak üretir.
+    JSON çıktısı belgelerin listesidir; HTML çıktısı tam bir sayfadır.
+    """
+    if fmt == "text":
+        return "".join(render_text(report) for report in reports)
+    if fmt == "csv":
+        return render_csv(reports)
+    if fmt == "json":
+        return json.dumps(reports, ensure_ascii=False, indent=2) + "\n"
+    if fmt == "html":
+        title = html.escape(reports[0]['title']) if reports else "Rapor"
+        return HTML_HEADER.format(title=title) + "".join(render_html_section(r) for r in reports) + HTML_FOOTER
+    raise ValueError(f"Bilinmeyen rapor biçimi: {fmt}")
+
+def emit(reports, stream=None, fmt="text"):
+    """
+    Raporları tek bir yazma işlemiyle çıktıya (varsayılan: sys.stdout) yazar.
+    """
+    (stream or sys.stdout).write(render(reports, fmt))
+
+class ReportWriter:
+    """
+    Çok sayıda raporu tek bir çıktıya yazan tamponlu yazıcı. Üretilen metinler
+    bellekte biriktirilir ve buffer_size aşıldığında tek seferde yazılır.
+
+    JSON biçiminde her satıra bir belge yazılır (JSON Lines); CSV başlığı ve HTML
+    sayfa başlığı/sonu yalnızca bir kez yazılır.
+    """
+
+    def __init__(self, stream, fmt="text", buffer_size=DEFAULT_BUFFER_SIZE, title="Raporlar"):
+        if fmt not in FORMATS:
+            raise ValueError(f"Bilinmeyen rapor biçimi: {fmt}")
+        self.stream = stream
+        self.fmt = fmt
+        self.buffer_size = buffer_size
+        self.reports = 0
+        self._parts = []
+        self._size = 0
+        if fmt == "csv":
+            self._append(render_csv([], header=True))
+        elif fmt == "html":
+            self._append(HTML_HEADER.format(title=html.escape(title)))
+
+    def _append(self, text):
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def write_rendered(self, text):
+        """
+        Başka bir süreçte render_part ile üretilmiş metni tampona ekler.
+        """
+        self._append(text)
+
+    def write(self, reports):
+        self.reports += len(reports)
+        self._append(render_part(reports, self.fmt))
+
+    def flush(self):
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+
+    def close(self):
+        if self.fmt == "html":
+            self._parts.append(HTML_FOOTER)
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def render_part(reports, fmt):
+    """
+    Raporları ReportWriter ile birleştirilecek şekilde (başlıksız) üretir.
+    """
+    if fmt == "text":
+        return "".join(render_text(report) for report in reports)
+    if fmt == "csv":
+        return render_csv(reports, header=False)
+    if fmt == "json":
+        return "".join(json.dumps(report, ensure_ascii=False) + "\n" for report in reports)
+    return "".join(render_html_section(report) for report in reports)
@@ -0,0 +1,216 @@
+# Batch risk scoring for survey answers collected in bulk (CSV or JSONL)
+"""
+Scores many survey respondents at once. risk_survey.json is compiled once into a
+(question x option) score table; all answers are looked up and averaged in a
+single vectorized step, and the new risk_score values are written back to the
+people storage in one pass.
+
+Input formats:
+    CSV   : a 'name' column and one column per question, named by question_id
+            ("1", "q1" or "question_1"), holding the option letter (A, B, C, ...)
+    JSONL : one object per line, {"name": ..., "answers": {"1": "A", ...}}
+            or {"name": ..., "answers": ["A", "B", ...]} in question order
+
+Usage:
+    python bulk_risk.py answers.csv
+    python bulk_risk.py answers.jsonl --dry-run --output scores.csv
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_store import parse_json
+from personal_risk import RISK_PROFILES, load_questions
+from storage import get_storage
+
+_QUESTION_COLUMN = re.compile(r"^(?:q|question)?[_ ]?(\d+)$", re.IGNORECASE)
+
+def compile_survey(questions):
+    """
+    Compiles the survey into a score lookup table.
+
+    Returns:
+        dict: 'question_ids' (str), 'options' (sorted option letters) and
+              'scores' ((question x option) matrix, NaN where an option does not exist)
+    """
+    question_ids = [str(q['question_id']) for q in questions]
+    options = sorted({opt['option_id'].upper() for q in questions for opt in q['options']})
+    option_index = {option: i for i, option in enumerate(options)}
+    scores = np.full((len(questions), len(options)), np.nan)
+    for row, question in enumerate(questions):
+        for opt in question['options']:
+            scores[row, option_index[opt['option_id'].upper()]] = opt['score']
+    return {'question_ids': question_ids, 'options': np.array(options), 'scores': scores}
+
+def read_csv_answers(file_path, question_ids):
+    """
+    Returns (names, answers) where answers is a (respondent x question) string array.
+    """
+    with open(file_path, 'r', encoding='utf-8-sig', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return [], np.empty((0, len(question_ids)), dtype=str)
+        header = [column.strip() for column in header]
+        if 'name' not in header:
+            raise ValueError(f"'{file_path}' has no 'name' column.")
+
+        columns = {}
+        for i, column in enumerate(header):
+            match = _QUESTION_COLUMN.match(column)
+            if match:
+                columns[match.group(1)] = i
+        missing = [qid for qid in question_ids if qid not in columns]
+        if missing:
+            raise ValueError(f"'{file_path}' has no column for question(s): {', '.join(missing)}")
+
+        name_col = header.index('name')
+        order = [name_col] + [columns[qid] for qid in question_ids]
+        rows = [[row[i] if i < len(row) else "" for i in order] for row in reader if row]
+    if not rows:
+        return [], np.empty((0, len(question_ids)), dtype=str)
+    table = np.array(rows, dtype=str)
+    return table[:, 0].tolist(), table[:, 1:]
+
+def read_jsonl_answers(file_path, question_ids):
+    """
+    Returns (names, answers) where answers is a (respondent x question) string array.
+    """
+    names = []
+    rows = []
+    with open(file_path, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = parse_json(line)
+            except ValueError:
+                print(f"Error: line {line_number} of '{file_path}' is not valid JSON. Skipping.")
+                continue
+            if not isinstance(record, dict):
+                print(f"Error: line {line_number} of '{file_path}' is not a JSON object. Skipping.")
+                continue
+            answers = record.get('answers') or {}
+            if isinstance(answers, list):
+                row = [str(a) for a in answers[:len(question_ids)]]
+                row += [""] * (len(question_ids) - len(row))
+            elif isinstance(answers, dict):
+                answers = {str(k): v for k, v in answers.items()}
+                row = [str(answers.get(qid, "")) for qid in question_ids]
+            else:
+                print(f"Error: 'answers' on line {line_number} of '{file_path}' must be a list or an object. Skipping.")
+                continue
+            names.append(str(record.get('name', '')))
+            rows.append(row)
+    if not rows:
+        return [], np.empty((0, len(question_ids)), dtype=str)
+    return names, np.array(rows, dtype=str)
+
+def read_answers(file_path, question_ids):
+    if file_path.lower().endswith((".jsonl", ".ndjson")):
+        return read_jsonl_answers(file_path, question_ids)
+    return read_csv_answers(file_path, question_ids)
+
+def score_answers(answers, survey):
+    """
+    Scores all respondents in one vectorized lookup.
+
+    Args:
+        answers: (respondent x question) array of option letters
+        survey: compile_survey output
+
+    Returns:
+        tuple: (scores, valid) - average score per respondent and a mask of rows
+               whose every answer is a valid option
+    """
+    options = survey['options']
+    letters = np.char.upper(np.char.strip(answers.astype(str)))
+    positions = np.searchsorted(options, letters).clip(0, len(options) - 1)
+    known = options[positions] == letters
+
+    question_rows = np.arange(len(survey['question_ids']))[None, :]
+    values = np.where(known, survey['scores'][question_rows, positions], np.nan)
+    scores = values.mean(axis=1)
+    return scores, ~np.isnan(scores)
+
+def profile_indices(scores):
+    """
+    Returns the index into RISK_PROFILES for each score.
+    """
+    limits = np.array([limit for limit, _, _ in RISK_PROFILES if limit is not None])
+    return np.searchsorted(limits, scores, side='left')
+
+def write_results(file_path, names, scores, profiles):
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["name", "risk_score", "risk_profile"])
+        writer.writerows(
+            (name, f"{score:.2f}", RISK_PROFILES[profile][1])
+            for name, score, profile in zip(names, scores, profiles)
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Scores survey answers in bulk and updates risk scores.")
+    parser.add_argument("answers", help="CSV or JSONL file with respondent answers")
+    parser.add_argument("--output", help="Also write name, score and profile to this CSV file")
+    parser.add_argument("--dry-run", action="store_true", help="Score only, do not update people")
+    args = parser.parse_args()
+
+    questions = load_questions()
+    if not questions:
+        print("Operation could not be completed. Please check the survey file.")
+        return
+    survey = compile_survey(questions)
+
+    start = time.perf_counter()
+    try:
+        names, answers = read_answers(args.answers, survey['question_ids'])
+    except FileNotFoundError:
+        print(f"Error: '{args.answers}' not found.")
+        return
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+    scores, valid = score_answers(answers, survey)
+    scores = np.round(scores, 2)
+    profiles = profile_indices(scores)
+    elapsed = time.perf_counter() - start
+
+    invalid_rows = np.flatnonzero(~valid)
+    for row in invalid_rows[:10]:
+        print(f"Warning: '{names[row]}' has a missing or invalid answer. Skipping.")
+    if len(invalid_rows) > 10:
+        print(f"Warning: {len(invalid_rows) - 10} more rows with missing or invalid answers skipped.")
+
+    valid_rows = np.flatnonzero(valid)
+    valid_names = [names[row] for row in valid_rows]
+    # The same person may answer more than once; the last row wins
+    new_scores = dict(zip(valid_names, scores[valid_rows].tolist()))
+
+    rate = len(names) / elapsed if elapsed > 0 else 0
+    print(f"\nScored: {len(valid_rows)} of {len(names)} rows ({rate:,.0f} rows/sec)")
+    for i, (_, level, _) in enumerate(RISK_PROFILES):
+        print(f"  {level}: {int(np.count_nonzero(profiles[valid_rows] == i))}")
+
+    if args.output:
+        write_results(args.output, valid_names, scores[valid_rows], profiles[valid_rows])
+        print(f"\nResults written to '{args.output}'.")
+
+    if args.dry_run:
+        return
+    storage = get_storage()
+    updated = storage.update_risk_scores(new_scores)
+    unknown = len(new_scores) - updated
+    print(f"\n{updated} risk scores updated.")
+    if unknown > 0:
+        print(f"Warning: {unknown} respondents are not registered people and were not saved.")
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,35 @@
 
 # English version, updated for new JSON structure
 import json
+import os
+import sys
 
-PEOPLE_FILE = "../data/people.json"
-SURVEY_FILE = "risk_survey.json"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from data_store import load_json
+from storage import get_storage
+from profiler import configure as configure_profiler, stage
 
-def load_portfolios(file_path):
-    try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)
-    except FileNotFoundError:
-        print(f"Error: '{file_path}' not found.")
-        return []
-    except json.JSONDecodeError:
-        print(f"Error: '{file_path}' is not a valid JSON file.")
-        return []
+SURVEY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "risk_survey.json")
 
-def save_portfolios(file_path, data):
-    try:
-        with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(data, file, ensure_ascii=False, indent=2)
-        print(f"\nData successfully saved to '{file_path}'.")
-    except Exception as e:
-        print(f"Error saving file: {e}")
+# (upper score limit, level, description); scores above the last limit are High Risk
+RISK_PROFILES = [
+    (13.3, "Low Risk", "You are an investor who prioritizes financial security and avoids risk."),
+    (23.3, "Medium Risk (Balanced)", "You aim to protect your capital while also seeking moderate returns."),
+    (None, "High Risk", "You are willing to take high risks for high return potential.")
+]
+
+def risk_profile(risk_score):
+    """
+    Returns the (level, description) pair for a risk score.
+    """
+    for limit, level, description in RISK_PROFILES:
+        if limit is None or risk_score <= limit:
+            return level, description
 
 def load_questions():
     try:
-        with open(SURVEY_FILE, 'r', encoding='utf-8') as file:
-            data = json.load(file)
-            return data.get('risk_questions', [])
+        data = load_json(SURVEY_FILE) or {}
+        return data.get('risk_questions', [])
     except FileNotFoundError:
         print(f"Error: '{SURVEY_FILE}' not found.")
         return None
@@ -84,31 +85,33 @@ def calculate_risk_profile():
     print("\n" + "-" * 35)
     print(f"Survey Completed. Your Risk Score: {risk_score:.1f}")
     print("-" * 35)
-    if risk_score <= 13.3:
-        risk_level = "Low Risk"
-        description = "You are an investor who prioritizes financial security and avoids risk."
-    elif risk_score <= 23.3:
-        risk_level = "Medium Risk (Balanced)"
-        description = "You aim to protect your capital while also seeking moderate returns."
-    else:
-        risk_level = "High Risk"
-        description = "You are willing to take high risks for high return potential."
+    risk_level, description = risk_profile(risk_score)
     print(f"Your Risk Profile: {risk_level}")
     print(f"Description: {description}")
     return risk_score
 
 def main():
-    people_list = load_portfolios(PEOPLE_FILE)
+    configure_profiler()
+    with stage("load"):
+        storage = get_storage()
+        people_list = storage.load_people()
     if not people_list:
         print("Operation could not be completed. Please check the people list.")
         return
-    selected_person = select_person(people_list)
+    with stage("select"):
+        selected_person = select_person(people_list)
     if selected_person:
-        risk_score = calculate_risk_profile()
+        name = selected_person['name']
+        # The survey stage includes the time spent waiting for answers
+        with stage("survey", person=name, hot=True):
+            risk_score = calculate_risk_profile()
         if risk_score is not None:
             selected_person['risk_score'] = round(risk_score, 2)
-            print(f"\n{selected_person['name']}'s new risk score is '{selected_person['risk_score']}'.")
-            save_portfolios(PEOPLE_FILE, people_list)
+            print(f"\n{name}'s new risk score is '{selected_person['risk_score']}'.")
+            with stage("save", person=name):
+                # Only the selected person's risk score is updated
+                storage.update_risk_score(name, selected_person['risk_score'])
+            print("\nData successfully saved.")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
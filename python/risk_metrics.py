@@ -0,0 +1,331 @@
+"""
+Portfolio Risk Metrics
+Ağırlıklı risk puanına ek olarak korelasyonu ve çeşitlendirmeyi hesaba katan
+portföy risk ölçülerini hesaplayan modül:
+
+    volatility        yıllık oynaklık, sqrt(w' S w)
+    parametric VaR    normal dağılım varsayımıyla riske maruz değer
+    parametric CVaR   normal dağılım varsayımıyla VaR ötesindeki ortalama kayıp
+    simulated VaR     Monte Carlo çekilişlerinden (monte_carlo.py) tarihsel yöntemle VaR
+    simulated CVaR    aynı çekilişlerde kuyruktaki ortalama kayıp
+    marjinal katkı    d(oynaklık) / d(w_i) = (S w)_i / oynaklık
+    bileşen katkısı   w_i * marjinal katkı (toplamı oynaklığa eşittir)
+
+Kovaryans matrisi portfolio_optimizer.build_covariance ile, çekilişler
+monte_carlo.draw_returns ile üretilir; ikisi de USD bazlı varlıklarda kur etkisini
+içerir. Çekilişler bir kez üretilip tüm portföyler için tekrar kullanılır ve tüm
+ölçüler kişi x varlık ağırlık matrisi üzerinden toplu hesaplanır. VaR ve CVaR,
+yıllık kayıp oranı olarak pozitif sayılarla raporlanır.
+
+Kullanım:
+    python risk_metrics.py
+    python risk_metrics.py --all --confidence 0.99
+"""
+
+import argparse
+import json
+import sys
+import time
+from statistics import NormalDist
+
+import numpy as np
+
+from data_store import load_json, ASSET_FILE, OPTIMIZER_CONFIG_FILE, SIMULATION_CONFIG_FILE
+from monte_carlo import build_simulation_model, draw_returns
+from portfolio_engine import SCENARIOS, compile_people, get_asset_table, pack_weights
+from portfolio_optimizer import build_covariance
+from report_renderer import make_section
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RISK_PATHS = 20_000
+DEFAULT_SEED = 42
+
+# Portföy x çekiliş getiri matrisi bu kadar elemanı geçmeyecek şekilde parçalanır
+MAX_BLOCK_SIZE = 4_000_000
+
+METRIC_LABELS = [
+    ("volatility", "Oynaklık (Yıllık)"),
+    ("parametric_var", "VaR (Param.)"),
+    ("parametric_cvar", "CVaR (Param.)"),
+    ("simulated_var", "VaR (Sim.)"),
+    ("simulated_cvar", "CVaR (Sim.)")
+]
+
+# Son kurulan risk modeli: (asset_info, sim_config, opt_config, yol, seed, model)
+_model_cache = None
+
+def _load_optional(file_path):
+    try:
+        return load_json(file_path)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def build_risk_model(asset_info, sim_config=None, opt_config=None, n_paths=DEFAULT_RISK_PATHS, seed=None):
+    """
+    Kovaryans matrisini, beklenen getirileri ve simülasyon çekilişlerini hazırlar.
+
+    Returns:
+        dict: 'names', 'means' (baz senaryo, kurla birleştirilmiş), 'covariance'
+              (varlık x varlık) ve 'sample' (çekiliş x varlık TL getirileri)
+    """
+    table = get_asset_table(asset_info)
+    if seed is None:
+        seed = (sim_config or {}).get('seed', DEFAULT_SEED)
+    rng = np.random.default_rng(seed)
+    return {
+        'names': table['names'],
+        'means': table['combined_returns'][SCENARIOS.index('base')],
+        'covariance': build_covariance(asset_info, sim_config, opt_config),
+        'sample': draw_returns(build_simulation_model(asset_info, sim_config), n_paths, rng)
+    }
+
+def get_risk_model(asset_info, n_paths=DEFAULT_RISK_PATHS):
+    """
+    simulation_config.json ve optimizer_config.json ile kurulan risk modelini,
+    dosyalar ve asset_info değişmediği sürece tekrar kullanır.
+    """
+    global _model_cache
+    sim_config = _load_optional(SIMULATION_CONFIG_FILE)
+    opt_config = _load_optional(OPTIMIZER_CONFIG_FILE)
+    if _model_cache is not None:
+        cached_info, cached_sim, cached_opt, cached_paths, cached_model = _model_cache
+        if cached_info is asset_info and cached_sim is sim_config and cached_opt is opt_config \
+                and cached_paths == n_paths:
+            return cached_model
+    model = build_risk_model(asset_info, sim_config, opt_config, n_paths)
+    _model_cache = (asset_info, sim_config, opt_config, n_paths, model)
+    return model
+
+def tail_losses(returns, confidence):
+    """
+    Portföy x çekiliş getirilerinden tarihsel VaR ve CVaR değerlerini hesaplar.
+    Kuyruk, en kötü ceil((1 - güven) * çekiliş) getiridir.
+    """
+    tail_size = max(1, int(np.ceil((1 - confidence) * returns.shape[1] - 1e-9)))
+    tail = np.partition(returns, tail_size - 1, axis=1)[:, :tail_size]
+    return -tail.max(axis=1), -tail.mean(axis=1)
+
+def compute_risk_metrics(weights, model, confidence=DEFAULT_CONFIDENCE):
+    """
+    Ağırlık matrisindeki tüm portföylerin risk ölçülerini hesaplar.
+
+    Args:
+        weights: (portföy, varlık) ağırlık matrisi
+        model: build_risk_model çıktısı
+        confidence: VaR/CVaR güven düzeyi (ör. 0.95)
+
+    Returns:
+        dict: 'mean', 'volatility', 'parametric_var', 'parametric_cvar',
+              'simulated_var', 'simulated_cvar' (portföy,) ve 'marginal',
+              'component' (portföy, varlık) dizileri
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+    mean = weights @ model['means']
+    covariance_weights = weights @ model['covariance']
+    volatility = np.sqrt(np.maximum(np.einsum('ij,ij->i', covariance_weights, weights), 0))
+
+    normal = NormalDist()
+    z = normal.inv_cdf(confidence)
+    parametric_var = z * volatility - mean
+    parametric_cvar = volatility * normal.pdf(z) / (1 - confidence) - mean
+
+    sample = model['sample']
+    simulated_var = np.empty(len(weights))
+    simulated_cvar = np.empty(len(weights))
+    block = max(1, MAX_BLOCK_SIZE // len(sample))
+    for start in range(0, len(weights), block):
+        stop = start + block
+        simulated_var[start:stop], simulated_cvar[start:stop] = tail_losses(
+            weights[start:stop] @ sample.T, confidence
+        )
+
+    marginal = np.divide(covariance_weights, volatility[:, None],
+                         out=np.zeros_like(covariance_weights), where=volatility[:, None] > 0)
+    return {
+        'mean': mean,
+        'volatility': volatility,
+        'parametric_var': parametric_var,
+        'parametric_cvar': parametric_cvar,
+        'simulated_var': simulated_var,
+        'simulated_cvar': simulated_cvar,
+        'marginal': marginal,
+        'component': weights * marginal
+    }
+
+def people_risk_metrics(people, asset_info, confidence=DEFAULT_CONFIDENCE, n_paths=DEFAULT_RISK_PATHS):
+    """
+    Tüm kişilerin mevcut ve hedef portföyleri için risk ölçülerini toplu hesaplar.
+
+    Returns:
+        dict: 'names', 'principal' ile 'current' ve 'target' için compute_risk_metrics sonuçları
+    """
+    table = get_asset_table(asset_info)
+    compiled = compile_people(people, table)
+    model = get_risk_model(asset_info, n_paths)
+    return {
+        'names': compiled['names'],
+        'principal': compiled['principal'],
+        'current': compute_risk_metrics(compiled['current'], model, confidence),
+        'target': compute_risk_metrics(compiled['target'], model, confidence)
+    }
+
+def build_risk_sections(principal, current_dist, target_dist, asset_info, confidence=DEFAULT_CONFIDENCE,
+                        n_paths=DEFAULT_RISK_PATHS):
+    """
+    Mevcut ve hedef portföyün risk ölçülerini ve varlık bazında risk katkılarını
+    rapor bölümleri olarak hazırlar.
+
+    Returns:
+        list: 'risk_metrics' ve 'risk_contributions' bölümleri
+    """
+    table = get_asset_table(asset_info)
+    model = get_risk_model(asset_info, n_paths)
+    metrics = compute_risk_metrics(pack_weights([current_dist, target_dist], table), model, confidence)
+
+    rows = []
+    for key, label in METRIC_LABELS:
+        current_value, target_value = metrics[key]
+        rows.append({
+            'metric': key,
+            'label': label,
+            'current': float(current_value),
+            'current_amount': float(current_value * principal),
+            'target': float(target_value),
+            'target_amount': float(target_value * principal)
+        })
+    columns = [
+        ('label', 'Ölçü'),
+        ('current', 'Mevcut Oran'),
+        ('current_amount', 'Mevcut (TL)'),
+        ('target', 'Hedef Oran'),
+        ('target_amount', 'Hedef (TL)')
+    ]
+    metrics_section = make_section('risk_metrics', 'Risk Ölçüleri', columns, rows, {
+        'confidence': confidence,
+        'paths': len(model['sample'])
+    })
+
+    contribution_rows = []
+    volatility = metrics['volatility']
+    shares = np.divide(metrics['component'], volatility[:, None],
+                       out=np.zeros_like(metrics['component']), where=volatility[:, None] > 0)
+    for col, asset in enumerate(table['names']):
+        if not metrics['component'][:, col].any():
+            continue
+        contribution_rows.append({
+            'asset': asset,
+            'current_marginal': float(metrics['marginal'][0, col]),
+            'current_share': float(shares[0, col]),
+            'target_marginal': float(metrics['marginal'][1, col]),
+            'target_share': float(shares[1, col])
+        })
+    contribution_columns = [
+        ('asset', 'Varlık'),
+        ('current_marginal', 'Mevcut Marjinal Katkı'),
+        ('current_share', 'Mevcut Risk Payı'),
+        ('target_marginal', 'Hedef Marjinal Katkı'),
+        ('target_share', 'Hedef Risk Payı')
+    ]
+    contributions_section = make_section('risk_contributions', 'Risk Katkıları',
+                                         contribution_columns, contribution_rows)
+    return [metrics_section, contributions_section]
+
+def format_risk_metric_lines(section):
+    """
+    Risk ölçülerini karşılaştırma tablosunun 'RİSK SKORU' satırıyla aynı düzende
+    satırlara çevirir.
+    """
+    level = f"%{section['fields']['confidence'] * 100:g}"
+    lines = []
+    for row in section['rows']:
+        label = row['label'].upper() if row['metric'] == 'volatility' else f"{row['label']} {level}"
+        current_str = f"%{row['current'] * 100:.2f} ({row['current_amount']:,.0f} TL)"
+        target_str = f"%{row['target'] * 100:.2f} ({row['target_amount']:,.0f} TL)"
+        lines.append(f"{label[:20]:<20} | {current_str:>30} | {target_str:>30} | {'':>25}")
+    return lines
+
+def format_risk_contribution_lines(section):
+    table_width = 95
+    lines = [
+        "",
+        "-" * table_width,
+        "RİSK KATKILARI (Oynaklığa Marjinal ve Bileşen Katkı)".center(table_width),
+        "-" * table_width,
+        f"{'VARLIK':<20} | {'MEVCUT PORTFÖY':^34} | {'HEDEF PORTFÖY':^34}",
+        f"{'':<20} | {'Marjinal':>16} | {'Risk Payı':>15} | {'Marjinal':>16} | {'Risk Payı':>15}",
+        "-" * table_width
+    ]
+    for row in section['rows']:
+        lines.append(
+            f"{row['asset']:<20} | {row['current_marginal'] * 100:>15.2f}% | {row['current_share'] * 100:>14.1f}% | "
+            f"{row['target_marginal'] * 100:>15.2f}% | {row['target_share'] * 100:>14.1f}%"
+        )
+    return lines
+
+def show_risk_summary(result, confidence):
+    """
+    Tüm kişilerin risk ölçülerinin ortalamasını ve en riskli hedef portföyleri gösterir.
+    """
+    table_width = 95
+    level = f"%{confidence * 100:g}"
+    print("\n" + "=" * table_width)
+    print(f"RİSK ÖLÇÜLERİ ÖZETİ ({len(result['names'])} kişi, güven düzeyi {level})".center(table_width))
+    print("=" * table_width)
+    print(f"{'ÖLÇÜ':<25} | {'MEVCUT (ORT.)':>15} | {'HEDEF (ORT.)':>15} | {'HEDEF (MEDYAN)':>15}")
+    print("-" * table_width)
+    for key, label in METRIC_LABELS:
+        current_mean = result['current'][key].mean()
+        target_mean = result['target'][key].mean()
+        target_median = np.median(result['target'][key])
+        print(f"{label:<25} | {current_mean * 100:>14.2f}% | {target_mean * 100:>14.2f}% | {target_median * 100:>14.2f}%")
+    print("-" * table_width)
+
+    order = np.argsort(-result['target']['simulated_cvar'])[:10]
+    print(f"{'EN YÜKSEK HEDEF CVaR':<25} | {'OYNAKLIK':>15} | {'VaR (SİM.)':>15} | {'CVaR (SİM.)':>15}")
+    for row in order:
+        target = result['target']
+        print(f"{result['names'][row][:25]:<25} | {target['volatility'][row] * 100:>14.2f}% | "
+              f"{target['simulated_var'][row] * 100:>14.2f}% | {target['simulated_cvar'][row] * 100:>14.2f}%")
+    print("=" * table_width)
+
+if __name__ == "__main__":
+    from comparison_report import load_file, select_person
+    from portfolio_engine import current_distribution, normalize_people
+    from storage import get_storage
+
+    parser = argparse.ArgumentParser(description="Portföylerin oynaklık, VaR/CVaR ve risk katkılarını hesaplar.")
+    parser.add_argument("--confidence", type=float, default=DEFAULT_CONFIDENCE, help="VaR/CVaR güven düzeyi")
+    parser.add_argument("--paths", type=int, default=DEFAULT_RISK_PATHS, help="Simülasyon çekiliş sayısı")
+    parser.add_argument("--all", action="store_true", help="Tüm kişilerin risk ölçülerini özetle")
+    args = parser.parse_args()
+    if not 0.5 <= args.confidence < 1:
+        sys.exit("Hata: Güven düzeyi 0.5 ile 1 arasında olmalı.")
+
+    people_list = get_storage().load_people()
+    asset_info = load_file(ASSET_FILE)
+    if people_list is None or asset_info is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    normalize_people(people_list, asset_info)
+
+    if args.all:
+        start = time.perf_counter()
+        result = people_risk_metrics(people_list, asset_info, args.confidence, args.paths)
+        elapsed = time.perf_counter() - start
+        show_risk_summary(result, args.confidence)
+        print(f"Süre: {elapsed:.3f} sn")
+    else:
+        selected_person = select_person(people_list)
+        if selected_person:
+            principal = selected_person.get('principal', 0)
+            metrics_section, contributions_section = build_risk_sections(
+                principal,
+                current_distribution(selected_person),
+                selected_person.get('target_portfolio') or {},
+                asset_info,
+                args.confidence,
+                args.paths
+            )
+            print(f"\nKişi: {selected_person['name']}")
+            print(f"{'ÖLÇÜ':<20} | {'MEVCUT':>30} | {'HEDEF':>30} |")
+            print("\n".join(format_risk_metric_lines(metrics_section)))
+            print("\n".join(format_risk_contribution_lines(contributions_section)))
@@ -0,0 +1,303 @@
+"""
+Sensitivity Grid Sweep
+Senaryo getirilerinin varsayımlara (USD/TRY artışı, varlık getirileri) duyarlılığını
+bir veya iki parametreli bir ızgara üzerinde hesaplayan modül.
+
+Kurla birleştirilmiş getiri (1 + r)(1 + fx) - 1 her parametrede doğrusal olduğu
+için her portföyün getirisi ızgara üzerinde a + b·x + c·y + d·x·y biçimindedir.
+Dört katsayı tüm kişiler için tek bir matris çarpımıyla bulunur; ızgara yayınlama
+(broadcasting) ile değerlendirilir. Her ızgara noktası için portföy büyüklüğüne göre
+ağırlıklı getiri, kişi ortalaması ve zarar eden kişi oranı raporlanır; zarar oranı
+her x satırında kişilerin sıfır noktaları sıralanarak ikili arama ile sayılır.
+
+Parametreler "AD=başlangıç:bitiş:adım_sayısı" biçimindedir. AD "fx" ise USD/TRY
+artışı, aksi halde bir varlığın (kendi para birimindeki) getirisidir. Değerler
+varsayılan olarak mutlak getiridir; --shift ile senaryodaki değere eklenir.
+
+Kullanım:
+    python sensitivity.py --x "fx=-0.1:0.6:200" --y "Foreign Stocks=-0.3:0.5:200"
+    python sensitivity.py --x "Gold=-0.2:0.2:41" --shift --scenario bad --output gold.csv
+    python sensitivity.py --x "fx=0:0.5:11" --name "Celal Berke Akyol"
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from data_store import load_json, ASSET_FILE
+from portfolio_engine import SCENARIOS, compile_people, get_asset_table, normalize_people
+from storage import get_storage
+
+FX_PARAMETER = "fx"
+DEFAULT_OUTPUT_DIR = "../reports/sensitivity"
+PREVIEW_SIZE = 9
+METRICS = ("weighted_return", "mean_return", "loss_share")
+METRIC_LABELS = {
+    "weighted_return": "Ağırlıklı Getiri",
+    "mean_return": "Ortalama Getiri",
+    "loss_share": "Zarar Eden Kişi Oranı"
+}
+
+def parse_parameter(spec):
+    """
+    "AD=başlangıç:bitiş:adım_sayısı" ifadesini (ad, değerler) çiftine çevirir.
+
+    Raises:
+        ValueError: İfade geçersizse
+    """
+    name, sep, grid = spec.rpartition("=")
+    parts = grid.split(":")
+    if not sep or not name.strip() or len(parts) != 3:
+        raise ValueError(f"Geçersiz parametre '{spec}'. Beklenen biçim: AD=başlangıç:bitiş:adım_sayısı")
+    start, stop, count = float(parts[0]), float(parts[1]), int(parts[2])
+    if count < 1:
+        raise ValueError(f"'{spec}' için adım sayısı en az 1 olmalı.")
+    return name.strip(), np.linspace(start, stop, count)
+
+def return_grid(table, scenario, parameters, shift=False):
+    """
+    Izgaranın her noktası için kurla birleştirilmiş varlık getirilerini üretir.
+
+    Args:
+        table: pack_asset_info çıktısı
+        scenario: 'bad', 'base' veya 'good'
+        parameters: [(ad, değerler), ...] - en fazla iki eksen
+        shift: True ise değerler senaryodaki getiriye eklenir
+
+    Returns:
+        np.ndarray: (x adımı, y adımı, varlık) boyutunda getiri dizisi
+    """
+    row = SCENARIOS.index(scenario)
+    shape = tuple(len(values) for _, values in parameters) + (1,) * (2 - len(parameters))
+    returns = np.broadcast_to(table['returns'][row], shape + (len(table['names']),)).copy()
+    fx = np.full(shape, table['fx_returns'][row])
+
+    for axis, (name, values) in enumerate(parameters):
+        values = values.reshape((-1, 1) if axis == 0 else (1, -1))
+        if name == FX_PARAMETER:
+            fx = fx + values if shift else np.broadcast_to(values, shape).copy()
+            continue
+        col = table['index'].get(name)
+        if col is None:
+            raise ValueError(f"'{name}' varlığı asset_info.json içinde tanımlı değil.")
+        returns[..., col] = returns[..., col] + values if shift else values
+
+    # Kur varlığının kendi getirisi kur artışıdır
+    fx_col = table['index'].get(table['fx_asset'])
+    if fx_col is not None and any(name == FX_PARAMETER for name, _ in parameters):
+        returns[..., fx_col] = fx
+
+    return np.where(table['combine_mask'], (1 + returns) * (1 + fx[..., None]) - 1, returns)
+
+def return_coefficients(table, scenario, names, shift=False):
+    """
+    Varlık getirilerinin ızgara parametrelerine bağlılığını katsayılarla ifade eder:
+    getiri(x, y) = a + b·x + c·y + d·x·y
+
+    Returns:
+        np.ndarray: (4, varlık) boyutunda [a, b, c, d] katsayıları
+    """
+    unit = np.array([0.0, 1.0])
+    corners = return_grid(table, scenario, [(name, unit) for name in names], shift)
+    if corners.shape[1] == 1:
+        corners = np.concatenate([corners, corners], axis=1)
+    c00, c01, c10, c11 = corners[0, 0], corners[0, 1], corners[1, 0], corners[1, 1]
+    return np.stack([c00, c10 - c00, c01 - c00, c11 - c10 - c01 + c00])
+
+def count_losses(a, b, c, d, x_values, y_values):
+    """
+    Her (x, y) noktasında a + b·x + (c + d·x)·y < 0 olan kişi sayısını döndürür.
+    Her x için kişilerin y eksenindeki sıfır noktaları sıralanır ve tüm y değerleri
+    ikili arama ile sayılır.
+    """
+    counts = np.zeros((len(x_values), len(y_values)), dtype=np.int64)
+    for i, x in enumerate(x_values):
+        intercept = a + b * x
+        slope = c + d * x
+        rising = slope > 0
+        falling = slope < 0
+        # Eğim pozitifse y < kök, negatifse y > kök olduğunda getiri negatiftir
+        roots_up = np.sort(-intercept[rising] / slope[rising])
+        roots_down = np.sort(-intercept[falling] / slope[falling])
+        counts[i] = (
+            len(roots_up) - np.searchsorted(roots_up, y_values, side='right')
+            + np.searchsorted(roots_down, y_values, side='left')
+            + np.count_nonzero(intercept[~(rising | falling)] < 0)
+        )
+    return counts
+
+def sweep(weights, principal, coefficients, x_values, y_values):
+    """
+    Tüm portföyleri her ızgara noktasında değerlendirir.
+
+    Args:
+        weights: (kişi, varlık) ağırlık matrisi
+        principal: (kişi,) ana para dizisi
+        coefficients: return_coefficients çıktısı
+        x_values, y_values: Eksen değerleri (tek eksenli taramada y_values = [0])
+
+    Returns:
+        dict: METRICS içindeki her metrik için (x, y) boyutunda dizi
+    """
+    people = len(principal)
+    a, b, c, d = coefficients @ weights.T
+    x = x_values[:, None]
+    y = y_values[None, :]
+
+    def surface(ca, cb, cc, cd):
+        return ca + cb * x + cc * y + cd * x * y
+
+    total_principal = principal.sum()
+    weighted = surface(*(principal @ coef for coef in (a, b, c, d)))
+    mean = surface(*(coef.sum() for coef in (a, b, c, d)))
+    losses = count_losses(a, b, c, d, x_values, y_values)
+    return {
+        'weighted_return': weighted / total_principal if total_principal > 0 else weighted,
+        'mean_return': mean / people if people else mean,
+        'loss_share': losses / people if people else losses.astype(np.float64)
+    }
+
+def run_sensitivity(people, asset_info, parameters, scenario="base", shift=False):
+    """
+    Kişilerin mevcut ve hedef portföyleri için duyarlılık ızgarasını hesaplar.
+
+    Returns:
+        dict: 'scenario', 'shift', 'axes' ([{'name', 'values'}]) ve 'current' /
+              'target' için sweep sonuçları
+    """
+    table = get_asset_table(asset_info)
+    compiled = compile_people(people, table)
+    coefficients = return_coefficients(table, scenario, [name for name, _ in parameters], shift)
+    x_values = parameters[0][1]
+    y_values = parameters[1][1] if len(parameters) > 1 else np.zeros(1)
+    return {
+        'scenario': scenario,
+        'shift': shift,
+        'people': len(people),
+        'axes': [{'name': name, 'values': values} for name, values in parameters],
+        'current': sweep(compiled['current'], compiled['principal'], coefficients, x_values, y_values),
+        'target': sweep(compiled['target'], compiled['principal'], coefficients, x_values, y_values)
+    }
+
+def preview_indices(count, size=PREVIEW_SIZE):
+    return np.unique(np.linspace(0, count - 1, min(count, size)).round().astype(int))
+
+def show_sensitivity(result, metric="weighted_return"):
+    """
+    Sonucun seyreltilmiş bir önizlemesini tablo olarak yazdırır.
+    """
+    axes = result['axes']
+    x_axis = axes[0]
+    y_axis = axes[1] if len(axes) > 1 else None
+    rows = preview_indices(len(x_axis['values']))
+    cols = preview_indices(len(y_axis['values'])) if y_axis else np.array([0])
+    width = 14 + 10 * len(cols)
+
+    for portfolio, label in (("current", "MEVCUT"), ("target", "HEDEF")):
+        values = result[portfolio][metric]
+        print("\n" + "=" * width)
+        print(f"{label} PORTFÖY - {METRIC_LABELS[metric]} ({result['scenario']})".center(width))
+        print("=" * width)
+        header = f"{x_axis['name'][:12]:>12} |"
+        if y_axis:
+            header += "".join(f"{y_axis['values'][c]:>+10.3f}" for c in cols)
+            print(f"{'':>12} | {y_axis['name'][:width - 16]}")
+        else:
+            header += f"{'':>10}"
+        print(header)
+        print("-" * width)
+        for r in rows:
+            line = f"{x_axis['values'][r]:>+12.3f} |"
+            line += "".join(f"{values[r, c] * 100:>9.2f}%" for c in cols)
+            print(line)
+        print("=" * width)
+
+def to_serializable(result):
+    return {
+        'scenario': result['scenario'],
+        'shift': result['shift'],
+        'people': result['people'],
+        'axes': [{'name': axis['name'], 'values': axis['values'].tolist()} for axis in result['axes']],
+        'current': {metric: values.tolist() for metric, values in result['current'].items()},
+        'target': {metric: values.tolist() for metric, values in result['target'].items()}
+    }
+
+def save_result(result, file_path):
+    """
+    Sonucu ısı haritası verisi olarak kaydeder. .csv uzantısında uzun biçim
+    (x, y, portföy, metrik, değer), aksi halde JSON kullanılır.
+    """
+    directory = os.path.dirname(file_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if not file_path.lower().endswith(".csv"):
+        with open(file_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(to_serializable(result), ensure_ascii=False))
+        return
+
+    axes = result['axes']
+    x_values = axes[0]['values']
+    y_values = axes[1]['values'] if len(axes) > 1 else np.array([np.nan])
+    with open(file_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow([axes[0]['name'], axes[1]['name'] if len(axes) > 1 else "", "portfolio", "metric", "value"])
+        for portfolio in ("current", "target"):
+            for metric in METRICS:
+                values = result[portfolio][metric]
+                for i, x in enumerate(x_values):
+                    writer.writerows(
+                        (x, "" if np.isnan(y) else y, portfolio, metric, values[i, j])
+                        for j, y in enumerate(y_values)
+                    )
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Senaryo getirilerinin varsayımlara duyarlılığını hesaplar.")
+    parser.add_argument("--x", required=True, help='Birinci eksen, ör. "fx=-0.1:0.6:200"')
+    parser.add_argument("--y", help='İkinci eksen, ör. "Foreign Stocks=-0.3:0.5:200"')
+    parser.add_argument("--scenario", choices=SCENARIOS, default="base", help="Temel senaryo")
+    parser.add_argument("--shift", action="store_true", help="Değerleri senaryodaki getiriye ekle")
+    parser.add_argument("--name", action="append", dest="names", help="Sadece bu kişi (tekrarlanabilir)")
+    parser.add_argument("--metric", choices=METRICS, default="weighted_return", help="Önizlemede gösterilecek metrik")
+    parser.add_argument("--output", help="Sonuç dosyası (.json veya .csv); varsayılan: ../reports/sensitivity/")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        parameters = [parse_parameter(spec) for spec in (args.x, args.y) if spec]
+    except ValueError as e:
+        sys.exit(f"Hata: {e}")
+
+    people_list = get_storage().load_people()
+    try:
+        asset_info = load_json(ASSET_FILE)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Hata: Veri dosyası okunamadı ({e}).")
+        asset_info = None
+    if people_list is None or asset_info is None:
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    normalize_people(people_list, asset_info)
+    if args.names:
+        people_list = [person for person in people_list if person.get('name') in args.names]
+        if not people_list:
+            sys.exit("Hata: Seçilen isimlerde kişi bulunamadı.")
+
+    start = time.perf_counter()
+    try:
+        sensitivity = run_sensitivity(people_list, asset_info, parameters, args.scenario, args.shift)
+    except ValueError as e:
+        sys.exit(f"Hata: {e}")
+    elapsed = time.perf_counter() - start
+
+    show_sensitivity(sensitivity, args.metric)
+    points = np.prod([len(values) for _, values in parameters])
+    print(f"\nKişi: {len(people_list)} | Izgara noktası: {points} | Süre: {elapsed:.2f} sn")
+
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"sensitivity_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    save_result(sensitivity, output)
+    print(f"Sonuç kaydedildi: {os.path.abspath(output)}")
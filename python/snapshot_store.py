@@ -0,0 +1,374 @@
+"""
+Snapshot Store
+Kişilerin portföy güncellemelerini tarihli anlık görüntüler (snapshot) olarak
+saklayan sütunlu zaman serisi deposu.
+
+Her sütun (tarih, kişi, ana para ve her varlığın tutarı) ayrı bir ikili dosyada
+float64/int dizisi olarak tutulur ve bellek eşleme (np.memmap) ile okunur; aralık
+sorguları JSON ayrıştırmadan yalnızca ilgili sütunlara dokunarak yanıtlanır.
+
+Klasör yapısı (varsayılan: data/snapshots/):
+    meta.json        satır sayısı, varlık ve kişi adları
+    date.i8          gün cinsinden tarih (datetime64[D])
+    person.i4        meta.json içindeki kişi sırası
+    principal.f8     ana para (TL)
+    asset_000.f8 ... varlık tutarları (TL), meta.json'daki varlık sırasıyla
+
+Kullanım:
+    python snapshot_store.py record
+    python snapshot_store.py principal --years 2
+    python snapshot_store.py principal --currency USD
+    python snapshot_store.py weight "Foreign Stocks" --name "Celal Berke Akyol"
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+
+import numpy as np
+
+from data_store import DATA_DIR
+from fx_rates import BASE_CURRENCY, load_fx_table
+from storage import get_storage
+
+SNAPSHOT_DIR = os.path.join(DATA_DIR, "snapshots")
+META_FILE_NAME = "meta.json"
+
+COLUMN_TYPES = {
+    'date': np.int64,
+    'person': np.int32,
+    'principal': np.float64
+}
+FILE_SUFFIXES = {np.int64: "i8", np.int32: "i4", np.float64: "f8"}
+
+def to_day(value):
+    """
+    Tarih, datetime, 'YYYY-MM-DD' metni veya datetime64 değerini gün sayısına çevirir.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        value = value.date()
+    return int(np.datetime64(value, 'D').astype(np.int64))
+
+def years_ago(years, today=None):
+    """
+    Bugünden (veya verilen tarihten) belirtilen yıl kadar önceki günü döndürür.
+    """
+    today = np.datetime64(today or datetime.date.today(), 'D')
+    return to_day(today - np.timedelta64(int(round(years * 365.25)), 'D'))
+
+class SnapshotStore:
+    """
+    Sütunlu, yalnızca eklemeli portföy geçmişi deposu.
+    """
+
+    def __init__(self, directory=SNAPSHOT_DIR):
+        self.directory = directory
+        self._meta = None
+        self._maps = {}
+
+    # --- Meta veri ve sütun dosyaları ---
+
+    def _meta_path(self):
+        return os.path.join(self.directory, META_FILE_NAME)
+
+    def meta(self):
+        """
+        meta.json içeriğini döndürür; depo henüz yoksa boş bir meta oluşturur.
+        """
+        if self._meta is None:
+            try:
+                with open(self._meta_path(), 'r', encoding='utf-8') as f:
+                    self._meta = json.load(f)
+            except FileNotFoundError:
+                self._meta = {'version': 1, 'rows': 0, 'sorted': True, 'last_day': None,
+                              'assets': [], 'people': []}
+        return self._meta
+
+    def _write_meta(self):
+        temp_path = self._meta_path() + ".tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._meta, f, ensure_ascii=False, indent=4)
+        os.replace(temp_path, self._meta_path())
+
+    def _column_file(self, column):
+        if column in COLUMN_TYPES:
+            return os.path.join(self.directory, f"{column}.{FILE_SUFFIXES[COLUMN_TYPES[column]]}")
+        return os.path.join(self.directory, f"asset_{column:03d}.f8")
+
+    def _column(self, column):
+        """
+        Sütunu salt okunur bellek eşlemesi olarak döndürür. Yalnızca meta.json'da
+        kayıtlı satırlar görünür; yarıda kalmış bir eklemenin fazlası yok sayılır.
+        """
+        rows = self.meta()['rows']
+        dtype = COLUMN_TYPES.get(column, np.float64)
+        if rows == 0:
+            return np.empty(0, dtype=dtype)
+        cached = self._maps.get(column)
+        if cached is None or cached.shape[0] != rows:
+            cached = np.memmap(self._column_file(column), dtype=dtype, mode='r', shape=(rows,))
+            self._maps[column] = cached
+        return cached
+
+    @property
+    def assets(self):
+        return list(self.meta()['assets'])
+
+    @property
+    def people(self):
+        return list(self.meta()['people'])
+
+    def __len__(self):
+        return self.meta()['rows']
+
+    # --- Yazma ---
+
+    def append(self, name, principal, amounts, date=None):
+        """
+        Tek bir kişinin güncel portföyünü tarihli snapshot olarak ekler.
+
+        Args:
+            name: Kişi adı
+            principal: Toplam ana para (TL)
+            amounts: {varlık: tutar (TL)} sözlüğü
+            date: Snapshot tarihi (varsayılan: bugün)
+        """
+        self.append_many([(name, principal, amounts, date)])
+
+    def append_many(self, records):
+        """
+        Birden fazla snapshot'ı tek seferde ekler. Her kayıt (ad, ana para,
+        tutarlar, tarih) dörtlüsüdür; tarih None ise bugün kullanılır.
+
+        Returns:
+            int: Eklenen satır sayısı
+        """
+        records = list(records)
+        if not records:
+            return 0
+
+        meta = self.meta()
+        os.makedirs(self.directory, exist_ok=True)
+        rows = meta['rows']
+        person_index = {name: i for i, name in enumerate(meta['people'])}
+        asset_index = {asset: i for i, asset in enumerate(meta['assets'])}
+
+        # Yeni varlıklar için sütun dosyası eski satırlar sıfırla doldurularak açılır
+        for _, _, amounts, _ in records:
+            for asset in amounts:
+                if asset not in asset_index:
+                    asset_index[asset] = len(meta['assets'])
+                    meta['assets'].append(asset)
+                    with open(self._column_file(asset_index[asset]), 'wb') as f:
+                        f.write(np.zeros(rows, dtype=np.float64).tobytes())
+
+        day_cache = {None: to_day(datetime.date.today())}
+        days = np.empty(len(records), dtype=np.int64)
+        persons = np.empty(len(records), dtype=np.int32)
+        principals = np.empty(len(records), dtype=np.float64)
+        values = np.zeros((len(meta['assets']), len(records)), dtype=np.float64)
+        for row, (name, principal, amounts, date) in enumerate(records):
+            if name not in person_index:
+                person_index[name] = len(meta['people'])
+                meta['people'].append(name)
+            if date not in day_cache:
+                day_cache[date] = to_day(date)
+            days[row] = day_cache[date]
+            persons[row] = person_index[name]
+            principals[row] = principal
+            for asset, amount in amounts.items():
+                values[asset_index[asset], row] = amount
+
+        columns = [('date', days), ('person', persons), ('principal', principals)]
+        columns += list(enumerate(values))
+        for column, data in columns:
+            path = self._column_file(column)
+            # Yarıda kalmış önceki bir eklemenin artıkları önce kesilir
+            if os.path.exists(path) and os.path.getsize(path) != rows * data.itemsize:
+                with open(path, 'r+b') as f:
+                    f.truncate(rows * data.itemsize)
+            with open(path, 'ab') as f:
+                f.write(data.tobytes())
+
+        last_day = meta['last_day']
+        meta['sorted'] = bool(meta['sorted'] and (last_day is None or days[0] >= last_day)
+                              and np.all(np.diff(days) >= 0))
+        meta['last_day'] = int(days.max()) if last_day is None else max(last_day, int(days.max()))
+        meta['rows'] = rows + len(records)
+        self._write_meta()
+        self._maps.clear()
+        return len(records)
+
+    def record_people(self, people, date=None):
+        """
+        Kişilerin mevcut portföylerini aynı tarihli snapshot'lar olarak ekler.
+        """
+        return self.append_many(
+            (person.get('name', ''), person.get('principal', 0),
+             person.get('current_portfolio_amount', {}), date)
+            for person in people
+            if person.get('current_portfolio_amount')
+        )
+
+    # --- Sorgular ---
+
+    def select(self, start=None, end=None, names=None):
+        """
+        [start, end] tarih aralığındaki (ve istenirse sadece verilen kişilere ait)
+        satırların indekslerini döndürür. Tarihler sıralıysa aralık ikili arama
+        ile bulunur, aksi halde sütun üzerinde maske uygulanır.
+        """
+        days = self._column('date')
+        start_day, end_day = to_day(start), to_day(end)
+        if self.meta()['sorted']:
+            low = 0 if start_day is None else int(np.searchsorted(days, start_day, side='left'))
+            high = len(days) if end_day is None else int(np.searchsorted(days, end_day, side='right'))
+            rows = np.arange(low, high)
+        else:
+            mask = np.ones(len(days), dtype=bool)
+            if start_day is not None:
+                mask &= days >= start_day
+            if end_day is not None:
+                mask &= days <= end_day
+            rows = np.flatnonzero(mask)
+
+        if names is not None:
+            person_index = {name: i for i, name in enumerate(self.meta()['people'])}
+            wanted = [person_index[name] for name in names if name in person_index]
+            rows = rows[np.isin(self._column('person')[rows], wanted)]
+        return rows
+
+    def _result(self, rows, values):
+        people = self.meta()['people']
+        person_ids = np.asarray(self._column('person')[rows])
+        return {
+            'dates': np.asarray(self._column('date')[rows]).astype('datetime64[D]'),
+            'people': [people[i] for i in person_ids],
+            'person_ids': person_ids,
+            'values': values
+        }
+
+    def principal_history(self, start=None, end=None, names=None):
+        """
+        Seçilen aralıktaki ana para değerlerini döndürür.
+
+        Returns:
+            dict: 'dates', 'people', 'person_ids' ve 'values' (ana para) alanları
+        """
+        rows = self.select(start, end, names)
+        return self._result(rows, np.asarray(self._column('principal')[rows]))
+
+    def amount_history(self, asset, start=None, end=None, names=None):
+        """
+        Bir varlığın seçilen aralıktaki tutarlarını (TL) döndürür.
+        """
+        return self._asset_history(asset, self.select(start, end, names))
+
+    def _asset_history(self, asset, rows):
+        assets = self.meta()['assets']
+        if asset not in assets:
+            return self._result(rows, np.zeros(len(rows)))
+        return self._result(rows, np.asarray(self._column(assets.index(asset))[rows]))
+
+    def weight_history(self, asset, start=None, end=None, names=None):
+        """
+        Bir varlığın portföy içindeki ağırlığını (tutar / ana para) zamana göre döndürür.
+        """
+        rows = self.select(start, end, names)
+        result = self._asset_history(asset, rows)
+        principal = np.asarray(self._column('principal')[rows])
+        result['values'] = np.divide(result['values'], principal,
+                                     out=np.zeros(len(principal)), where=principal > 0)
+        return result
+
+    def amounts(self, start=None, end=None, names=None):
+        """
+        Seçilen satırların tüm varlık tutarlarını (satır x varlık) matris olarak döndürür.
+        """
+        rows = self.select(start, end, names)
+        columns = [np.asarray(self._column(i)[rows]) for i in range(len(self.meta()['assets']))]
+        matrix = np.column_stack(columns) if columns else np.zeros((len(rows), 0))
+        result = self._result(rows, matrix)
+        result['assets'] = self.assets
+        return result
+
+    def latest(self, name):
+        """
+        Bir kişinin en son snapshot'ını {'date', 'principal', 'amounts'} olarak döndürür.
+        Kişinin kaydı yoksa None döndürür.
+        """
+        rows = self.select(names=[name])
+        if len(rows) == 0:
+            return None
+        days = np.asarray(self._column('date')[rows])
+        row = rows[len(days) - 1 - int(np.argmax(days[::-1]))]
+        return {
+            'date': str(np.datetime64(int(self._column('date')[row]), 'D')),
+            'principal': float(self._column('principal')[row]),
+            'amounts': {asset: float(self._column(i)[row]) for i, asset in enumerate(self.meta()['assets'])}
+        }
+
+def show_history(title, result):
+    """
+    Sorgu sonucunu tarih ve kişiye göre tablo halinde yazdırır.
+    """
+    print("\n" + "=" * 70)
+    print(title.center(70))
+    print("=" * 70)
+    if len(result['values']) == 0:
+        print("Seçilen aralıkta kayıt bulunamadı.")
+        return
+    print(f"{'TARİH':<12} | {'KİŞİ':<35} | {'DEĞER':>17}")
+    print("-" * 70)
+    for date, name, value in zip(result['dates'], result['people'], result['values']):
+        print(f"{str(date):<12} | {name[:35]:<35} | {value:>17,.4f}")
+    print("=" * 70)
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Portföy snapshot geçmişini kaydeder ve sorgular.")
+    parser.add_argument("--dir", default=SNAPSHOT_DIR, help="Snapshot klasörü")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Tüm kişilerin mevcut portföyünü snapshot olarak ekle")
+    record.add_argument("--date", help="Snapshot tarihi (YYYY-MM-DD, varsayılan: bugün)")
+
+    for command in ("principal", "weight"):
+        query = commands.add_parser(command, help=f"{command} geçmişini göster")
+        if command == "weight":
+            query.add_argument("asset", help="Varlık adı")
+        query.add_argument("--name", action="append", dest="names", help="Sadece bu kişi (tekrarlanabilir)")
+        query.add_argument("--since", help="Başlangıç tarihi (YYYY-MM-DD)")
+        query.add_argument("--until", help="Bitiş tarihi (YYYY-MM-DD)")
+        query.add_argument("--years", type=float, help="Son N yıl")
+        if command == "principal":
+            query.add_argument("--currency", default=BASE_CURRENCY,
+                               help="Para birimi; her kayıt kendi tarihindeki kurla çevrilir (varsayılan: TRY)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    store = SnapshotStore(args.dir)
+
+    if args.command == "record":
+        people_list = get_storage().load_people()
+        if people_list is None:
+            sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+        count = store.record_people(people_list, args.date)
+        print(f"{count} snapshot eklendi. Toplam kayıt: {len(store)}")
+    else:
+        start = years_ago(args.years) if args.years else args.since
+        if args.command == "principal":
+            history = store.principal_history(start, args.until, args.names)
+            if args.currency != BASE_CURRENCY:
+                try:
+                    history['values'] = load_fx_table().from_base(history['values'], args.currency, history['dates'])
+                except KeyError as e:
+                    sys.exit(f"Hata: {e.args[0]}")
+            label = "TL" if args.currency == BASE_CURRENCY else args.currency
+            show_history(f"ANA PARA GEÇMİŞİ ({label})", history)
+        else:
+            show_history(f"AĞIRLIK GEÇMİŞİ: {args.asset}", store.weight_history(args.asset, start, args.until, args.names))
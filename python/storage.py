@@ -0,0 +1,498 @@
+"""
+People Storage Backends
+Kişi, hedef ağırlık ve varlık tutarı verilerini saklayan değiştirilebilir depolama
+katmanı. Varsayılan olarak people.json kullanılır; PORTFOLIO_STORAGE=sqlite ortam
+değişkeni ile indeksli yerel SQLite veritabanına geçilir.
+
+PORTFOLIO_STORAGE=jsonl ile her satırda bir kişi bulunan people.jsonl dosyası
+kullanılır; bu biçim kişileri tek tek okuyarak büyük dosyalarda sabit bellekle
+çalışır.
+
+Kullanım:
+    python storage.py import       # people.json -> people.db
+    python storage.py export       # people.db -> people.json
+    python storage.py to-jsonl     # people.json -> people.jsonl
+    python storage.py from-jsonl   # people.jsonl -> people.json
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+
+from data_store import (
+    load_json,
+    save_json,
+    parse_json,
+    invalidate,
+    PEOPLE_FILE,
+    PEOPLE_DB_FILE,
+    PEOPLE_JSONL_FILE
+)
+
+STORAGE_ENV = "PORTFOLIO_STORAGE"
+BACKENDS = ("json", "jsonl", "sqlite")
+
+# Ayrı sütunlarda tutulan kişi alanları; diğer alanlar 'extra' sütununda saklanır
+_PERSON_COLUMNS = ('name', 'risk_score', 'principal', 'target_portfolio', 'current_portfolio_amount')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS people (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    risk_score REAL,
+    principal REAL,
+    extra TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_people_name ON people(name);
+CREATE TABLE IF NOT EXISTS target_weights (
+    person_id INTEGER NOT NULL REFERENCES people(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    asset TEXT NOT NULL,
+    weight REAL NOT NULL,
+    PRIMARY KEY (person_id, asset)
+);
+CREATE TABLE IF NOT EXISTS holdings (
+    person_id INTEGER NOT NULL REFERENCES people(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    asset TEXT NOT NULL,
+    amount REAL NOT NULL,
+    PRIMARY KEY (person_id, asset)
+);
+"""
+
+class JsonStorage:
+    """
+    people.json dosyasını kullanan depolama. Her güncelleme tüm dosyayı yeniden yazar.
+    """
+
+    def __init__(self, file_path=PEOPLE_FILE):
+        self.file_path = file_path
+
+    def load_people(self):
+        try:
+            # Liste önbellekle paylaşılmaz; çağıranların ekleme/değiştirmeleri dosyaya sızmaz
+            return list(load_json(self.file_path) or [])
+        except FileNotFoundError:
+            print(f"Hata: '{self.file_path}' bulunamadı. Lütfen dosya yolunu kontrol edin.")
+            return None
+        except json.JSONDecodeError:
+            print(f"Hata: '{self.file_path}' geçerli bir JSON dosyası değil.")
+            return None
+
+    def iter_people(self):
+        people = self.load_people()
+        return None if people is None else iter(people)
+
+    def get_person(self, name):
+        for person in self.load_people() or []:
+            if person.get('name') == name:
+                return person
+        return None
+
+    def save_person(self, person):
+        people = self.load_people() or []
+        for i, existing in enumerate(people):
+            if existing is person or existing.get('name') == person.get('name'):
+                people[i] = person
+                break
+        else:
+            people.append(person)
+        save_json(people, self.file_path, indent=4)
+
+    def update_risk_score(self, name, risk_score):
+        person = self.get_person(name)
+        if person is None:
+            return False
+        person['risk_score'] = risk_score
+        self.save_person(person)
+        return True
+
+    def update_risk_scores(self, scores):
+        """
+        Birden çok kişinin risk puanını ({ad: puan}) tek bir yazma işlemiyle günceller.
+
+        Returns:
+            int: Güncellenen farklı kişi adı sayısı
+        """
+        people = self.load_people()
+        if people is None:
+            return 0
+        updated = set()
+        for person in people:
+            name = person.get('name')
+            if name in scores:
+                person['risk_score'] = scores[name]
+                updated.add(name)
+        if updated:
+            save_json(people, self.file_path, indent=4)
+        return len(updated)
+
+    def update_holdings(self, holdings):
+        """
+        Birden çok kişinin ana parasını ve varlık tutarlarını ({ad: (ana para, tutarlar)})
+        tek bir yazma işlemiyle günceller.
+
+        Returns:
+            int: Güncellenen kişi sayısı
+        """
+        people = self.load_people()
+        if people is None:
+            return 0
+        updated = set()
+        for person in people:
+            name = person.get('name')
+            if name in holdings:
+                person['principal'], person['current_portfolio_amount'] = holdings[name]
+                updated.add(name)
+        if updated:
+            save_json(people, self.file_path, indent=4)
+        return len(updated)
+
+    def save_people(self, people):
+        save_json(list(people), self.file_path, indent=4)
+
+class JsonlStorage:
+    """
+    Her satırında bir kişi bulunan people.jsonl dosyasını kullanan depolama.
+    Okuma ve güncellemeler dosyayı satır satır işler; bellek kullanımı kişi
+    sayısından bağımsızdır.
+    """
+
+    def __init__(self, file_path=PEOPLE_JSONL_FILE):
+        self.file_path = file_path
+
+    def _read_lines(self):
+        with open(self.file_path, 'rb') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield parse_json(line)
+                except ValueError:
+                    print(f"Hata: '{self.file_path}' dosyasının {line_number}. satırı geçerli bir JSON değil. Atlanıyor.")
+
+    def iter_people(self):
+        """
+        Kişileri dosyadan okundukça tek tek döndüren bir üreteç verir.
+        Dosya bulunamazsa None döndürür.
+        """
+        if not os.path.exists(self.file_path):
+            print(f"Hata: '{self.file_path}' bulunamadı. Lütfen dosya yolunu kontrol edin.")
+            return None
+        return self._read_lines()
+
+    def load_people(self):
+        people = self.iter_people()
+        return None if people is None else list(people)
+
+    def get_person(self, name):
+        for person in self.iter_people() or ():
+            if person.get('name') == name:
+                return person
+        return None
+
+    def _rewrite(self, update):
+        """
+        Dosyayı geçici bir dosyaya satır satır kopyalarken her kişiye update
+        fonksiyonunu uygular. update None döndürürse satır değişmeden yazılır.
+
+        Returns:
+            bool: En az bir kişi güncellendiyse True
+        """
+        temp_path = self.file_path + ".tmp"
+        changed = False
+        with open(temp_path, 'w', encoding='utf-8') as out:
+            for person in self.iter_people() or ():
+                updated = update(person)
+                if updated is not None:
+                    person = updated
+                    changed = True
+                out.write(json.dumps(person, ensure_ascii=False) + "\n")
+        os.replace(temp_path, self.file_path)
+        return changed
+
+    def save_person(self, person):
+        name = person.get('name')
+        if os.path.exists(self.file_path) and self._rewrite(lambda p: person if p.get('name') == name else None):
+            return
+        with open(self.file_path, 'a', encoding='utf-8') as out:
+            out.write(json.dumps(person, ensure_ascii=False) + "\n")
+
+    def update_risk_score(self, name, risk_score):
+        if not os.path.exists(self.file_path):
+            return False
+        return self._rewrite(
+            lambda p: dict(p, risk_score=risk_score) if p.get('name') == name else None
+        )
+
+    def update_risk_scores(self, scores):
+        if not os.path.exists(self.file_path):
+            return 0
+        updated = set()
+        def update(person):
+            name = person.get('name')
+            if name not in scores:
+                return None
+            updated.add(name)
+            return dict(person, risk_score=scores[name])
+        self._rewrite(update)
+        return len(updated)
+
+    def update_holdings(self, holdings):
+        if not os.path.exists(self.file_path):
+            return 0
+        updated = set()
+        def update(person):
+            name = person.get('name')
+            if name not in holdings:
+                return None
+            updated.add(name)
+            principal, amounts = holdings[name]
+            return dict(person, principal=principal, current_portfolio_amount=amounts)
+        self._rewrite(update)
+        return len(updated)
+
+    def save_people(self, people):
+        with open(self.file_path, 'w', encoding='utf-8') as out:
+            for person in people:
+                out.write(json.dumps(person, ensure_ascii=False) + "\n")
+
+class SqliteStorage:
+    """
+    Kişileri, hedef ağırlıkları ve varlık tutarlarını ayrı tablolarda tutan SQLite
+    depolama. Tek kişilik okuma ve güncellemeler yalnızca o kişinin satırlarına
+    dokunur; toplu içe aktarma tek bir işlemde yapılır.
+
+    Her iş parçacığı kendi bağlantısını kullanır (ör. api_server'ın işçi havuzu).
+    """
+
+    def __init__(self, db_path=PEOPLE_DB_FILE):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+        self.conn.executescript(SCHEMA)
+
+    @property
+    def conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Bağlantı yalnızca açan iş parçacığında kullanılır; close() başka iş parçacığından çağrılabilir
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA foreign_keys = ON")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def close(self):
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections = []
+        self._local = threading.local()
+
+    def _person_from_row(self, row):
+        person_id, name, risk_score, principal, extra = row
+        person = {'name': name, 'risk_score': risk_score, 'principal': principal}
+        person['target_portfolio'] = dict(self.conn.execute(
+            "SELECT asset, weight FROM target_weights WHERE person_id = ? ORDER BY position",
+            (person_id,)
+        ).fetchall())
+        person['current_portfolio_amount'] = dict(self.conn.execute(
+            "SELECT asset, amount FROM holdings WHERE person_id = ? ORDER BY position",
+            (person_id,)
+        ).fetchall())
+        if extra:
+            person.update(json.loads(extra))
+        return person
+
+    def load_people(self):
+        rows = self.conn.execute(
+            "SELECT id, name, risk_score, principal, extra FROM people ORDER BY id"
+        ).fetchall()
+        people = {}
+        for person_id, name, risk_score, principal, extra in rows:
+            person = {'name': name, 'risk_score': risk_score, 'principal': principal,
+                      'target_portfolio': {}, 'current_portfolio_amount': {}}
+            if extra:
+                person.update(json.loads(extra))
+            people[person_id] = person
+
+        for table, key, column in (("target_weights", 'target_portfolio', "weight"),
+                                   ("holdings", 'current_portfolio_amount', "amount")):
+            query = f"SELECT person_id, asset, {column} FROM {table} ORDER BY person_id, position"
+            for person_id, asset, value in self.conn.execute(query):
+                people[person_id][key][asset] = value
+        return list(people.values())
+
+    def iter_people(self):
+        cursor = self.conn.execute(
+            "SELECT id, name, risk_score, principal, extra FROM people ORDER BY id"
+        )
+        return (self._person_from_row(row) for row in cursor)
+
+    def get_person(self, name):
+        row = self.conn.execute(
+            "SELECT id, name, risk_score, principal, extra FROM people WHERE name = ?",
+            (name,)
+        ).fetchone()
+        return self._person_from_row(row) if row else None
+
+    def _write_person(self, person):
+        extra = {k: v for k, v in person.items() if k not in _PERSON_COLUMNS}
+        self.conn.execute(
+            "INSERT INTO people (name, risk_score, principal, extra) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET risk_score = excluded.risk_score, "
+            "principal = excluded.principal, extra = excluded.extra",
+            (person.get('name'), person.get('risk_score'), person.get('principal'),
+             json.dumps(extra, ensure_ascii=False) if extra else None)
+        )
+        person_id = self.conn.execute(
+            "SELECT id FROM people WHERE name = ?", (person.get('name'),)
+        ).fetchone()[0]
+
+        for table, key, column in (("target_weights", 'target_portfolio', "weight"),
+                                   ("holdings", 'current_portfolio_amount', "amount")):
+            self.conn.execute(f"DELETE FROM {table} WHERE person_id = ?", (person_id,))
+            self.conn.executemany(
+                f"INSERT INTO {table} (person_id, position, asset, {column}) VALUES (?, ?, ?, ?)",
+                [(person_id, i, asset, value)
+                 for i, (asset, value) in enumerate((person.get(key) or {}).items())]
+            )
+
+    def save_person(self, person):
+        with self.conn:
+            self._write_person(person)
+
+    def update_risk_score(self, name, risk_score):
+        with self.conn:
+            cursor = self.conn.execute(
+                "UPDATE people SET risk_score = ? WHERE name = ?", (risk_score, name)
+            )
+        return cursor.rowcount > 0
+
+    def update_risk_scores(self, scores):
+        updated = 0
+        with self.conn:
+            for name, score in scores.items():
+                # Aynı adlı birden çok satır tek kişi olarak sayılır
+                if self.conn.execute("UPDATE people SET risk_score = ? WHERE name = ?", (score, name)).rowcount:
+                    updated += 1
+        return updated
+
+    def update_holdings(self, holdings):
+        updated = 0
+        with self.conn:
+            for name, (principal, amounts) in holdings.items():
+                row = self.conn.execute("SELECT id FROM people WHERE name = ?", (name,)).fetchone()
+                if row is None:
+                    continue
+                self.conn.execute("UPDATE people SET principal = ? WHERE id = ?", (principal, row[0]))
+                self.conn.execute("DELETE FROM holdings WHERE person_id = ?", (row[0],))
+                self.conn.executemany(
+                    "INSERT INTO holdings (person_id, position, asset, amount) VALUES (?, ?, ?, ?)",
+                    [(row[0], i, asset, amount) for i, (asset, amount) in enumerate(amounts.items())]
+                )
+                updated += 1
+        return updated
+
+    def save_people(self, people):
+        with self.conn:
+            for person in people:
+                self._write_person(person)
+
+def get_storage(backend=None):
+    """
+    Verilen veya PORTFOLIO_STORAGE ortam değişkeninde belirtilen depolamayı döndürür.
+    """
+    backend = backend or os.environ.get(STORAGE_ENV, "json")
+    if backend == "sqlite":
+        return SqliteStorage()
+    if backend == "jsonl":
+        return JsonlStorage()
+    return JsonStorage()
+
+def import_json(json_path=PEOPLE_FILE, db_path=PEOPLE_DB_FILE):
+    """
+    people.json içeriğini tek bir işlemde SQLite veritabanına aktarır.
+    """
+    people = JsonStorage(json_path).load_people()
+    if people is None:
+        return None
+    names = [person.get('name') for person in people]
+    if len(set(names)) != len(names):
+        print("UYARI: Aynı ada sahip kişiler var; veritabanında her addan son kayıt tutulur.")
+    storage = SqliteStorage(db_path)
+    storage.save_people(people)
+    storage.close()
+    return len(people)
+
+def export_json(db_path=PEOPLE_DB_FILE, json_path=PEOPLE_FILE):
+    """
+    SQLite veritabanındaki kişileri people.json düzeninde dışa aktarır.
+    """
+    storage = SqliteStorage(db_path)
+    people = storage.load_people()
+    storage.close()
+    JsonStorage(json_path).save_people(people)
+    return len(people)
+
+def json_to_jsonl(json_path=PEOPLE_FILE, jsonl_path=PEOPLE_JSONL_FILE):
+    """
+    people.json dizisini her satırda bir kişi olacak şekilde people.jsonl'e çevirir.
+    """
+    people = JsonStorage(json_path).load_people()
+    if people is None:
+        return None
+    JsonlStorage(jsonl_path).save_people(people)
+    return len(people)
+
+def jsonl_to_json(jsonl_path=PEOPLE_JSONL_FILE, json_path=PEOPLE_FILE):
+    """
+    people.jsonl dosyasını people.json düzenine çevirir. Kişiler tek tek yazıldığı
+    için dönüşüm sırasında tüm liste bellekte tutulmaz.
+    """
+    people = JsonlStorage(jsonl_path).iter_people()
+    if people is None:
+        return None
+    count = 0
+    with open(json_path, 'w', encoding='utf-8') as out:
+        out.write("[")
+        for person in people:
+            text = json.dumps(person, ensure_ascii=False, indent=4)
+            out.write(("," if count else "") + "\n    " + text.replace("\n", "\n    "))
+            count += 1
+        out.write("\n]" if count else "]")
+    invalidate(json_path)
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="people.json, people.jsonl ve SQLite veritabanı arasında veri aktarır.")
+    parser.add_argument("command", choices=("import", "export", "to-jsonl", "from-jsonl"))
+    parser.add_argument("--json", default=PEOPLE_FILE, help="people.json dosya yolu")
+    parser.add_argument("--jsonl", default=PEOPLE_JSONL_FILE, help="people.jsonl dosya yolu")
+    parser.add_argument("--db", default=PEOPLE_DB_FILE, help="SQLite veritabanı dosya yolu")
+    args = parser.parse_args()
+
+    if args.command == "import":
+        count = import_json(args.json, args.db)
+        if count is None:
+            sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+        print(f"{count} kişi '{args.db}' veritabanına aktarıldı.")
+    elif args.command == "export":
+        count = export_json(args.db, args.json)
+        print(f"{count} kişi '{args.json}' dosyasına aktarıldı.")
+    elif args.command == "to-jsonl":
+        count = json_to_jsonl(args.json, args.jsonl)
+        if count is None:
+            sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+        print(f"{count} kişi '{args.jsonl}' dosyasına aktarıldı.")
+    else:
+        count = jsonl_to_json(args.jsonl, args.json)
+        if count is None:
+            sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+        print(f"{count} kişi '{args.json}' dosyasına aktarıldı.")
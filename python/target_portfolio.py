@@ -5,16 +5,18 @@ from us_sector_calculator import (
     load_sector_config, 
     validate_sector_percentages,
     calculate_us_sector_allocation,
-    display_us_sector_allocation
+    build_us_sector_report
 )
+from portfolio_engine import get_asset_table, normalize_people, portfolio_risk, portfolio_return
+from storage import get_storage
+from report_renderer import make_report, make_section, get_section, register_text_template, emit
+from profiler import configure as configure_profiler, stage
 
 # For target portfolio calculations, ratios are taken directly from people.json for each person.
 # It is easier to edit the ratios in the JSON file than to enter them one by one here.
 
 # File paths
-ASSET_FILE = "../data/asset_info.json"
-PEOPLE_FILE = "../data/people.json"
-CURRENCY_FILE = "../data/currency.json"
+from data_store import load_json, ASSET_FILE
 
 
 def load_file(file_path):
@@ -23,8 +25,7 @@ def load_file(file_path):
     Returns None if file is missing or invalid.
     """
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json(file_path)
     except FileNotFoundError:
         print(f"Error: '{file_path}' not found. Please create the file first.")
         return None
@@ -32,15 +33,6 @@ def load_file(file_path):
         print(f"Error: '{file_path}' is not a valid JSON file.")
         return None
 
-def get_usd_rate():
-    """
-    currency.json dosyasından USD/TRY kurunu okur.
-    """
-    currency_data = load_file(CURRENCY_FILE)
-    if isinstance(currency_data, dict) and 'USD_TRY' in currency_data:
-        return currency_data['USD_TRY']
-    return 34.0  # Varsayılan kur
-
 def validate_portfolio_percentages(portfolio_dict):
     """
     Checks if the sum of percentages in the given portfolio dict is 1.0 (100%).
@@ -58,115 +50,126 @@ def calculate_portfolio_risk(target_portfolio, asset_info):
     Calculates the total risk of the portfolio based on asset risk scores.
     Returns the weighted average risk score.
     """
-    total_risk_score = 0
-    for asset, percent in target_portfolio.items():
-        if asset in asset_info:
-            risk_score = asset_info[asset].get('risk_score', asset_info[asset].get('risk_puani', 0))
-            total_risk_score += percent * risk_score
-        else:
+    for asset in target_portfolio:
+        if asset not in asset_info:
             print(f"WARNING: Asset '{asset}' not found in '{ASSET_FILE}'. Not included in risk calculation.")
-    return total_risk_score
+    return portfolio_risk(target_portfolio, get_asset_table(asset_info))
 
 def calculate_portfolio_return(portfolio_distribution, asset_info, scenario='base'):
     """
     Varlık getirileri ve kur artışına göre portföyün toplam beklenen getirisini hesaplar.
     Kur artışı beklentisini "USD TRY Based" varlığından alır.
     """
-    if not portfolio_distribution: return 0
-    
-    scenario_keys = {
-        "base": "expected_percentage_return",
-        "good": "good_scenario_return",
-        "bad": "bad_scenario_return"
-    }
-    key = scenario_keys.get(scenario, "expected_percentage_return")
-    
-    total_return_percent = 0
-    
-    # --- DEĞİŞİKLİK BURADA ---
-    # Kur artışı beklentisi artık "USD TRY Based" varlığından alınıyor.
-    usd_try_return_expectation = asset_info.get("USD TRY Based", {}).get(key, 0)
-    
-    for asset, percent in portfolio_distribution.items():
-        if asset in asset_info:
-            # "USD TRY Based" varlığının kendisi, zaten kur artışını temsil ettiği için
-            # ayrıca bir birleştirme işlemine tabi tutulmaz.
-            if asset == "USD TRY Based":
-                total_return_percent += percent * usd_try_return_expectation
-                continue
-
-            asset_return = asset_info[asset].get(key, 0)
-            is_usd_based = asset_info[asset].get('is_usd_based', False)
-            
-            if is_usd_based:
-                # Dolar bazlı diğer varlıkların getirisi, kur artışıyla birleştirilir.
-                combined_return = (1 + asset_return) * (1 + usd_try_return_expectation) - 1
-                total_return_percent += percent * combined_return
-            else:
-                # TL bazlı varlıkların getirisi doğrudan eklenir.
-                total_return_percent += percent * asset_return
-                
-    return total_return_percent
+    return portfolio_return(portfolio_distribution, get_asset_table(asset_info), scenario)
 
-def show_distribution_and_report(name, principal, target_portfolio, asset_info):
+def build_distribution_report(name, principal, target_portfolio, asset_info):
     """
-    Calculates and prints the investment distribution, risk, and return based on the given info.
+    Builds the target investment distribution, risk and return as a report document.
+    """
+    rows = [
+        {
+            'asset': asset,
+            'amount': principal * percent,
+            'percent': percent,
+            'risk_score': asset_info.get(asset, {}).get('risk_score', 'Unknown'),
+            'expected_return': asset_info.get(asset, {}).get('expected_return_description', 'Unknown')
+        }
+        for asset, percent in target_portfolio.items()
+    ]
+    columns = [
+        ('asset', 'Asset'),
+        ('amount', 'Amount (TL)'),
+        ('percent', 'Weight'),
+        ('risk_score', 'Risk'),
+        ('expected_return', 'Return')
+    ]
+    return make_report("distribution", f"Person: {name}", {
+        'name': name,
+        'principal': principal,
+        'risk': calculate_portfolio_risk(target_portfolio, asset_info),
+        'expected_return': calculate_portfolio_return(target_portfolio, asset_info)
+    }, [make_section('distribution', 'Target Investment Distribution', columns, rows)])
+
+def format_distribution_text(report):
+    fields = report['fields']
+    lines = [
+        "",
+        "=" * 50,
+        f"Person: {fields['name']}",
+        f"Principal: {fields['principal']:,.2f} TL",
+        "--- Target Investment Distribution ---"
+    ]
+    for row in get_section(report, 'distribution')['rows']:
+        lines.append(f"{row['asset']:<20}: {row['amount']:>15,.2f} TL (%{row['percent']*100:.0f})")
+        lines.append(f"{' ':<20} Risk: {row['risk_score']:<2} / 10 | Return: {row['expected_return']}")
+    lines += [
+        "-" * 50,
+        f"Weighted Average Portfolio Risk: {fields['risk']:.2f} / 10",
+        f"Annual (TL Based) Portfolio Return Expectation: %{fields['expected_return'] * 100:.2f}",
+        "=" * 50
+    ]
+    return lines
+
+register_text_template("distribution", format_distribution_text)
+
+def build_target_reports(name, principal, target_portfolio, asset_info):
+    """
+    Returns the distribution report followed by the US sector allocation report
+    (when the target has a Foreign Stocks weight).
     """
-    print("\n" + "="*50)
-    print(f"Person: {name}")
-    print(f"Principal: {principal:,.2f} TL")
-    print("--- Target Investment Distribution ---")
-
-    for asset, percent in target_portfolio.items():
-        required_amount = principal * percent
-        risk_score = asset_info.get(asset, {}).get('risk_score', 'Unknown')
-        expected_return = asset_info.get(asset, {}).get('expected_return_description', 'Unknown')
-        print(f"{asset:<20}: {required_amount:>15,.2f} TL (%{percent*100:.0f})")
-        print(f"{' ':<20} Risk: {risk_score:<2} / 10 | Return: {expected_return}")
-
-    total_portfolio_risk = calculate_portfolio_risk(target_portfolio, asset_info)
-    total_portfolio_return = calculate_portfolio_return(target_portfolio, asset_info)
-    print("-" * 50)
-    print(f"Weighted Average Portfolio Risk: {total_portfolio_risk:.2f} / 10")
-    print(f"Annual (TL Based) Portfolio Return Expectation: %{total_portfolio_return * 100:.2f}")
-    print("="*50)
-    
-    # Amerika sektörel dağılımını göster (Foreign Stocks oranına göre)
+    reports = [build_distribution_report(name, principal, target_portfolio, asset_info)]
     foreign_stocks_allocation = target_portfolio.get("Foreign Stocks", 0)
     if foreign_stocks_allocation > 0:
-        sector_config = load_sector_config()
-        if sector_config and validate_sector_percentages(sector_config):
-            sector_allocation = calculate_us_sector_allocation(principal, foreign_stocks_allocation, sector_config)
-            display_us_sector_allocation(name, principal, foreign_stocks_allocation, sector_allocation)
+        with stage("sector_allocation"):
+            sector_config = load_sector_config()
+            if sector_config and validate_sector_percentages(sector_config):
+                sector_allocation = calculate_us_sector_allocation(principal, foreign_stocks_allocation, sector_config)
+                reports.append(build_us_sector_report(name, principal, foreign_stocks_allocation, sector_allocation))
+    return reports
+
+def show_distribution_and_report(name, principal, target_portfolio, asset_info):
+    """
+    Calculates and prints the investment distribution, risk, and return based on the given info.
+    """
+    emit(build_target_reports(name, principal, target_portfolio, asset_info))
 
 # --- Main Program ---
 if __name__ == "__main__":
-    people = load_file(PEOPLE_FILE)
-    asset_info = load_file(ASSET_FILE)
+    configure_profiler()
+    with stage("load"):
+        people = get_storage().load_people()
+        asset_info = load_file(ASSET_FILE)
     if people is None or asset_info is None:
         sys.exit()
-
-    print("Please select the person whose portfolio you want to view:")
-    for i, person in enumerate(people):
-        print(f"{i + 1}: {person['name']}")
-
-    while True:
-        try:
-            selection_str = input("\nYour selection (number): ")
-            selection = int(selection_str)
-            if 1 <= selection <= len(people):
-                selected_person = people[selection - 1]
-                break
-            else:
-                print("Please enter a valid number from the list.")
-        except ValueError:
-            print("Invalid input. Please enter a number.")
+    with stage("normalize"):
+        normalize_people(people, asset_info)
+
+    with stage("select"):
+        print("Please select the person whose portfolio you want to view:")
+        for i, person in enumerate(people):
+            print(f"{i + 1}: {person['name']}")
+
+        while True:
+            try:
+                selection_str = input("\nYour selection (number): ")
+                selection = int(selection_str)
+                if 1 <= selection <= len(people):
+                    selected_person = people[selection - 1]
+                    break
+                else:
+                    print("Please enter a valid number from the list.")
+            except ValueError:
+                print("Invalid input. Please enter a number.")
 
     person_name = selected_person['name']
     person_principal = selected_person['principal']
     person_target_portfolio = selected_person['target_portfolio']
 
     if validate_portfolio_percentages(person_target_portfolio):
-        show_distribution_and_report(person_name, person_principal, person_target_portfolio, asset_info)
+        # Valuation and sector allocation are timed separately from console output
+        with stage("valuation", person=person_name, hot=True):
+            reports = build_target_reports(person_name, person_principal, person_target_portfolio, asset_info)
+        with stage("render", person=person_name):
+            emit(reports)
     else:
-        print(f"\nPortfolio configuration for {person_name} is invalid. No operation performed.")
\ No newline at end of file
+        print(f"\nPortfolio configuration for {person_name} is invalid. No operation performed.")
@@ -6,8 +6,9 @@ Amerika hisse senetleri için sektörel dağılım hesaplama modülü
 import json
 import sys
 
-SECTOR_CONFIG_FILE = "../data/us_sector_config.json"
-CURRENCY_FILE = "../data/currency.json"
+from data_store import load_json, get_usd_rate, SECTOR_CONFIG_FILE
+from report_renderer import make_report, make_section, get_section, register_text_template, emit
+from profiler import configure as configure_profiler, stage
 
 def load_sector_config():
     """
@@ -16,8 +17,7 @@ def load_sector_config():
         dict: Sektör bilgilerini içeren dictionary veya None
     """
     try:
-        with open(SECTOR_CONFIG_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_json(SECTOR_CONFIG_FILE)
     except FileNotFoundError:
         print(f"Hata: '{SECTOR_CONFIG_FILE}' bulunamadı.")
         return None
@@ -25,19 +25,6 @@ def load_sector_config():
         print(f"Hata: '{SECTOR_CONFIG_FILE}' geçerli bir JSON dosyası değil.")
         return None
 
-def get_usd_rate():
-    """
-    currency.json dosyasından USD/TRY kurunu okur.
-    """
-    try:
-        with open(CURRENCY_FILE, 'r', encoding='utf-8') as f:
-            currency_data = json.load(f)
-            if isinstance(currency_data, dict) and 'USD_TRY' in currency_data:
-                return currency_data['USD_TRY']
-    except:
-        pass
-    return 34.0  # Varsayılan kur
-
 def validate_sector_percentages(sector_config):
     """
     Sektör yüzdelerinin toplamının %100 olup olmadığını kontrol eder.
@@ -90,42 +77,106 @@ def calculate_us_sector_allocation(principal, foreign_stocks_allocation, sector_
     
     return sector_allocation
 
-def display_us_sector_allocation(name, principal, foreign_stocks_allocation, sector_allocation):
+def build_us_sector_report(name, principal, foreign_stocks_allocation, sector_allocation, kind="us_sector"):
     """
-    Amerika sektörel dağılımını ekrana yazdırır (USD bazlı).
-    
+    Amerika sektörel dağılımını (USD bazlı) rapor belgesi olarak hazırlar.
+
     Args:
         name: Kişi adı
         principal: Toplam anapara (TL)
         foreign_stocks_allocation: Amerika'ya ayrılan yüzde
         sector_allocation: Sektörel dağılım dictionary'si
+        kind: "us_sector" (ayrıntılı) veya "us_sector_summary" (tablo) metin şablonu
+
+    Returns:
+        dict: report_renderer rapor belgesi
     """
     usd_rate = get_usd_rate()
     us_total_tl = principal * foreign_stocks_allocation
-    us_total_usd = us_total_tl / usd_rate
-    
-    print("\n" + "="*70)
-    print(f"AMERİKA SEKTÖREL DAĞILIM - {name}")
-    print("="*70)
-    print(f"Toplam Portföy: {principal:,.2f} TL (${principal/usd_rate:,.2f})")
-    print(f"Amerika Yatırımı: ${us_total_usd:,.2f} USD (%{foreign_stocks_allocation*100:.0f})")
-    print(f"               = {us_total_tl:,.2f} TL (Kur: {usd_rate:.2f})")
-    print("-"*70)
-    
-    for sector_name, sector_data in sector_allocation.items():
-        amount_tl = sector_data['amount']
-        amount_usd = amount_tl / usd_rate
-        pct_of_us = sector_data['percentage_of_us']
-        pct_of_total = sector_data['percentage_of_total']
-        description = sector_data['description']
-        
-        print(f"\n{sector_name}:")
-        print(f"  Miktar: ${amount_usd:>15,.2f} USD ({amount_tl:,.2f} TL)")
-        print(f"  ABD içinde: %{pct_of_us*100:.0f}")
-        print(f"  Toplam portföyde: %{pct_of_total*100:.1f}")
-        print(f"  {description}")
+    rows = [
+        {
+            'sector': sector_name,
+            'amount_usd': sector_data['amount'] / usd_rate,
+            'amount_tl': sector_data['amount'],
+            'percentage_of_us': sector_data['percentage_of_us'],
+            'percentage_of_total': sector_data['percentage_of_total'],
+            'description': sector_data['description']
+        }
+        for sector_name, sector_data in sector_allocation.items()
+    ]
+    columns = [
+        ('sector', 'Sektör'),
+        ('amount_usd', 'Miktar (USD)'),
+        ('amount_tl', 'Miktar (TL)'),
+        ('percentage_of_us', 'ABD İçinde'),
+        ('percentage_of_total', 'Toplam Portföyde'),
+        ('description', 'Açıklama')
+    ]
+    return make_report(kind, f"AMERİKA SEKTÖREL DAĞILIM - {name}", {
+        'name': name,
+        'principal': principal,
+        'usd_rate': usd_rate,
+        'foreign_stocks_allocation': foreign_stocks_allocation,
+        'us_total_tl': us_total_tl,
+        'us_total_usd': us_total_tl / usd_rate
+    }, [make_section('sectors', 'Sektörel Dağılım', columns, rows)])
+
+def _us_sector_header(fields, invested_label, indent):
+    usd_rate = fields['usd_rate']
+    return [
+        f"Toplam Portföy: {fields['principal']:,.2f} TL (${fields['principal']/usd_rate:,.2f})",
+        f"{invested_label}: ${fields['us_total_usd']:,.2f} USD (%{fields['foreign_stocks_allocation']*100:.0f})",
+        f"{' ' * indent}= {fields['us_total_tl']:,.2f} TL (Kur: {usd_rate:.2f})"
+    ]
+
+def format_us_sector_text(report):
+    fields = report['fields']
+    lines = ["", "=" * 70, f"AMERİKA SEKTÖREL DAĞILIM - {fields['name']}", "=" * 70]
+    lines += _us_sector_header(fields, "Amerika Yatırımı", 15)
+    lines.append("-" * 70)
+    for row in get_section(report, 'sectors')['rows']:
+        lines += [
+            "",
+            f"{row['sector']}:",
+            f"  Miktar: ${row['amount_usd']:>15,.2f} USD ({row['amount_tl']:,.2f} TL)",
+            f"  ABD içinde: %{row['percentage_of_us']*100:.0f}",
+            f"  Toplam portföyde: %{row['percentage_of_total']*100:.1f}",
+            f"  {row['description']}"
+        ]
+    lines.append("=" * 70)
+    return lines
+
+def format_us_sector_summary_text(report):
+    fields = report['fields']
+    lines = ["", "=" * 70, f"AMERİKA SEKTÖREL DAĞILIM ANALİZİ - {fields['name']}", "=" * 70]
+    lines += _us_sector_header(fields, "Amerika'ya Ayrılan", 17)
+    lines += _sector_table_lines(get_section(report, 'sectors')['rows'])
+    lines.append("=" * 70)
+    return lines
+
+def _sector_table_lines(rows):
+    if not rows:
+        return ["Sektörel dağılım bulunamadı."]
+    lines = ["", "-"*75, "SEKTÖR                | MİKTAR (USD)   | MİKTAR (TL)    | ABD İÇİNDE", "-"*75]
+    for row in rows:
+        lines.append(f"{row['sector']:<20} | ${row['amount_usd']:>12,.2f} | {row['amount_tl']:>13,.2f} | %{row['percentage_of_us']*100:>5.0f}")
+    lines.append("-"*75)
+    return lines
+
+register_text_template("us_sector", format_us_sector_text)
+register_text_template("us_sector_summary", format_us_sector_summary_text)
+
+def display_us_sector_allocation(name, principal, foreign_stocks_allocation, sector_allocation):
+    """
+    Amerika sektörel dağılımını ekrana yazdırır (USD bazlı).
     
-    print("="*70)
+    Args:
+        name: Kişi adı
+        principal: Toplam anapara (TL)
+        foreign_stocks_allocation: Amerika'ya ayrılan yüzde
+        sector_allocation: Sektörel dağılım dictionary'si
+    """
+    emit([build_us_sector_report(name, principal, foreign_stocks_allocation, sector_allocation)])
 
 def get_sector_summary_table(sector_allocation):
     """
@@ -141,20 +192,12 @@ def get_sector_summary_table(sector_allocation):
         return "Sektörel dağılım bulunamadı."
     
     usd_rate = get_usd_rate()
-    
-    lines = []
-    lines.append("\n" + "-"*75)
-    lines.append("SEKTÖR                | MİKTAR (USD)   | MİKTAR (TL)    | ABD İÇİNDE")
-    lines.append("-"*75)
-    
-    for sector_name, sector_data in sector_allocation.items():
-        amount_tl = sector_data['amount']
-        amount_usd = amount_tl / usd_rate
-        pct_of_us = sector_data['percentage_of_us']
-        lines.append(f"{sector_name:<20} | ${amount_usd:>12,.2f} | {amount_tl:>13,.2f} | %{pct_of_us*100:>5.0f}")
-    
-    lines.append("-"*75)
-    
+    rows = [
+        {'sector': sector_name, 'amount_usd': data['amount'] / usd_rate,
+         'amount_tl': data['amount'], 'percentage_of_us': data['percentage_of_us']}
+        for sector_name, data in sector_allocation.items()
+    ]
+    lines = _sector_table_lines(rows)
     return "\n".join(lines)
 
 # Test fonksiyonu
@@ -162,7 +205,8 @@ def test_sector_calculator():
     """
     Modülü test eder - örnek hesaplama yapar
     """
-    sector_config = load_sector_config()
+    with stage("load"):
+        sector_config = load_sector_config()
     if not sector_config:
         print("Sektör konfigürasyonu yüklenemedi.")
         return
@@ -172,11 +216,16 @@ def test_sector_calculator():
         return
     
     # Örnek hesaplama
+    test_name = "Test Kullanıcı"
     test_principal = 200000  # 200 bin TL
     test_us_percent = 0.5     # %50 Amerika
     
-    allocation = calculate_us_sector_allocation(test_principal, test_us_percent, sector_config)
-    display_us_sector_allocation("Test Kullanıcı", test_principal, test_us_percent, allocation)
+    with stage("sector_allocation", person=test_name, hot=True):
+        allocation = calculate_us_sector_allocation(test_principal, test_us_percent, sector_config)
+        report = build_us_sector_report(test_name, test_principal, test_us_percent, allocation)
+    with stage("render", person=test_name):
+        emit([report])
 
 if __name__ == "__main__":
+    configure_profiler()
     test_sector_calculator()
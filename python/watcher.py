@@ -0,0 +1,288 @@
+"""
+Portfolio Watcher
+data/ klasöründeki dosyaları izleyen ve yalnızca değişikliğin etkilediği sonuçları
+yeniden hesaplayan uzun süre çalışan süreç.
+
+Ayrıştırılmış veriler ve kişi başına dashboard sonuçları (bundle) bellekte tutulur.
+Dosyalar belirli aralıklarla (varsayılan: 1 sn) değişiklik zamanı ve boyutuna göre
+kontrol edilir ve değişikliğin etkisi şöyle belirlenir:
+
+    asset_info.json            tüm kişiler yeniden hesaplanır
+    projection_config.json     tüm kişiler yeniden hesaplanır
+    currency.json/fx_rates     yalnızca USD bazlı değerler (Amerika sektör dağılımı)
+    us_sector_config.json      yalnızca Amerika sektör dağılımı
+    kişi dosyası               yalnızca verisi değişen, eklenen veya silinen kişiler
+
+Güncellenen sonuçlar dashboard_bundle.py ile aynı biçimde web/bundle/ altına yazılır
+ve her değişikliğin yeniden hesaplama süresi kaydedilir.
+
+Kullanım:
+    python watcher.py
+    python watcher.py --interval 0.5 --output ../web/bundle
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from dashboard_bundle import (
+    BUNDLE_DIR,
+    PEOPLE_DIR_NAME,
+    build_bundles,
+    bundle_file_name,
+    input_hash,
+    load_index,
+    shared_input_hash,
+    us_sector_block,
+    write_bundle,
+    write_index
+)
+from data_store import (
+    load_json,
+    get_usd_rate,
+    ASSET_FILE,
+    CURRENCY_FILE,
+    FX_RATES_FILE,
+    PROJECTION_CONFIG_FILE,
+    SECTOR_CONFIG_FILE
+)
+from portfolio_engine import normalize_people
+from storage import get_storage
+
+DEFAULT_INTERVAL = 1.0
+
+def file_signature(path):
+    try:
+        stat = os.stat(path)
+    except (OSError, TypeError):
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def log(message):
+    print(f"[{time.strftime('%H:%M:%S')}] {message}", flush=True)
+
+class PortfolioWatcher:
+    """
+    Kişileri, ortak varsayımları ve hesaplanmış bundle'ları bellekte tutar;
+    değişen dosyaya göre yalnızca etkilenen sonuçları yeniden üretir.
+    """
+
+    def __init__(self, storage, bundle_dir=BUNDLE_DIR):
+        self.storage = storage
+        self.bundle_dir = bundle_dir
+        self.people_dir = os.path.join(bundle_dir, PEOPLE_DIR_NAME)
+        people_file = getattr(storage, 'file_path', None) or getattr(storage, 'db_path', None)
+        self.files = {
+            'people': [people_file],
+            'assets': [ASSET_FILE],
+            'fx': [CURRENCY_FILE, FX_RATES_FILE],
+            'sectors': [SECTOR_CONFIG_FILE],
+            'projection': [PROJECTION_CONFIG_FILE]
+        }
+        self.signatures = {}
+        self.people = {}
+        self.hashes = {}
+        self.bundles = {}
+        self.asset_info = None
+        self.sector_config = None
+        self.usd_rate = None
+
+    def _signatures(self, group):
+        return tuple(file_signature(path) for path in self.files[group])
+
+    def changed_groups(self):
+        """
+        Son kontrolden beri değişen dosya gruplarını döndürür.
+        """
+        changed = []
+        for group in self.files:
+            signature = self._signatures(group)
+            if signature != self.signatures.get(group):
+                self.signatures[group] = signature
+                changed.append(group)
+        return changed
+
+    def _load_people(self):
+        people = self.storage.load_people()
+        if people is None:
+            return None
+        normalize_people(people, self.asset_info, report=False)
+        return {person.get('name', ''): person for person in people}
+
+    def _load_shared(self):
+        try:
+            asset_info = load_json(ASSET_FILE)
+            sector_config = load_json(SECTOR_CONFIG_FILE)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            log(f"Hata: Veri dosyası okunamadı ({e}).")
+            return False
+        if asset_info is None:
+            return False
+        self.asset_info = asset_info
+        self.sector_config = sector_config
+        self.usd_rate = get_usd_rate()
+        return True
+
+    @property
+    def sectors(self):
+        return (self.sector_config or {}).get('sectors', {})
+
+    def _recompute(self, names):
+        """
+        Verilen kişilerin bundle'larını yeniden hesaplar ve yazar.
+        """
+        people = [self.people[name] for name in names]
+        for name, bundle in zip(names, build_bundles(people, self.asset_info, self.sector_config, self.usd_rate)):
+            self.bundles[name] = bundle
+            self.hashes[name] = input_hash(self.people[name])
+            write_bundle(self.people_dir, bundle_file_name(name), bundle)
+
+    def _refresh_us_sector(self):
+        """
+        Kur veya sektör konfigürasyonu değiştiğinde yalnızca Amerika'ya tutar
+        ayıran kişilerin sektör bölümünü yeniden hesaplar.
+        """
+        updated = 0
+        for name, bundle in self.bundles.items():
+            percent = bundle['target']['percents'].get("Foreign Stocks", 0)
+            us_sector = us_sector_block(bundle['principal'], percent, self.sectors, self.usd_rate)
+            if us_sector is None and bundle['us_sector'] is None:
+                continue
+            bundle['us_sector'] = us_sector
+            write_bundle(self.people_dir, bundle_file_name(name), bundle)
+            updated += 1
+        return updated
+
+    def _write_index(self):
+        entries = [
+            {'name': name, 'file': bundle_file_name(name), 'hash': self.hashes[name]}
+            for name in self.people
+        ]
+        write_index(self.bundle_dir, shared_input_hash(self.asset_info, self.sector_config, self.usd_rate), entries)
+
+    def _remove(self, names):
+        for name in names:
+            self.bundles.pop(name, None)
+            self.hashes.pop(name, None)
+            try:
+                os.remove(os.path.join(self.people_dir, bundle_file_name(name)))
+            except FileNotFoundError:
+                pass
+
+    def start(self):
+        """
+        Tüm veriyi yükler ve bundle'ları hesaplar. Mevcut index.json ile aynı
+        girdilere sahip kişilerin dosyaları yeniden yazılmaz.
+        """
+        started = time.perf_counter()
+        self.changed_groups()
+        os.makedirs(self.people_dir, exist_ok=True)
+        if not self._load_shared():
+            return False
+        people = self._load_people()
+        if people is None:
+            return False
+        self.people = people
+
+        names = list(people)
+        bundles = build_bundles([people[name] for name in names], self.asset_info, self.sector_config, self.usd_rate)
+        previous = load_index(self.bundle_dir) or {}
+        shared_hash = shared_input_hash(self.asset_info, self.sector_config, self.usd_rate)
+        previous_hashes = {}
+        if previous.get('shared_hash') == shared_hash:
+            previous_hashes = {entry['file']: entry['hash'] for entry in previous.get('people', [])}
+
+        written = 0
+        for name, bundle in zip(names, bundles):
+            file_name = bundle_file_name(name)
+            self.bundles[name] = bundle
+            self.hashes[name] = input_hash(people[name])
+            if previous_hashes.get(file_name) != self.hashes[name] or \
+                    not os.path.exists(os.path.join(self.people_dir, file_name)):
+                write_bundle(self.people_dir, file_name, bundle)
+                written += 1
+
+        current_files = {bundle_file_name(name) for name in names}
+        for file_name in os.listdir(self.people_dir):
+            if file_name.endswith(".json") and file_name not in current_files:
+                os.remove(os.path.join(self.people_dir, file_name))
+        self._write_index()
+        elapsed = (time.perf_counter() - started) * 1000
+        log(f"Başlangıç: {len(names)} kişi hesaplandı, {written} dosya yazıldı ({elapsed:.1f} ms)")
+        return True
+
+    def apply(self, groups):
+        """
+        Değişen dosya gruplarının etkilediği sonuçları yeniden hesaplar.
+
+        Returns:
+            dict: Değişiklik özeti ('reason', 'recomputed', 'removed', 'ms') veya None
+        """
+        started = time.perf_counter()
+        old_rate, old_sector_config = self.usd_rate, self.sector_config
+        if not self._load_shared():
+            return None
+        recomputed = 0
+        removed = 0
+
+        if 'assets' in groups or 'projection' in groups:
+            # Risk puanları, senaryo getirileri veya projeksiyon varsayımları tüm kişiler için değişir
+            people = self._load_people()
+            if people is None:
+                return None
+            self._remove([name for name in self.people if name not in people])
+            self.people = people
+            self._recompute(list(people))
+            recomputed = len(people)
+        else:
+            # Diğer para birimlerindeki değişiklikler USD kurunu etkilemez
+            if self.usd_rate != old_rate or self.sector_config != old_sector_config:
+                recomputed += self._refresh_us_sector()
+            if 'people' in groups:
+                people = self._load_people()
+                if people is None:
+                    return None
+                gone = [name for name in self.people if name not in people]
+                changed = [name for name, person in people.items() if self.people.get(name) != person]
+                self._remove(gone)
+                self.people = people
+                self._recompute(changed)
+                recomputed += len(changed)
+                removed = len(gone)
+
+        self._write_index()
+        return {
+            'reason': ", ".join(groups),
+            'recomputed': recomputed,
+            'removed': removed,
+            'ms': (time.perf_counter() - started) * 1000
+        }
+
+    def run(self, interval=DEFAULT_INTERVAL):
+        log(f"İzleniyor: {os.path.dirname(ASSET_FILE)} (Ctrl+C ile çıkış)")
+        while True:
+            time.sleep(interval)
+            groups = self.changed_groups()
+            if not groups:
+                continue
+            result = self.apply(groups)
+            if result is None:
+                continue
+            log(f"Değişiklik: {result['reason']} | Yeniden hesaplanan: {result['recomputed']} | "
+                f"Silinen: {result['removed']} | Süre: {result['ms']:.1f} ms")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Veri dosyalarını izler ve değişen sonuçları yeniden hesaplar.")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL, help="Kontrol aralığı (sn)")
+    parser.add_argument("--output", default=BUNDLE_DIR, help="Bundle klasörü")
+    args = parser.parse_args()
+
+    watcher = PortfolioWatcher(get_storage(), args.output)
+    if not watcher.start():
+        sys.exit("Dosya okuma hatası nedeniyle program durduruldu.")
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        log("İzleme durduruldu.")